@@ -25,6 +25,9 @@ import numpy as np
 class EmbeddingModel:
     """嵌入模型基类（最小接口）"""
 
+    # 单次 encode 调用最多接受的文本条数，None 表示不限制
+    max_batch_size: Optional[int] = None
+
     def encode(self, texts: Union[str, List[str]]):
         raise NotImplementedError
 
@@ -152,8 +155,11 @@ class DashScopeEmbedding(EmbeddingModel):
     行为：
     - 如提供 base_url，则优先使用 OpenAI 兼容的 REST 接口（POST {base_url}/embeddings）。
     - 否则使用官方 dashscope SDK 的 TextEmbedding.call。
+    - text-embedding-v3 每次调用最多 10 条输入，批量调用方需按 max_batch_size 分批。
     """
 
+    max_batch_size = 10
+
     def __init__(self, model_name: str = "text-embedding-v3", api_key: Optional[str] = None, base_url: Optional[str] = None):
         self.model_name = model_name
         self.api_key = api_key
@@ -260,6 +266,29 @@ def create_embedding_model_with_fallback(preferred_type: str = "dashscope", **kw
     raise RuntimeError("所有嵌入模型都不可用，请安装依赖或检查配置")
 
 
+# ==============
+# 向量计算
+# ==============
+
+def cosine_topk(query: np.ndarray, matrix: np.ndarray, k: int):
+    """对矩阵的每一行计算与查询向量的余弦相似度，返回前 k 个 (下标数组, 分数数组)
+
+    整个计算是一次矩阵-向量乘（BLAS，SIMD）加 argpartition 选择，
+    只对选中的 k 个结果排序：O(N·d + k log k)。
+    """
+    n = matrix.shape[0]
+    if n == 0 or k <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=matrix.dtype)
+    norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query)
+    scores = (matrix @ query) / np.where(norms == 0, 1.0, norms)
+    if k < n:
+        top = np.argpartition(-scores, k - 1)[:k]
+    else:
+        top = np.arange(n)
+    top = top[np.argsort(-scores[top], kind="stable")]
+    return top, scores[top]
+
+
 # ==================
 # Provider（单例）
 # ==================
@@ -1,8 +1,16 @@
 """记忆管理器 - 记忆核心层的统一管理接口"""
 
 from typing import List, Dict, Any, Optional, Union
+from concurrent.futures import Future
 from datetime import datetime
+from functools import lru_cache
+import heapq
+import queue
+import re
+import threading
+import time
 import uuid
+import weakref
 import logging
 
 """
@@ -28,6 +36,89 @@ from .types.perceptual import PerceptualMemory
 # 统一的日志记录器，模块内使用 logger.debug/info/warning 来输出运行状态
 logger = logging.getLogger(__name__)
 
+# 启发式分类/重要性估算使用的关键词
+_EPISODIC_KW = ("昨天", "今天", "明天", "上次", "记得", "发生", "经历")
+_SEMANTIC_KW = ("定义", "概念", "规则", "知识", "原理", "方法")
+_IMPORTANT_KW = ("重要", "关键", "必须", "注意", "警告", "错误")
+
+# 每组关键词预编译为一个正则，只需扫描一遍文本即可完成匹配
+_EPISODIC_RE = re.compile("|".join(map(re.escape, _EPISODIC_KW)))
+_SEMANTIC_RE = re.compile("|".join(map(re.escape, _SEMANTIC_KW)))
+_IMPORTANT_RE = re.compile("|".join(map(re.escape, _IMPORTANT_KW)))
+
+
+# 重要记忆去重：SimHash 指纹的汉明距离不超过该值视为近似重复（空白、大小写、个别错字）
+_SIMHASH_MAX_DISTANCE = 3
+# 参与指纹计算的最大字符数（与搜索结果的预览长度一致）
+_SIMHASH_MAX_CHARS = 500
+_UINT64_MASK = (1 << 64) - 1
+
+# 异步写入的合并窗口：收到第一条请求后最多再等这么久（秒），或攒满一批就立即写入
+_WRITE_COALESCE_WINDOW = 0.005
+_WRITE_COALESCE_MAX_BATCH = 32
+# 写入线程空闲时每隔这么久（秒）检查一次 MemoryManager 是否已被回收
+_WRITER_IDLE_CHECK = 1.0
+
+
+def _memory_writer_loop(manager_ref: "weakref.ref", write_queue: "queue.Queue[tuple]"):
+    """后台写入循环：阻塞等待第一条请求，再在合并窗口内收集后续请求一起写入
+
+    线程只持有 MemoryManager 的弱引用（只在写入期间临时取得强引用），
+    管理器被回收后线程在下一次空闲检查时退出，不会让管理器及其存储常驻内存。
+    """
+    while True:
+        try:
+            batch = [write_queue.get(timeout=_WRITER_IDLE_CHECK)]
+        except queue.Empty:
+            if manager_ref() is None:
+                return
+            continue
+        deadline = time.monotonic() + _WRITE_COALESCE_WINDOW
+        while len(batch) < _WRITE_COALESCE_MAX_BATCH:
+            try:
+                # 已积压的请求直接取走；队列为空时最多等到窗口结束
+                batch.append(write_queue.get(timeout=max(0.0, deadline - time.monotonic())))
+            except queue.Empty:
+                break
+
+        manager = manager_ref()
+        if manager is None:
+            for _, future in batch:
+                future.set_exception(RuntimeError("MemoryManager 已被回收，记忆未写入"))
+            return
+        manager._write_requests(batch)
+        del manager
+
+
+@lru_cache(maxsize=4096)
+def _simhash(text: str) -> int:
+    """计算文本的 64 位 SimHash 指纹
+
+    文本先转小写并折叠空白，再按字符 3-gram 切分（同时适用于中文和英文）。
+    分片哈希使用内置 hash()，进程内稳定即可，指纹不做持久化。
+    """
+    text = " ".join(text.lower().split())[:_SIMHASH_MAX_CHARS]
+    shingles = {text[i:i + 3] for i in range(len(text) - 2)} or {text}
+
+    weights = [0] * 64
+    for shingle in shingles:
+        h = hash(shingle) & _UINT64_MASK
+        for bit in range(64):
+            if h >> bit & 1:
+                weights[bit] += 1
+
+    half = len(shingles) / 2
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > half:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def _is_near_duplicate(fingerprint: int, seen: List[int]) -> bool:
+    """判断指纹是否与已有指纹近似重复（异或后统计不同的位数）"""
+    return any((fingerprint ^ other).bit_count() <= _SIMHASH_MAX_DISTANCE for other in seen)
+
 
 class MemoryManager:
     """记忆管理器 - 统一的记忆操作接口
@@ -77,6 +168,18 @@ class MemoryManager:
             # 感知记忆（可选），用于存放感官或外部观察到的信息
             self.memory_types["perceptual"] = PerceptualMemory(self.config) # 实例化
 
+        # 预先物化 (类型名, 实例) 元组与支持 forget 的实例，热路径直接遍历元组
+        # 注意：若之后动态增删 memory_types，需要调用 _rebuild_memory_index()
+        self._rebuild_memory_index()
+
+        # 数据版本号：每次增删改都会递增，上层可据此判断缓存的结果是否过期
+        self._version = 0
+
+        # 异步写入：后台线程合并排队的 add_memory_async 请求，按批交给 add_memories_batch
+        self._write_queue: "queue.Queue[tuple]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+
         logger.info(
             "MemoryManager初始化完成，启用记忆类型: %s", list(self.memory_types.keys())
         )
@@ -99,6 +202,129 @@ class MemoryManager:
         返回值：新记忆项的 id（字符串）
         抛错：当指定的 memory_type 不被支持时抛出 ValueError
         """
+        memory_item = self._build_memory_item(
+            content, memory_type, importance, metadata, auto_classify
+        )
+
+        # 将记忆交给对应类型的实例处理（持久化/索引/缓存等细节由子类实现）
+        memory_id = self.memory_types[memory_item.memory_type].add(memory_item)
+        self._version += 1
+        logger.debug("添加记忆到 %s: %s", memory_item.memory_type, memory_id)
+        return memory_id
+
+    def add_memories_batch(self, items: List[Dict[str, Any]]) -> List[str]:
+        """批量添加记忆，返回记忆ID列表（顺序与 items 一致）
+
+        每一项是一个字典，键与 add_memory 的参数相同（content 必填）。
+        同一类型的记忆一次性交给对应实例：实例实现了 add_batch 时（如情景记忆）
+        只需一次批量嵌入请求，否则逐条调用 add。
+        所有条目先完成分类与校验，任何一条的类型不受支持时抛出 ValueError，不会写入部分记忆。
+        """
+        memory_items = [
+            self._build_memory_item(
+                item["content"],
+                item.get("memory_type", "working"),
+                item.get("importance"),
+                item.get("metadata"),
+                item.get("auto_classify", True),
+            )
+            for item in items
+        ]
+        return self._write_memory_items(memory_items)
+
+    def _write_memory_items(self, memory_items: List[MemoryItem]) -> List[str]:
+        """按类型分组写入已构造好的记忆项，返回记忆ID列表（顺序与输入一致）"""
+        grouped: Dict[str, List[tuple]] = {}
+        for index, memory_item in enumerate(memory_items):
+            grouped.setdefault(memory_item.memory_type, []).append((index, memory_item))
+
+        memory_ids: List[Optional[str]] = [None] * len(memory_items)
+        for memory_type, entries in grouped.items():
+            memory_instance = self.memory_types[memory_type]
+            batch = [memory_item for _, memory_item in entries]
+            add_batch = getattr(memory_instance, "add_batch", None)
+            if add_batch is not None:
+                type_ids = add_batch(batch)
+            else:
+                type_ids = [memory_instance.add(memory_item) for memory_item in batch]
+            for (index, _), memory_id in zip(entries, type_ids):
+                memory_ids[index] = memory_id
+            logger.debug("批量添加 %d 条记忆到 %s", len(batch), memory_type)
+
+        self._version += 1
+        return memory_ids
+
+    def add_memory_async(
+        self,
+        content: str,
+        memory_type: str = "working",
+        importance: Optional[float] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        auto_classify: bool = True,
+    ) -> Future:
+        """排队添加记忆，立即返回 Future（结果为记忆ID）
+
+        写入由单个后台线程完成：线程收到请求后在 _WRITE_COALESCE_WINDOW 内继续收集
+        其他线程提交的记忆（最多 _WRITE_COALESCE_MAX_BATCH 条），合并为一次
+        add_memories_batch（同类型共用一次嵌入与一次向量库写入），
+        调用方不会阻塞在嵌入计算和 SQLite/Qdrant 写入上。
+        """
+        future: Future = Future()
+        self._write_queue.put(({
+            "content": content,
+            "memory_type": memory_type,
+            "importance": importance,
+            "metadata": metadata,
+            "auto_classify": auto_classify,
+        }, future))
+        self._ensure_writer()
+        return future
+
+    def _ensure_writer(self):
+        """按需启动后台写入线程"""
+        if self._writer is not None and self._writer.is_alive():
+            return
+        with self._writer_lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(
+                    target=_memory_writer_loop,
+                    args=(weakref.ref(self), self._write_queue),
+                    name="memory-writer",
+                    daemon=True,
+                )
+                self._writer.start()
+
+    def _write_requests(self, batch: List[tuple]):
+        """写入一批 (请求参数, Future)：先逐条校验，只让校验失败的请求失败，其余一次批量写入"""
+        pending = []
+        for item, future in batch:
+            try:
+                pending.append((self._build_memory_item(**item), future))
+            except Exception as e:
+                future.set_exception(e)
+        if not pending:
+            return
+
+        try:
+            memory_ids = self._write_memory_items([memory_item for memory_item, _ in pending])
+        except Exception as e:
+            # 写入阶段失败时不逐条重试，避免已写入的记忆被重复写入
+            for _, future in pending:
+                future.set_exception(e)
+            return
+
+        for (_, future), memory_id in zip(pending, memory_ids):
+            future.set_result(memory_id)
+
+    def _build_memory_item(
+        self,
+        content: str,
+        memory_type: str,
+        importance: Optional[float],
+        metadata: Optional[Dict[str, Any]],
+        auto_classify: bool,
+    ) -> MemoryItem:
+        """完成分类与重要性估算并构造 MemoryItem；类型不受支持时抛出 ValueError"""
 
         # 自动分类记忆类型（如将描述事件的文本分类到 episodic）
         if auto_classify:
@@ -110,7 +336,7 @@ class MemoryManager:
 
         # 构造 MemoryItem（id 使用 uuid4 保证唯一性）
         memory_item = MemoryItem(
-            id=str(uuid.uuid4()), # 生成唯一 ID，这个uuid4 是随机生成的，适合分布式环境
+            id=uuid.uuid4().hex, # 生成唯一 ID（32 位十六进制，无连字符），uuid4 随机生成，适合分布式环境
             content=content,
             memory_type=memory_type,
             user_id=self.user_id,
@@ -119,14 +345,10 @@ class MemoryManager:
             metadata=metadata or {},
         )
 
-        # 将记忆交给对应类型的实例处理（持久化/索引/缓存等细节由子类实现）
-        if memory_type in self.memory_types:
-            memory_id = self.memory_types[memory_type].add(memory_item)
-            logger.debug("添加记忆到 %s: %s", memory_type, memory_id)
-            return memory_id
-        else:
+        if memory_type not in self.memory_types:
             # 非受支持的类型应当被尽早发现并反馈
             raise ValueError(f"不支持的记忆类型: {memory_type}")
+        return memory_item
 
     def retrieve_memories(
         self,
@@ -180,6 +402,85 @@ class MemoryManager:
         all_results.sort(key=lambda x: x.importance, reverse=True)
         return all_results[:limit]
 
+    def retrieve_top_important(
+        self,
+        limit: int = 10,
+        min_importance: float = 0.5,
+        memory_types: Optional[List[str]] = None,
+    ) -> List[MemoryItem]:
+        """按重要性返回前 N 条去重后的记忆（不做语义检索，不计算查询向量）
+
+        说明：
+        - 有文档库的类型（情景、感知）共用同一个 SQLite 库，在一条 SQL 中完成
+          精确内容去重 + 排序 + LIMIT，每个库只取回 limit 行。
+        - 仅在内存中的类型（工作、语义）用 heapq.nlargest 取 top-K。
+        - 合并后按重要性排序，再用 SimHash 指纹跳过近似重复的内容，最多返回 limit 条。
+        """
+        if memory_types is None:
+            memory_types = list(self.memory_types.keys())
+
+        candidates: List[MemoryItem] = []
+        sql_types: Dict[int, tuple] = {}  # id(doc_store) -> (doc_store, [memory_type, ...])
+
+        for memory_type in memory_types:
+            memory_instance = self.memory_types.get(memory_type)
+            if memory_instance is None:
+                continue
+            doc_store = getattr(memory_instance, "doc_store", None)
+            if doc_store is not None:
+                sql_types.setdefault(id(doc_store), (doc_store, []))[1].append(memory_type)
+                continue
+            try:
+                active = (
+                    m for m in memory_instance.get_all()
+                    if m.importance >= min_importance
+                    and m.user_id == self.user_id
+                    and not m.metadata.get("forgotten", False)
+                )
+                candidates.extend(heapq.nlargest(limit, active, key=lambda m: m.importance))
+            except Exception as e:
+                logger.warning("获取 %s 重要记忆时出错: %s", memory_type, e)
+
+        for doc_store, store_types in sql_types.values():
+            try:
+                docs = doc_store.search_top_important(
+                    user_id=self.user_id,
+                    memory_types=store_types,
+                    importance_threshold=min_importance,
+                    limit=limit,
+                )
+            except Exception as e:
+                logger.warning("获取 %s 重要记忆时出错: %s", store_types, e)
+                continue
+            for doc in docs:
+                candidates.append(MemoryItem(
+                    id=doc["memory_id"],
+                    content=doc["content"],
+                    memory_type=doc["memory_type"],
+                    user_id=doc["user_id"],
+                    timestamp=datetime.fromtimestamp(doc["timestamp"]),
+                    importance=doc["importance"],
+                    metadata=doc["properties"],
+                ))
+
+        candidates.sort(key=lambda m: m.importance, reverse=True)
+
+        results: List[MemoryItem] = []
+        seen_ids = set()
+        seen_fingerprints: List[int] = []
+        for memory in candidates:
+            if memory.id in seen_ids:
+                continue
+            fingerprint = _simhash(memory.content)
+            if _is_near_duplicate(fingerprint, seen_fingerprints):
+                continue
+            seen_ids.add(memory.id)
+            seen_fingerprints.append(fingerprint)
+            results.append(memory)
+            if len(results) >= limit:
+                break
+        return results
+
     def update_memory(
         self,
         memory_id: str,
@@ -193,8 +494,9 @@ class MemoryManager:
         返回 True 表示更新成功，否则 False。
         """
 
-        for memory_type, memory_instance in self.memory_types.items(): # memory_instance 是具体的记忆类型实例，如 WorkingMemory、EpisodicMemory 等
+        for memory_type, memory_instance in self._memory_items: # memory_instance 是具体的记忆类型实例，如 WorkingMemory、EpisodicMemory 等
             if memory_instance.has_memory(memory_id):
+                self._version += 1
                 return memory_instance.update(memory_id, content, importance, metadata)
 
         logger.warning("未找到记忆: %s", memory_id)
@@ -205,8 +507,9 @@ class MemoryManager:
 
         在各记忆类型中查找，找到即可调用子类的 remove 并返回结果。
         """
-        for memory_type, memory_instance in self.memory_types.items(): # memory_instance 是具体的记忆类型实例，如 WorkingMemory、EpisodicMemory 等
+        for memory_type, memory_instance in self._memory_items: # memory_instance 是具体的记忆类型实例，如 WorkingMemory、EpisodicMemory 等
             if memory_instance.has_memory(memory_id):
+                self._version += 1
                 return memory_instance.remove(memory_id)
 
         logger.warning("未找到记忆: %s", memory_id)
@@ -230,11 +533,12 @@ class MemoryManager:
 
         total_forgotten = 0
 
-        for memory_type, memory_instance in self.memory_types.items():
-            if hasattr(memory_instance, "forget"):
-                forgotten = memory_instance.forget(strategy, threshold, max_age_days)
-                total_forgotten += forgotten
+        for memory_instance in self._forgetters:
+            forgotten = memory_instance.forget(strategy, threshold, max_age_days)
+            total_forgotten += forgotten
 
+        if total_forgotten:
+            self._version += 1
         logger.info("记忆遗忘完成: %d 条记忆", total_forgotten)
         return total_forgotten
 
@@ -273,6 +577,8 @@ class MemoryManager:
                 target_memory.add(memory)
                 consolidated_count += 1
 
+        if consolidated_count:
+            self._version += 1
         logger.info(
             "记忆整合完成: %d 条记忆从 %s 转移到 %s",
             consolidated_count,
@@ -281,6 +587,11 @@ class MemoryManager:
         )
         return consolidated_count
 
+    @property
+    def version(self) -> int:
+        """数据版本号，记忆发生增删改后递增"""
+        return self._version
+
     def get_memory_stats(self) -> Dict[str, Any]:
         """返回当前记忆系统的统计信息字典
 
@@ -300,7 +611,7 @@ class MemoryManager:
             },
         }
 
-        for memory_type, memory_instance in self.memory_types.items():
+        for memory_type, memory_instance in self._memory_items:
             type_stats = memory_instance.get_stats()
             stats["memories_by_type"][memory_type] = type_stats
             # 使用子类统计中的 count 字段作为活跃记忆数
@@ -313,11 +624,19 @@ class MemoryManager:
 
         对所有启用的记忆实例调用其 clear 接口，通常用于重置或测试场景。
         """
-        for memory_type, memory_instance in self.memory_types.items():
+        for memory_type, memory_instance in self._memory_items:
             memory_instance.clear()
+        self._version += 1
         logger.info("所有记忆已清空")
 
     # ----- 内部辅助函数 -----
+    def _rebuild_memory_index(self):
+        """根据 memory_types 重建遍历用的元组缓存"""
+        self._memory_items = tuple(self.memory_types.items())
+        self._forgetters = tuple(
+            instance for _, instance in self._memory_items if hasattr(instance, "forget")
+        )
+
     def _classify_memory_type(self, content: str, metadata: Optional[Dict[str, Any]]) -> str:
         """根据内容与元数据进行简单的记忆类型分类
 
@@ -341,13 +660,11 @@ class MemoryManager:
 
         仅作为启发式规则，匹配中文常见表示时间和经历的词语。
         """
-        episodic_keywords = ["昨天", "今天", "明天", "上次", "记得", "发生", "经历"]
-        return any(keyword in content for keyword in episodic_keywords)
+        return _EPISODIC_RE.search(content) is not None
 
     def _is_semantic_content(self, content: str) -> bool:
         """简单关键字判断：是否像概念/定义/规则相关的文本"""
-        semantic_keywords = ["定义", "概念", "规则", "知识", "原理", "方法"]
-        return any(keyword in content for keyword in semantic_keywords)
+        return _SEMANTIC_RE.search(content) is not None
 
     def _calculate_importance(self, content: str, metadata: Optional[Dict[str, Any]]) -> float:
         """启发式计算记忆重要性（返回 0.0 - 1.0）
@@ -366,8 +683,7 @@ class MemoryManager:
             importance += 0.1
 
         # 关键词提升（简单启发式）
-        important_keywords = ["重要", "关键", "必须", "注意", "警告", "错误"]
-        if any(keyword in content for keyword in important_keywords):
+        if _IMPORTANT_RE.search(content) is not None:
             importance += 0.2
 
         # 元数据优先级字段可以显著影响重要性
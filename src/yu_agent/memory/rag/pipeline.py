@@ -1,11 +1,14 @@
-from typing import List, Dict, Optional, Any
+from typing import TYPE_CHECKING, List, Dict, Optional, Any
 import os
 import hashlib
 import sqlite3
 import time
 import json
 from ..embedding import get_text_embedder, get_dimension
-from ..storage.qdrant_store import QdrantVectorStore
+
+# qdrant_store 会拉起 qdrant_client，只在真正创建向量存储时才导入
+if TYPE_CHECKING:
+    from ..storage.qdrant_store import QdrantVectorStore
 
 
 def _get_markitdown_instance():
@@ -451,7 +454,7 @@ def _preprocess_markdown_for_embedding(text: str) -> str:
     return text.strip()
 
 
-def _create_default_vector_store(dimension: int = None) -> QdrantVectorStore:
+def _create_default_vector_store(dimension: int = None) -> "QdrantVectorStore":
     """
     Create default Qdrant vector store with RAG-optimized settings.
     使用连接管理器避免重复连接。
@@ -1139,6 +1142,8 @@ def create_rag_pipeline(
     Returns:
         Dict containing store, namespace, and helper functions
     """
+    from ..storage.qdrant_store import QdrantVectorStore
+
     dimension = get_dimension(384)
     
     store = QdrantVectorStore(
@@ -1,9 +1,14 @@
 """存储层 - 支持SQLite、Qdrant、Neo4j等多种后端"""
 
+from typing import TYPE_CHECKING
+
 # 导出存储实现
 from .document_store import DocumentStore, SQLiteDocumentStore
-from .qdrant_store import QdrantVectorStore
-from .neo4j_store import Neo4jGraphStore
+
+# Qdrant/Neo4j 会拉起较重的客户端库（grpc、neo4j driver），按需延迟导入
+if TYPE_CHECKING:
+    from .qdrant_store import QdrantVectorStore
+    from .neo4j_store import Neo4jGraphStore
 
 __all__ = [
     "DocumentStore",
@@ -12,3 +17,13 @@ __all__ = [
     "Neo4jGraphStore",
 ]
 
+
+def __getattr__(name):
+    """首次访问时才导入重量级后端（PEP 562）"""
+    if name == "QdrantVectorStore":
+        from .qdrant_store import QdrantVectorStore
+        return QdrantVectorStore
+    if name == "Neo4jGraphStore":
+        from .neo4j_store import Neo4jGraphStore
+        return Neo4jGraphStore
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
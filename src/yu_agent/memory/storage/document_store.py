@@ -35,6 +35,18 @@ class DocumentStore(ABC):
         """获取单个记忆"""
         pass
     
+    def get_memories(self, memory_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """批量获取记忆，返回 memory_id -> 记录（不存在的ID不出现在结果中）
+
+        默认逐条调用 get_memory，子类可用一次批量查询覆盖。
+        """
+        memories = {}
+        for memory_id in memory_ids:
+            memory = self.get_memory(memory_id)
+            if memory is not None:
+                memories[memory_id] = memory
+        return memories
+    
     @abstractmethod
     def search_memories(
         self,
@@ -48,6 +60,45 @@ class DocumentStore(ABC):
         """搜索记忆"""
         pass
     
+    def search_top_important(
+        self,
+        user_id: Optional[str] = None,
+        memory_types: Optional[List[str]] = None,
+        importance_threshold: float = 0.0,
+        limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """按重要性返回前 N 条记忆，相同内容只保留重要性最高的一条
+
+        默认基于 search_memories（按重要性、时间倒序）实现：每种类型取前 fetch 条候选，
+        去重后不足 limit 条且候选可能未取尽时加倍 fetch 重查。子类可用一次查询覆盖。
+        """
+        if limit <= 0:
+            return []
+        fetch = limit
+        while True:
+            candidates: List[Dict[str, Any]] = []
+            exhausted = True
+            for memory_type in memory_types or [None]:
+                docs = self.search_memories(
+                    user_id=user_id,
+                    memory_type=memory_type,
+                    importance_threshold=importance_threshold,
+                    limit=fetch
+                )
+                candidates.extend(docs)
+                exhausted = exhausted and len(docs) < fetch
+            candidates.sort(key=lambda d: (d.get("importance", 0.0), d.get("timestamp", 0)), reverse=True)
+            seen = set()
+            unique = []
+            for doc in candidates:
+                key = (doc.get("content") or "").strip().lower()
+                if key not in seen:
+                    seen.add(key)
+                    unique.append(doc)
+            if len(unique) >= limit or exhausted:
+                return unique[:limit]
+            fetch *= 2
+    
     @abstractmethod
     def update_memory(
         self,
@@ -267,6 +318,34 @@ class SQLiteDocumentStore(DocumentStore):
             "created_at": row["created_at"]
         }
     
+    def get_memories(self, memory_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """批量获取记忆，一次 IN 查询代替逐条 get_memory"""
+        if not memory_ids:
+            return {}
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        placeholders = ", ".join("?" for _ in memory_ids)
+        cursor.execute(f"""
+            SELECT id, user_id, content, memory_type, timestamp, importance, properties, created_at
+            FROM memories
+            WHERE id IN ({placeholders})
+        """, list(memory_ids))
+        
+        return {
+            row["id"]: {
+                "memory_id": row["id"],
+                "user_id": row["user_id"],
+                "content": row["content"],
+                "memory_type": row["memory_type"],
+                "timestamp": row["timestamp"],
+                "importance": row["importance"],
+                "properties": json.loads(row["properties"]) if row["properties"] else {},
+                "created_at": row["created_at"]
+            }
+            for row in cursor.fetchall()
+        }
+    
     def search_memories(
         self,
         user_id: Optional[str] = None,
@@ -331,6 +410,63 @@ class SQLiteDocumentStore(DocumentStore):
         
         return memories
     
+    def search_top_important(
+        self,
+        user_id: Optional[str] = None,
+        memory_types: Optional[List[str]] = None,
+        importance_threshold: float = 0.0,
+        limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """按重要性返回前 N 条记忆，相同内容只保留重要性最高的一条
+
+        去重、排序与截断都在一条 SQL 中完成（窗口函数按规范化后的内容分区），
+        只把最终的 limit 行取回 Python。
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        where_conditions = ["importance >= ?"]
+        params: List[Any] = [importance_threshold]
+        
+        if user_id:
+            where_conditions.append("user_id = ?")
+            params.append(user_id)
+        
+        if memory_types:
+            placeholders = ", ".join("?" for _ in memory_types)
+            where_conditions.append(f"memory_type IN ({placeholders})")
+            params.extend(memory_types)
+        
+        cursor.execute(f"""
+            SELECT id, user_id, content, memory_type, timestamp, importance, properties, created_at
+            FROM (
+                SELECT *, ROW_NUMBER() OVER (
+                    PARTITION BY lower(trim(content))
+                    ORDER BY importance DESC, timestamp DESC
+                ) AS content_rank
+                FROM memories
+                WHERE {" AND ".join(where_conditions)}
+            )
+            WHERE content_rank = 1
+            ORDER BY importance DESC, timestamp DESC
+            LIMIT ?
+        """, params + [limit])
+        
+        memories = []
+        for row in cursor.fetchall():
+            memories.append({
+                "memory_id": row["id"],
+                "user_id": row["user_id"],
+                "content": row["content"],
+                "memory_type": row["memory_type"],
+                "timestamp": row["timestamp"],
+                "importance": row["importance"],
+                "properties": json.loads(row["properties"]) if row["properties"] else {},
+                "created_at": row["created_at"]
+            })
+        
+        return memories
+    
     def update_memory(
         self,
         memory_id: str,
@@ -108,6 +108,12 @@ class QdrantVectorStore:
         except Exception:
             self.search_ef = 128
         self.search_exact = os.getenv("QDRANT_SEARCH_EXACT", "0") == "1"
+        # 向量量化：scalar(int8，默认) / product / binary / none
+        self.quantization = os.getenv("QDRANT_QUANTIZATION", "scalar").lower()
+        try:
+            self.quantization_oversampling = float(os.getenv("QDRANT_QUANTIZATION_OVERSAMPLING", "2.0"))
+        except Exception:
+            self.quantization_oversampling = 2.0
         
         # 距离度量映射
         distance_map = {
@@ -184,7 +190,8 @@ class QdrantVectorStore:
                         size=self.vector_size,
                         distance=self.distance
                     ),
-                    hnsw_config=hnsw_cfg
+                    hnsw_config=hnsw_cfg,
+                    quantization_config=self._quantization_config()
                 )
                 logger.info(f"✅ 创建Qdrant集合: {self.collection_name}")
             else:
@@ -197,6 +204,16 @@ class QdrantVectorStore:
                     )
                 except Exception as ie:
                     logger.debug(f"跳过更新HNSW配置: {ie}")
+                # 尝试为已有集合启用量化（原始向量保留，用于重打分）
+                quantization_cfg = self._quantization_config()
+                if quantization_cfg is not None:
+                    try:
+                        self.client.update_collection(
+                            collection_name=self.collection_name,
+                            quantization_config=quantization_cfg
+                        )
+                    except Exception as ie:
+                        logger.debug(f"跳过更新量化配置: {ie}")
             # 确保必要的payload索引
             self._ensure_payload_indexes()
                 
@@ -204,6 +221,36 @@ class QdrantVectorStore:
             logger.error(f"❌ 集合初始化失败: {e}")
             raise
 
+    def _quantization_config(self):
+        """按 QDRANT_QUANTIZATION 构建量化配置
+
+        - scalar: float32 -> int8，向量内存/带宽降为 1/4，召回损失很小
+        - product: 乘积量化（16 倍压缩），召回损失较大，依赖重打分
+        - binary: 1 bit/维（32 倍压缩），只适合高维嵌入模型
+        量化向量常驻内存用于 HNSW 遍历，原始向量保留用于重打分。
+        """
+        try:
+            if self.quantization == "scalar":
+                return models.ScalarQuantization(
+                    scalar=models.ScalarQuantizationConfig(
+                        type=models.ScalarType.INT8, quantile=0.99, always_ram=True
+                    )
+                )
+            if self.quantization == "product":
+                return models.ProductQuantization(
+                    product=models.ProductQuantizationConfig(
+                        compression=models.CompressionRatio.X16, always_ram=True
+                    )
+                )
+            if self.quantization == "binary":
+                return models.BinaryQuantization(
+                    binary=models.BinaryQuantizationConfig(always_ram=True)
+                )
+        except Exception as e:
+            # 旧版 qdrant-client 不支持对应的量化类型
+            logger.debug(f"量化配置不可用 ({self.quantization}): {e}")
+        return None
+
     def _ensure_payload_indexes(self):
         """为常用过滤字段创建payload索引"""
         try:
@@ -347,7 +394,17 @@ class QdrantVectorStore:
                 # 执行搜索
                 search_params = None
                 try:
-                    search_params = models.SearchParams(hnsw_ef=self.search_ef, exact=self.search_exact)
+                    quantization_params = None
+                    if self.quantization in ("scalar", "product", "binary"):
+                        # 先用量化向量取 limit*oversampling 个候选，再用原始向量重打分
+                        quantization_params = models.QuantizationSearchParams(
+                            rescore=True, oversampling=self.quantization_oversampling
+                        )
+                    search_params = models.SearchParams(
+                        hnsw_ef=self.search_ef,
+                        exact=self.search_exact,
+                        quantization=quantization_params
+                    )
                 except Exception:
                     search_params = None
                 
@@ -23,7 +23,7 @@ import logging
 logger = logging.getLogger(__name__)
 
 from ..base import BaseMemory, MemoryItem, MemoryConfig
-from ..storage import SQLiteDocumentStore, QdrantVectorStore
+from ..storage import SQLiteDocumentStore
 from ..embedding import get_text_embedder, get_dimension
 
 class Episode:
@@ -64,6 +64,7 @@ class EpisodicMemory(BaseMemory):
         
         # 本地缓存（内存）
         self.episodes: List[Episode] = []
+        self._episode_index: Dict[str, Episode] = {}  # episode_id -> Episode，向量命中后 O(1) 回查
         self.sessions: Dict[str, List[str]] = {}  # session_id -> episode_ids
         
         # 模式识别缓存
@@ -93,6 +94,22 @@ class EpisodicMemory(BaseMemory):
     
     def add(self, memory_item: MemoryItem) -> str:
         """添加情景记忆"""
+        self._store_episode(memory_item)
+        self._index_vectors([memory_item])
+        return memory_item.id
+
+    def add_batch(self, memory_items: List[MemoryItem]) -> List[str]:
+        """批量添加情景记忆
+
+        权威存储逐条写入，向量索引按嵌入服务的单次上限分批嵌入，再做一次 Qdrant 写入。
+        """
+        for memory_item in memory_items:
+            self._store_episode(memory_item)
+        self._index_vectors(memory_items)
+        return [memory_item.id for memory_item in memory_items]
+
+    def _store_episode(self, memory_item: MemoryItem):
+        """写入内存缓存与权威存储（SQLite）"""
         # 从元数据中提取情景信息
         session_id = memory_item.metadata.get("session_id", "default_session")
         context = memory_item.metadata.get("context", {})
@@ -112,6 +129,7 @@ class EpisodicMemory(BaseMemory):
             importance=memory_item.importance
         )
         self.episodes.append(episode)
+        self._episode_index[episode.episode_id] = episode
         if session_id not in self.sessions:
             self.sessions[session_id] = []
         self.sessions[session_id].append(episode.episode_id)
@@ -134,28 +152,57 @@ class EpisodicMemory(BaseMemory):
             }
         )
 
-        # 2) 向量索引（Qdrant）
+    def _index_vectors(self, memory_items: List[MemoryItem]):
+        """为记忆建立向量索引（Qdrant），按嵌入服务的单次上限分批嵌入，一次写入"""
+        if not memory_items:
+            return
+        indexed: List[MemoryItem] = []
+        vectors: List[List[float]] = []
+        batch_size = getattr(self.embedder, "max_batch_size", None) or len(memory_items)
+        for start in range(0, len(memory_items), batch_size):
+            chunk = memory_items[start:start + batch_size]
+            for memory_item, embedding in zip(chunk, self._encode_chunk(chunk)):
+                if embedding is None:
+                    continue
+                indexed.append(memory_item)
+                vectors.append(embedding.tolist() if hasattr(embedding, "tolist") else embedding)
+        if not indexed:
+            return
         try:
-            embedding = self.embedder.encode(memory_item.content)
-            if hasattr(embedding, "tolist"):
-                embedding = embedding.tolist()
             self.vector_store.add_vectors(
-                vectors=[embedding],
+                vectors=vectors,
                 metadata=[{
-                    "memory_id": memory_item.id,
-                    "user_id": memory_item.user_id,
+                    "memory_id": m.id,
+                    "user_id": m.user_id,
                     "memory_type": "episodic",
-                    "importance": memory_item.importance,
-                    "session_id": session_id,
-                    "content": memory_item.content
-                }],
-                ids=[memory_item.id]
+                    "importance": m.importance,
+                    "session_id": m.metadata.get("session_id", "default_session"),
+                    "content": m.content
+                } for m in indexed],
+                ids=[m.id for m in indexed]
             )
-        except Exception:
+        except Exception as e:
             # 向量入库失败不影响权威存储
-            pass
+            logger.warning(f"情景记忆向量入库失败（{len(indexed)} 条）: {e}")
 
-        return memory_item.id
+    def _encode_chunk(self, memory_items: List[MemoryItem]) -> List[Any]:
+        """嵌入一批记忆；整批失败时逐条重试，仍失败的条目返回 None"""
+        if len(memory_items) > 1:
+            try:
+                embeddings = list(self.embedder.encode([m.content for m in memory_items]))
+                if len(embeddings) == len(memory_items):
+                    return embeddings
+                logger.warning(f"批量嵌入返回 {len(embeddings)} 条，期望 {len(memory_items)} 条，改为逐条嵌入")
+            except Exception as e:
+                logger.warning(f"批量嵌入失败（{len(memory_items)} 条），改为逐条嵌入: {e}")
+        embeddings = []
+        for memory_item in memory_items:
+            try:
+                embeddings.append(self.embedder.encode(memory_item.content))
+            except Exception as e:
+                logger.warning(f"情景记忆嵌入失败，跳过向量索引 {memory_item.id}: {e}")
+                embeddings.append(None)
+        return embeddings
     
     def retrieve(self, query: str, limit: int = 5, **kwargs) -> List[MemoryItem]:
         """检索情景记忆（结构化过滤 + 语义向量检索）"""
@@ -195,6 +242,10 @@ class EpisodicMemory(BaseMemory):
         except Exception:
             hits = []
 
+        # 从权威库一次性读取所有命中记录（HNSW 检索之后不再逐条查询 SQLite）
+        hit_ids = [hit.get("metadata", {}).get("memory_id") for hit in hits]
+        docs_by_id = self.doc_store.get_memories([mid for mid in hit_ids if mid])
+
         # 过滤与重排
         now_ts = int(datetime.now().timestamp())
         results: List[Tuple[float, MemoryItem]] = []
@@ -206,7 +257,7 @@ class EpisodicMemory(BaseMemory):
                 continue
             
             # 检查是否已遗忘
-            episode = next((e for e in self.episodes if e.episode_id == mem_id), None)
+            episode = self._episode_index.get(mem_id)
             if episode and episode.context.get("forgotten", False):
                 continue  # 跳过已遗忘的记忆
                 
@@ -215,8 +266,8 @@ class EpisodicMemory(BaseMemory):
             if session_id and meta.get("session_id") != session_id:
                 continue
 
-            # 从权威库读取完整记录
-            doc = self.doc_store.get_memory(mem_id)
+            # 权威库中的完整记录
+            doc = docs_by_id.get(mem_id)
             if not doc:
                 continue
 
@@ -346,6 +397,7 @@ class EpisodicMemory(BaseMemory):
         for i, episode in enumerate(self.episodes):
             if episode.episode_id == memory_id:
                 removed_episode = self.episodes.pop(i)
+                self._episode_index.pop(memory_id, None)
                 session_id = removed_episode.session_id
                 if session_id in self.sessions:
                     self.sessions[session_id].remove(memory_id)
@@ -367,12 +419,13 @@ class EpisodicMemory(BaseMemory):
     
     def has_memory(self, memory_id: str) -> bool:
         """检查记忆是否存在"""
-        return any(episode.episode_id == memory_id for episode in self.episodes)
+        return memory_id in self._episode_index
     
     def clear(self):
         """清空所有情景记忆（仅清理episodic，不影响其他类型）"""
         # 内存缓存
         self.episodes.clear()
+        self._episode_index.clear()
         self.sessions.clear()
         self.patterns_cache.clear()
 
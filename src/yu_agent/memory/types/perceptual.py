@@ -15,7 +15,7 @@
 注意：模块中有许多对外部依赖的兼容性处理，若缺少 CLIP/CLAP 或 Qdrant 会优雅退化为更简单的向量/哈希策略。
 """
 
-from typing import List, Dict, Any, Optional, Union, Tuple
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Union, Tuple
 from datetime import datetime, timedelta
 import hashlib
 import os
@@ -25,9 +25,13 @@ import logging
 logger = logging.getLogger(__name__)
 
 from ..base import BaseMemory, MemoryItem, MemoryConfig
-from ..storage import SQLiteDocumentStore, QdrantVectorStore
+from ..storage import SQLiteDocumentStore
 from ..embedding import get_text_embedder, get_dimension
 
+# QdrantVectorStore 会拉起 qdrant_client，只在需要向量存储时才导入（见 storage.__getattr__）
+if TYPE_CHECKING:
+    from ..storage import QdrantVectorStore
+
 class Perception:
     """感知数据实体"""
     
@@ -126,7 +130,7 @@ class PerceptualMemory(BaseMemory):
         base_collection = os.getenv("QDRANT_COLLECTION", "hello_agents_vectors")
         distance = os.getenv("QDRANT_DISTANCE", "cosine")
         
-        self.vector_stores: Dict[str, QdrantVectorStore] = {}
+        self.vector_stores: Dict[str, "QdrantVectorStore"] = {}
         # 文本集合
         self.vector_stores["text"] = QdrantConnectionManager.get_instance(
             url=qdrant_url,
@@ -704,7 +708,7 @@ class PerceptualMemory(BaseMemory):
             except Exception:
                 pass
 
-    def _get_vector_store_for_modality(self, modality: Optional[str]) -> QdrantVectorStore:
+    def _get_vector_store_for_modality(self, modality: Optional[str]) -> "QdrantVectorStore":
         mod = (modality or "text").lower()
         return self.vector_stores.get(mod, self.vector_stores["text"])
 
@@ -24,7 +24,7 @@ import math
 import numpy as np
 
 from ..base import BaseMemory, MemoryItem, MemoryConfig
-from ..embedding import get_text_embedder, get_dimension
+from ..embedding import get_text_embedder, get_dimension, cosine_topk
 from ...core.database_config import get_database_config
 
 # 配置日志
@@ -126,6 +126,7 @@ class SemanticMemory(BaseMemory):
         
         # 记忆存储
         self.semantic_memories: List[MemoryItem] = []
+        self._memory_index: Dict[str, MemoryItem] = {}  # memory_id -> MemoryItem，向量命中后 O(1) 回查
         self.memory_embeddings: Dict[str, np.ndarray] = {}
         
         logger.info("增强语义记忆初始化完成（使用Qdrant+Neo4j专业数据库）")
@@ -270,6 +271,7 @@ class SemanticMemory(BaseMemory):
             
             # 6. 存储记忆
             self.semantic_memories.append(memory_item)
+            self._memory_index[memory_item.id] = memory_item
             
             logger.info(f"✅ 添加语义记忆: {len(entities)}个实体, {len(relations)}个关系")
             return memory_item.id
@@ -311,7 +313,7 @@ class SemanticMemory(BaseMemory):
                 memory_id = result.get("memory_id")
                 
                 # 检查是否已遗忘
-                memory = next((m for m in self.semantic_memories if m.id == memory_id), None)
+                memory = self._memory_index.get(memory_id)
                 if memory and memory.metadata.get("forgotten", False):
                     continue  # 跳过已遗忘的记忆
                 
@@ -385,6 +387,37 @@ class SemanticMemory(BaseMemory):
                 
         except Exception as e:
             logger.error(f"❌ Qdrant向量搜索失败: {e}")
+            return self._local_vector_search(query, limit, user_id)
+
+    def _local_vector_search(self, query: str, limit: int, user_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Qdrant 不可用时的本地回退：对进程内缓存的嵌入做一次向量化余弦 top-k"""
+        try:
+            candidates = [
+                m for m in self.semantic_memories
+                if m.id in self.memory_embeddings and (not user_id or m.user_id == user_id)
+            ]
+            if not candidates:
+                return []
+
+            matrix = np.stack([np.asarray(self.memory_embeddings[m.id], dtype=np.float32) for m in candidates])
+            query_vec = np.asarray(self.embedding_model.encode(query), dtype=np.float32)
+            indices, scores = cosine_topk(query_vec, matrix, limit)
+
+            return [
+                {
+                    "id": candidates[i].id,
+                    "score": float(score),
+                    "memory_id": candidates[i].id,
+                    "user_id": candidates[i].user_id,
+                    "content": candidates[i].content,
+                    "memory_type": "semantic",
+                    "timestamp": int(candidates[i].timestamp.timestamp()),
+                    "importance": candidates[i].importance,
+                }
+                for i, score in zip(indices, scores)
+            ]
+        except Exception as e:
+            logger.error(f"❌ 本地向量搜索失败: {e}")
             return []
 
     def _graph_search(self, query: str, limit: int, user_id: Optional[str] = None) -> List[Dict[str, Any]]:
@@ -882,13 +915,10 @@ class SemanticMemory(BaseMemory):
     
     def _find_memory_by_id(self, memory_id: str) -> Optional[MemoryItem]:
         """根据ID查找记忆"""
-        logger.debug(f"🔍 查找记忆ID: {memory_id}, 当前记忆数: {len(self.semantic_memories)}")
-        for memory in self.semantic_memories:
-            if memory.id == memory_id:
-                logger.debug(f"✅ 找到记忆: {memory.content[:50]}...")
-                return memory
-        logger.debug(f"❌ 未找到记忆ID: {memory_id}")
-        return None
+        memory = self._memory_index.get(memory_id)
+        if memory is None:
+            logger.debug(f"❌ 未找到记忆ID: {memory_id}")
+        return memory
     
     def update(
         self,
@@ -957,6 +987,7 @@ class SemanticMemory(BaseMemory):
             
             # 删除记忆
             self.semantic_memories.remove(memory)
+            self._memory_index.pop(memory_id, None)
             if memory_id in self.memory_embeddings:
                 del self.memory_embeddings[memory_id]
                 
@@ -1035,6 +1066,7 @@ class SemanticMemory(BaseMemory):
             
             # 清空本地缓存
             self.semantic_memories.clear()
+            self._memory_index.clear()
             self.memory_embeddings.clear()
             self.entities.clear()
             self.relations.clear()
@@ -1045,6 +1077,7 @@ class SemanticMemory(BaseMemory):
             logger.error(f"❌ 清空语义记忆失败: {e}")
             # 即使数据库清空失败，也要清空本地缓存
         self.semantic_memories.clear()
+        self._memory_index.clear()
         self.memory_embeddings.clear()
         self.entities.clear()
         self.relations.clear()
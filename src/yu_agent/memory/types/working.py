@@ -10,14 +10,21 @@
 
 实现说明：
 - 内部存储为纯内存结构（列表 + 优先级堆），不要求持久化。
+- 重要性、时间戳与 token 数另存为与列表按下标对齐的 NumPy 列（SoA），
+  遗忘、过期清理与驱逐时整列向量化计算，不再逐个访问 MemoryItem 属性。
+- 各列是按容量预分配的缓冲区加长度计数，添加时写入末尾、满时按倍数扩容，
+  删除统一经 _keep 按掩码原地压缩，避免每次增删都重新分配整列。
 - 在添加时会维护 token 计数与堆结构；在检索时会进行过期清理。
 
 注意：本实现使用 sklearn 的 TF-IDF 作为轻量向量检索示例，生产环境可替换为更强大的嵌入模型。
 """
 
 from typing import List, Dict, Any
-from datetime import datetime, timedelta
+from datetime import datetime
 import heapq
+import time
+
+import numpy as np
 
 from ..base import BaseMemory, MemoryItem, MemoryConfig
 
@@ -44,6 +51,10 @@ class WorkingMemory(BaseMemory):
         
         # 内存存储（工作记忆不需要持久化）
         self.memories: List[MemoryItem] = []
+        # 与 self.memories 按下标一一对应的列：重要性、时间戳（epoch 秒）、token 数
+        # 缓冲区按容量预分配（添加后、驱逐前会短暂多出一条），前 _size 个元素有效
+        self._size = 0
+        self._allocate_columns(max(1, self.max_capacity + 1))
         
         # 使用优先级队列管理记忆
         self.memory_heap = []  # (priority, timestamp, memory_item)
@@ -60,7 +71,14 @@ class WorkingMemory(BaseMemory):
         self.memories.append(memory_item)
         
         # 更新token计数
-        self.current_tokens += len(memory_item.content.split())
+        tokens = len(memory_item.content.split())
+        self.current_tokens += tokens
+        if self._size == self._importance_buf.size:
+            self._allocate_columns(self._size * 2)
+        self._importance_buf[self._size] = memory_item.importance
+        self._timestamps_buf[self._size] = memory_item.timestamp.timestamp()
+        self._tokens_buf[self._size] = tokens
+        self._size += 1
         
         # 检查容量限制
         self._enforce_capacity_limits()
@@ -170,7 +188,7 @@ class WorkingMemory(BaseMemory):
         metadata: Dict[str, Any] = None
     ) -> bool:
         """更新工作记忆"""
-        for memory in self.memories:
+        for i, memory in enumerate(self.memories):
             if memory.id == memory_id:
                 old_tokens = len(memory.content.split())
                 
@@ -179,9 +197,11 @@ class WorkingMemory(BaseMemory):
                     # 更新token计数
                     new_tokens = len(content.split())
                     self.current_tokens = self.current_tokens - old_tokens + new_tokens
+                    self._tokens[i] = new_tokens
                 
                 if importance is not None:
                     memory.importance = importance
+                    self._importance[i] = importance
                 
                 if metadata is not None:
                     memory.metadata.update(metadata)
@@ -196,16 +216,14 @@ class WorkingMemory(BaseMemory):
         """删除工作记忆"""
         for i, memory in enumerate(self.memories):
             if memory.id == memory_id:
-                # 从列表中删除
-                removed_memory = self.memories.pop(i)
+                # 从列表与各列中删除（token计数在 _keep 中同步更新）
+                mask = np.ones(self._size, dtype=bool)
+                mask[i] = False
+                self._keep(mask)
                 
                 # 从堆中删除（标记删除）
                 self._mark_deleted_in_heap(memory_id)
                 
-                # 更新token计数
-                self.current_tokens -= len(removed_memory.content.split())
-                self.current_tokens = max(0, self.current_tokens)
-                
                 return True
         return False
     
@@ -218,6 +236,7 @@ class WorkingMemory(BaseMemory):
         self.memories.clear()
         self.memory_heap.clear()
         self.current_tokens = 0
+        self._size = 0
     
     def get_stats(self) -> Dict[str, Any]:
         """获取工作记忆统计信息"""
@@ -236,7 +255,7 @@ class WorkingMemory(BaseMemory):
             "max_tokens": self.max_tokens,
             "max_age_minutes": self.max_age_minutes,
             "session_duration_minutes": (datetime.now() - self.session_start).total_seconds() / 60,
-            "avg_importance": sum(m.importance for m in active_memories) / len(active_memories) if active_memories else 0.0,
+            "avg_importance": float(self._importance.mean()) if active_memories else 0.0,
             "capacity_usage": len(active_memories) / self.max_capacity if self.max_capacity > 0 else 0.0,
             "token_usage": self.current_tokens / self.max_tokens if self.max_tokens > 0 else 0.0,
             "memory_type": "working"
@@ -253,12 +272,8 @@ class WorkingMemory(BaseMemory):
     
     def get_important(self, limit: int = 10) -> List[MemoryItem]:
         """获取重要记忆"""
-        sorted_memories = sorted(
-            self.memories,
-            key=lambda x: x.importance,
-            reverse=True
-        )
-        return sorted_memories[:limit]
+        order = np.argsort(-self._importance, kind="stable")[:limit]
+        return [self.memories[i] for i in order]
 
     def get_all(self) -> List[MemoryItem]:
         """获取所有记忆"""
@@ -294,49 +309,29 @@ class WorkingMemory(BaseMemory):
         return "Working Memory Context:\n" + "\n".join(summary_parts)
     
     def forget(self, strategy: str = "importance_based", threshold: float = 0.1, max_age_days: int = 1) -> int:
-        """工作记忆遗忘机制"""
-        forgotten_count = 0
-        current_time = datetime.now()
-        
-        to_remove = []
+        """工作记忆遗忘机制（在 SoA 列上构造删除掩码，一次性压缩）"""
+        now = time.time()
         
         # 始终先执行TTL过期（分钟级）
-        cutoff_ttl = current_time - timedelta(minutes=self.max_age_minutes)
-        for memory in self.memories:
-            if memory.timestamp < cutoff_ttl:
-                to_remove.append(memory.id)
+        remove_mask = self._timestamps < now - self.max_age_minutes * 60
         
         if strategy == "importance_based":
             # 删除低重要性记忆
-            for memory in self.memories:
-                if memory.importance < threshold:
-                    to_remove.append(memory.id)
+            remove_mask |= self._importance < threshold
         
         elif strategy == "time_based":
             # 删除过期记忆（工作记忆通常以小时计算）
-            cutoff_time = current_time - timedelta(hours=max_age_days * 24)
-            for memory in self.memories:
-                if memory.timestamp < cutoff_time:
-                    to_remove.append(memory.id)
+            remove_mask |= self._timestamps < now - max_age_days * 86400
         
         elif strategy == "capacity_based":
             # 删除超出容量的记忆
             if len(self.memories) > self.max_capacity:
                 # 按优先级排序，删除最低的
-                sorted_memories = sorted(
-                    self.memories,
-                    key=lambda m: self._calculate_priority(m)
-                )
                 excess_count = len(self.memories) - self.max_capacity
-                for memory in sorted_memories[:excess_count]:
-                    to_remove.append(memory.id)
+                remove_mask[np.argsort(self._priorities(), kind="stable")[:excess_count]] = True
         
         # 执行删除
-        for memory_id in to_remove:
-            if self.remove(memory_id):
-                forgotten_count += 1
-        
-        return forgotten_count
+        return self._keep(~remove_mask)
     
     def _calculate_priority(self, memory: MemoryItem) -> float:
         """计算记忆优先级"""
@@ -349,6 +344,44 @@ class WorkingMemory(BaseMemory):
         
         return priority
     
+    @property
+    def _importance(self) -> np.ndarray:
+        return self._importance_buf[:self._size]
+
+    @property
+    def _timestamps(self) -> np.ndarray:
+        return self._timestamps_buf[:self._size]
+
+    @property
+    def _tokens(self) -> np.ndarray:
+        return self._tokens_buf[:self._size]
+
+    def _allocate_columns(self, capacity: int):
+        """把各列缓冲区重新分配为 capacity 大小，保留前 _size 个有效元素"""
+        for name, dtype in (("_importance_buf", np.float64), ("_timestamps_buf", np.float64), ("_tokens_buf", np.int64)):
+            buf = np.empty(capacity, dtype=dtype)
+            if self._size:
+                buf[:self._size] = getattr(self, name)[:self._size]
+            setattr(self, name, buf)
+
+    def _priorities(self) -> np.ndarray:
+        """整列计算所有记忆的优先级（与 _calculate_priority 的公式一致）"""
+        hours_passed = (time.time() - self._timestamps) / 3600
+        time_decay = np.maximum(0.1, self.config.decay_factor ** (hours_passed / 6))
+        return self._importance * time_decay
+
+    def _keep(self, mask: np.ndarray) -> int:
+        """按布尔掩码保留记忆，列表与各列在缓冲区内原地压缩，返回删除的条数"""
+        removed = int(mask.size - np.count_nonzero(mask))
+        if removed:
+            self.memories = [m for m, keep in zip(self.memories, mask) if keep]
+            self.current_tokens = max(0, self.current_tokens - int(self._tokens[~mask].sum()))
+            kept = self._size - removed
+            for buf in (self._importance_buf, self._timestamps_buf, self._tokens_buf):
+                buf[:kept] = buf[:self._size][mask]
+            self._size = kept
+        return removed
+
     def _calculate_time_decay(self, timestamp: datetime) -> float:
         """计算时间衰减因子"""
         time_diff = datetime.now() - timestamp
@@ -372,25 +405,16 @@ class WorkingMemory(BaseMemory):
         """按TTL清理过期记忆，并同步更新堆与token计数"""
         if not self.memories:
             return
-        cutoff_time = datetime.now() - timedelta(minutes=self.max_age_minutes)
-        # 过滤保留的记忆
-        kept: List[MemoryItem] = []
-        removed_token_sum = 0
-        for m in self.memories:
-            if m.timestamp >= cutoff_time:
-                kept.append(m)
-            else:
-                removed_token_sum += len(m.content.split())
-        if len(kept) == len(self.memories):
+        cutoff = time.time() - self.max_age_minutes * 60
+        # 过滤保留的记忆（列表、列与token同步更新）
+        if not self._keep(self._timestamps >= cutoff):
             return
-        # 覆盖列表与token
-        self.memories = kept
-        self.current_tokens = max(0, self.current_tokens - removed_token_sum)
         # 重建堆
-        self.memory_heap = []
-        for mem in self.memories:
-            priority = self._calculate_priority(mem)
-            heapq.heappush(self.memory_heap, (-priority, mem.timestamp, mem))
+        self.memory_heap = [
+            (-float(priority), mem.timestamp, mem)
+            for priority, mem in zip(self._priorities(), self.memories)
+        ]
+        heapq.heapify(self.memory_heap)
     
     def _remove_lowest_priority_memory(self):
         """删除优先级最低的记忆"""
@@ -398,17 +422,8 @@ class WorkingMemory(BaseMemory):
             return
         
         # 找到优先级最低的记忆
-        lowest_priority = float('inf')
-        lowest_memory = None
-        
-        for memory in self.memories:
-            priority = self._calculate_priority(memory)
-            if priority < lowest_priority:
-                lowest_priority = priority
-                lowest_memory = memory
-        
-        if lowest_memory:
-            self.remove(lowest_memory.id)
+        lowest_index = int(np.argmin(self._priorities()))
+        self.remove(self.memories[lowest_index].id)
     
     def _update_heap_priority(self, memory: MemoryItem):
         """更新堆中记忆的优先级"""
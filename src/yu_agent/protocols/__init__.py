@@ -5,54 +5,104 @@
 - A2A (Agent-to-Agent Protocol): 智能体间通信协议
 - ANP (Agent Network Protocol): 智能体网络协议
 
+各协议子模块在首次访问对应符号时才导入（PEP 562），
+避免只使用其中一种协议时加载其他协议的依赖。
 """
 
+from typing import TYPE_CHECKING
+
 from .base import Protocol
 
-# MCP 协议 - 导出所有常用类（可选，需要 fastmcp）
-try:
-    from .mcp import (
-        MCPClient,
-        MCPServer,
-        create_context,
-        parse_context,
+if TYPE_CHECKING:
+    from .mcp import MCPClient, MCPServer, create_context, parse_context
+    from .a2a import (
+        A2AAgent,
+        A2AServer,
+        A2AClient,
+        AgentNetwork,
+        AgentRegistry,
+        A2AMessage,
+        MessageType,
+        create_message,
+        parse_message,
+    )
+    from .anp import (
+        ANPDiscovery,
+        ANPNetwork,
+        ServiceInfo,
+        register_service,
+        discover_service,
     )
-    MCP_AVAILABLE = True
-except ImportError:
-    MCP_AVAILABLE = False
-    # 提供占位符
-    class MCPClient:
-        def __init__(self, *args, **kwargs):
+
+# 符号名 -> 所属子模块
+_MCP_EXPORTS = ("MCPClient", "MCPServer", "create_context", "parse_context")
+_A2A_EXPORTS = (
+    "A2AAgent",
+    "A2AServer",
+    "A2AClient",
+    "AgentNetwork",
+    "AgentRegistry",
+    "A2AMessage",
+    "MessageType",
+    "create_message",
+    "parse_message",
+)
+_ANP_EXPORTS = (
+    "ANPDiscovery",
+    "ANPNetwork",
+    "ServiceInfo",
+    "register_service",
+    "discover_service",
+)
+
+
+def _load_mcp():
+    """导入 MCP 协议（可选，需要 fastmcp），不可用时提供占位符"""
+    try:
+        from .mcp import (
+            MCPClient,
+            MCPServer,
+            create_context,
+            parse_context,
+        )
+        available = True
+    except ImportError:
+        available = False
+        # 提供占位符
+        class MCPClient:
+            def __init__(self, *args, **kwargs):
+                raise ImportError("MCP requires fastmcp: pip install fastmcp")
+        class MCPServer:
+            def __init__(self, *args, **kwargs):
+                raise ImportError("MCP requires fastmcp: pip install fastmcp")
+        def create_context(*args, **kwargs):
             raise ImportError("MCP requires fastmcp: pip install fastmcp")
-    class MCPServer:
-        def __init__(self, *args, **kwargs):
+        def parse_context(*args, **kwargs):
             raise ImportError("MCP requires fastmcp: pip install fastmcp")
-    def create_context(*args, **kwargs):
-        raise ImportError("MCP requires fastmcp: pip install fastmcp")
-    def parse_context(*args, **kwargs):
-        raise ImportError("MCP requires fastmcp: pip install fastmcp")
-
-# A2A 协议 - 导出所有常用类
-from .a2a import (
-    A2AAgent,
-    A2AServer,
-    A2AClient,
-    AgentNetwork,
-    AgentRegistry,
-    A2AMessage,
-    MessageType,
-    create_message,
-    parse_message,
-)
 
-# ANP 协议 - 导出所有常用类
-from .anp import (
-    ANPDiscovery,
-    ANPNetwork,
-    ServiceInfo,
-    register_service,
-    discover_service,
-)
+    globals().update(
+        MCPClient=MCPClient,
+        MCPServer=MCPServer,
+        create_context=create_context,
+        parse_context=parse_context,
+        MCP_AVAILABLE=available,
+    )
+
+
+def __getattr__(name):
+    """按需导入协议子模块，并把结果缓存到模块命名空间"""
+    if name in _MCP_EXPORTS or name == "MCP_AVAILABLE":
+        _load_mcp()
+    elif name in _A2A_EXPORTS:
+        from . import a2a
+        globals().update({attr: getattr(a2a, attr) for attr in _A2A_EXPORTS})
+    elif name in _ANP_EXPORTS:
+        from . import anp
+        globals().update({attr: getattr(anp, attr) for attr in _ANP_EXPORTS})
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return globals()[name]
+
 
 __all__ = [
     # 基础协议
@@ -82,4 +132,3 @@ __all__ = [
     "register_service",
     "discover_service",
 ]
-
@@ -6,8 +6,11 @@
 安装: pip install a2a-sdk
 """
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional
+from datetime import datetime
+from functools import lru_cache
 import asyncio
+import time
 
 try:
     from a2a.client import A2AClient
@@ -18,10 +21,30 @@ except ImportError:
     A2AClient = None
     Message = None
 
+try:
+    import requests
+except ImportError:
+    requests = None
+
+try:
+    import flask
+except ImportError:
+    flask = None
+
+
+def _require_requests():
+    """确保 requests 可用（客户端依赖）"""
+    if requests is None:
+        raise ImportError(
+            "A2A client requires requests. Install it with: pip install requests"
+        )
+
 
 class A2AServer:
     """A2A 服务器（使用 Flask 提供 HTTP API）"""
 
+    __slots__ = ("name", "description", "version", "capabilities", "skills", "_app")
+
     def __init__(
         self,
         name: str,
@@ -43,6 +66,7 @@ class A2AServer:
         self.version = version
         self.capabilities = capabilities or {}
         self.skills = {}
+        self._app = None
 
     def add_skill(self, skill_name: str, func):
         """添加技能到服务器"""
@@ -56,16 +80,22 @@ class A2AServer:
             return func
         return decorator
 
-    def run(self, host: str = "0.0.0.0", port: int = 5000):
-        """运行服务器（使用 Flask 提供 HTTP API）"""
-        try:
-            from flask import Flask, request, jsonify
-        except ImportError:
+    def _ensure_app(self):
+        """获取（必要时构建）Flask 应用，路由表每个实例只注册一次"""
+        if self._app is None:
+            self._app = self._build_app()
+        return self._app
+
+    def _build_app(self):
+        """构建 Flask 应用并注册路由（路由在请求时动态查找 self.skills）"""
+        if flask is None:
             raise ImportError(
                 "A2A server requires Flask. Install it with: pip install flask"
             )
+        request = flask.request
+        jsonify = flask.jsonify
 
-        app = Flask(self.name)
+        app = flask.Flask(self.name)
 
         # 禁用 Flask 的日志输出（可选）
         import logging
@@ -148,6 +178,12 @@ class A2AServer:
             """健康检查"""
             return jsonify({"status": "healthy", "agent": self.name})
 
+        return app
+
+    def run(self, host: str = "0.0.0.0", port: int = 5000):
+        """运行服务器（使用 Flask 提供 HTTP API）"""
+        app = self._ensure_app()
+
         # 启动服务器
         print(f"🚀 A2A 服务器 '{self.name}' 启动在 {host}:{port}")
         print(f"📋 描述: {self.description}")
@@ -177,6 +213,8 @@ class A2AServer:
 class A2AClient:
     """A2A 客户端（通过 HTTP 与 A2AServer 通信）"""
 
+    __slots__ = ("server_url",)
+
     def __init__(self, server_url: str):
         """
         初始化 A2A 客户端
@@ -196,8 +234,8 @@ class A2AClient:
         Returns:
             Agent 的回答
         """
+        _require_requests()
         try:
-            import requests
             response = requests.post(
                 f"{self.server_url}/ask",
                 json={"question": question},
@@ -219,8 +257,8 @@ class A2AClient:
         Returns:
             执行结果
         """
+        _require_requests()
         try:
-            import requests
             response = requests.post(
                 f"{self.server_url}/execute/{skill_name}",
                 json={"text": text},
@@ -233,8 +271,8 @@ class A2AClient:
 
     def get_info(self) -> Dict[str, Any]:
         """获取 Agent 信息"""
+        _require_requests()
         try:
-            import requests
             response = requests.get(f"{self.server_url}/info", timeout=10)
             response.raise_for_status()
             return response.json()
@@ -243,8 +281,8 @@ class A2AClient:
 
     def list_skills(self) -> List[str]:
         """列出 Agent 的技能"""
+        _require_requests()
         try:
-            import requests
             response = requests.get(f"{self.server_url}/skills", timeout=10)
             response.raise_for_status()
             return response.json().get("skills", [])
@@ -255,6 +293,8 @@ class A2AClient:
 class AgentNetwork:
     """基于官方 a2a-sdk 库的 Agent 网络（概念性实现）"""
 
+    __slots__ = ("name", "agents")
+
     def __init__(self, name: str = "Agent Network"):
         """
         初始化 Agent 网络
@@ -290,12 +330,14 @@ class AgentNetwork:
 
         return A2AClient(self.agents[agent_name])
 
+    def iter_agents(self) -> Iterator[Dict[str, Any]]:
+        """惰性遍历所有 Agent（不物化列表）"""
+        for name, url in self.agents.items():
+            yield {"name": name, "url": url}
+
     def list_agents(self) -> List[Dict[str, Any]]:
         """列出所有 Agent"""
-        return [
-            {"name": name, "url": url}
-            for name, url in self.agents.items()
-        ]
+        return list(self.iter_agents())
 
     def discover_agents(self, urls: List[str]) -> int:
         """
@@ -323,6 +365,8 @@ class AgentNetwork:
 class AgentRegistry:
     """基于官方 a2a-sdk 库的 Agent 注册中心（概念性实现）"""
 
+    __slots__ = ("name", "description", "registered_agents")
+
     def __init__(self, name: str = "Agent Registry", description: str = "Central agent registry"):
         """
         初始化 Agent 注册中心
@@ -340,20 +384,33 @@ class AgentRegistry:
         self.registered_agents[agent_name] = {
             "url": agent_url,
             "metadata": metadata or {},
-            "registered_at": __import__("datetime").datetime.now().isoformat()
+            "registered_at": time.time()
         }
 
+    def registered_at_iso(self, agent_name: str) -> Optional[str]:
+        """获取 Agent 注册时间（ISO 格式，便于展示）"""
+        info = self.registered_agents.get(agent_name)
+        if info is None:
+            return None
+        return datetime.fromtimestamp(info["registered_at"]).isoformat()
+
     def unregister_agent(self, agent_name: str):
         """注销 Agent"""
         if agent_name in self.registered_agents:
             del self.registered_agents[agent_name]
 
+    def iter_agents(self) -> Iterator[Dict[str, Any]]:
+        """
+        惰性遍历所有注册的 Agent
+
+        仅需计数或过滤时使用，避免每次调用都复制全部注册信息。
+        """
+        for name, info in self.registered_agents.items():
+            yield {"name": name, **info}
+
     def list_agents(self) -> List[Dict[str, Any]]:
         """列出所有注册的 Agent"""
-        return [
-            {"name": name, **info}
-            for name, info in self.registered_agents.items()
-        ]
+        return list(self.iter_agents())
 
     def find_agent(self, agent_name: str) -> Optional[Dict[str, Any]]:
         """查找特定 Agent"""
@@ -370,6 +427,12 @@ class AgentRegistry:
         }
 
 
+@lru_cache(maxsize=4096)
+def _compile_expr(expression: str):
+    """编译算术表达式并缓存，重复的表达式无需再次编译"""
+    return compile(expression, "<calc>", "eval")
+
+
 # 示例：创建一个简单的 A2A Agent
 def create_example_agent() -> A2AServer:
     """创建一个示例 A2A Agent"""
@@ -399,7 +462,7 @@ def create_example_agent() -> A2AServer:
                 allowed_chars = set("0123456789+-*/() .")
                 if not all(c in allowed_chars for c in expression):
                     return "Error: Invalid characters in expression"
-                result = eval(expression)
+                result = eval(_compile_expr(expression), {"__builtins__": {}}, {})
                 return f"The result is: {result}"
             except Exception as e:
                 return f"Calculation error: {str(e)}"
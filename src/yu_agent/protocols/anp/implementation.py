@@ -7,9 +7,28 @@
 这里我们创建一个简化的包装器，使其更易于使用。
 """
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional, Sequence, Set, Tuple
+from array import array
+from collections import OrderedDict, defaultdict
 import asyncio
-import json
+import time
+
+# 序列化优先使用 orjson（直接输出 UTF-8 bytes），未安装时回退到标准库 json
+try:
+    import orjson
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:
+    import json as _json
+
+    def _dumps(obj: Any) -> bytes:
+        return _json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+    _loads = _json.loads
+
+
+# 未命中路径共享的空结果（不可变），避免轮询时每次分配新的空列表
+_EMPTY: Tuple = ()
 
 
 # 由于 agent-connect 的 API 比较底层，我们创建一个简化的实现
@@ -18,6 +37,11 @@ import json
 class ServiceInfo:
     """服务信息"""
 
+    # to_dict 导出的字段
+    _FIELDS = ("service_id", "service_type", "endpoint", "service_name", "capabilities", "metadata")
+
+    __slots__ = _FIELDS + ("_registered", "_last_seen")
+
     def __init__(
         self,
         service_id: str,
@@ -33,17 +57,32 @@ class ServiceInfo:
         self.service_name = service_name or service_id
         self.capabilities = capabilities or []
         self.metadata = metadata or {}
+        # 最近一次注册时的 (指纹, 服务类型) 快照，由 ANPDiscovery.register_service 写入
+        self._registered: Optional[Tuple[Optional[int], str]] = None
+        self._last_seen: float = time.monotonic()
+
+    @property
+    def fingerprint(self) -> Optional[int]:
+        """
+        服务内容指纹（按当前字段计算）
+
+        用于判断重复注册是否与已有条目完全一致；元数据含不可哈希值时返回 None。
+        """
+        try:
+            return hash((
+                self.service_id,
+                self.service_type,
+                self.endpoint,
+                self.service_name,
+                tuple(self.capabilities),
+                tuple(sorted(self.metadata.items())),
+            ))
+        except TypeError:
+            return None
 
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典"""
-        return {
-            "service_id": self.service_id,
-            "service_type": self.service_type,
-            "endpoint": self.endpoint,
-            "service_name": self.service_name,
-            "capabilities": self.capabilities,
-            "metadata": self.metadata
-        }
+        return {field: getattr(self, field) for field in self._FIELDS}
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'ServiceInfo':
@@ -57,13 +96,30 @@ class ServiceInfo:
             metadata=data.get("metadata", {})
         )
 
+    def to_json_bytes(self) -> bytes:
+        """序列化为 JSON bytes"""
+        return _dumps(self.to_dict())
+
+    @classmethod
+    def from_json_bytes(cls, data: bytes) -> 'ServiceInfo':
+        """从 JSON bytes 创建"""
+        return cls.from_dict(_loads(data))
+
 
 class ANPDiscovery:
     """基于 agent-connect 的服务发现实现"""
+
+    # 查询缓存的最大条目数（LRU 淘汰）
+    QUERY_CACHE_SIZE = 256
     
     def __init__(self):
         """初始化服务发现"""
         self._services: Dict[str, ServiceInfo] = {}
+        # 二级索引：service_type -> service_id 集合，按类型发现时无需全表扫描
+        self._by_type: Dict[str, Set[str]] = defaultdict(set)
+        # 查询缓存：注册表每次变更都会递增版本号，缓存条目版本不一致即失效
+        self._version: int = 0
+        self._query_cache: "OrderedDict[Tuple, Tuple[int, List[ServiceInfo]]]" = OrderedDict()
         
     def register_service(self, service: ServiceInfo) -> bool:
         """
@@ -75,7 +131,22 @@ class ANPDiscovery:
         Returns:
             是否注册成功
         """
+        fingerprint = service.fingerprint
+        existing = self._services.get(service.service_id)
+        if existing is not None:
+            # 与已有条目注册时的快照比较：调用方就地修改已注册对象后再次注册，
+            # 当前指纹会与快照不同，按更新处理
+            registered_fingerprint, registered_type = existing._registered
+            if fingerprint is not None and fingerprint == registered_fingerprint:
+                # 相同内容的重复注册（心跳）：只刷新存活时间，不触发索引与缓存失效
+                existing._last_seen = time.monotonic()
+                return True
+            self._discard_from_type_index(service.service_id, registered_type)
+        service._registered = (fingerprint, service.service_type)
+        service._last_seen = time.monotonic()
         self._services[service.service_id] = service
+        self._by_type[service.service_type].add(service.service_id)
+        self._version += 1
         return True
         
     def unregister_service(self, service_id: str) -> bool:
@@ -88,16 +159,44 @@ class ANPDiscovery:
         Returns:
             是否注销成功
         """
-        if service_id in self._services:
-            del self._services[service_id]
-            return True
-        return False
+        service = self._services.pop(service_id, None)
+        if service is None:
+            return False
+        self._discard_from_type_index(service_id, service._registered[1])
+        self._version += 1
+        return True
+
+    def purge_expired(self, ttl: float) -> int:
+        """
+        移除超过 ttl 秒未重新注册的服务
+
+        服务通过定期重复注册证明存活；由调用方按需（如定时任务）调用本方法。
+        
+        Args:
+            ttl: 存活时间（秒）
+            
+        Returns:
+            被移除的服务数量
+        """
+        deadline = time.monotonic() - ttl
+        expired = [sid for sid, svc in self._services.items() if svc._last_seen < deadline]
+        for service_id in expired:
+            self.unregister_service(service_id)
+        return len(expired)
+
+    def _discard_from_type_index(self, service_id: str, service_type: str):
+        """从类型索引中移除服务（按注册时的类型），桶为空时一并删除"""
+        bucket = self._by_type.get(service_type)
+        if bucket is not None:
+            bucket.discard(service_id)
+            if not bucket:
+                del self._by_type[service_type]
         
     def discover_services(
         self,
         service_type: Optional[str] = None,
         filters: Optional[Dict[str, Any]] = None
-    ) -> List[ServiceInfo]:
+    ) -> Sequence[ServiceInfo]:
         """
         发现服务
         
@@ -106,22 +205,52 @@ class ANPDiscovery:
             filters: 过滤条件（可选）
             
         Returns:
-            服务列表
+            服务列表；没有任何已注册服务时返回共享的不可变空元组
         """
-        services = list(self._services.values())
-        
-        # 按类型过滤
+        if not self._services:
+            return _EMPTY
+
+        try:
+            key = (service_type, frozenset((filters or {}).items()))
+        except TypeError:
+            # 过滤值不可哈希时不走缓存
+            return self._discover_uncached(service_type, filters)
+
+        cached = self._query_cache.get(key)
+        if cached is not None and cached[0] == self._version:
+            self._query_cache.move_to_end(key)
+            return list(cached[1])
+
+        services = self._discover_uncached(service_type, filters)
+        self._query_cache[key] = (self._version, services)
+        self._query_cache.move_to_end(key)
+        if len(self._query_cache) > self.QUERY_CACHE_SIZE:
+            self._query_cache.popitem(last=False)
+        # 返回浅拷贝，避免调用方修改缓存内容
+        return list(services)
+
+    def _discover_uncached(
+        self,
+        service_type: Optional[str],
+        filters: Optional[Dict[str, Any]]
+    ) -> List[ServiceInfo]:
+        """不经缓存直接执行服务发现"""
+        # 按类型过滤：直接命中类型索引，只在候选集合上继续过滤
         if service_type:
-            services = [s for s in services if s.service_type == service_type]
+            services = [self._services[sid] for sid in self._by_type.get(service_type, ())]
+        else:
+            services = list(self._services.values())
             
-        # 按元数据过滤
-        if filters:
-            def matches_filters(service: ServiceInfo) -> bool:
-                for key, value in filters.items():
-                    if service.metadata.get(key) != value:
-                        return False
-                return True
-            services = [s for s in services if matches_filters(s)]
+        # 按元数据过滤：过滤条件只物化一次，单条件时跳过 all() 生成器
+        items = tuple((filters or {}).items())
+        if len(items) == 1:
+            key, value = items[0]
+            services = [s for s in services if s.metadata.get(key) == value]
+        elif items:
+            services = [
+                s for s in services
+                if all(s.metadata.get(key) == value for key, value in items)
+            ]
             
         return services
         
@@ -154,7 +283,44 @@ class ANPNetwork:
         """
         self.network_id = network_id
         self._nodes: Dict[str, Dict[str, Any]] = {}
-        self._connections: Dict[str, List[str]] = {}
+        # 邻接集合：成员判断 O(1)
+        self._connections: Dict[str, Set[str]] = {}
+        # 反向索引：to_node -> 指向它的源节点集合，移除节点时无需扫描全部邻接集合
+        self._incoming: Dict[str, Set[str]] = defaultdict(set)
+        # 两跳可达索引：from_node -> {目标节点: 中转节点}，按需构建，拓扑变化时清空
+        self._two_hop_cache: Dict[str, Dict[str, str]] = {}
+        # 广播接收方缓存：from_node -> 邻居元组，拓扑变化时清空
+        self._bcast_cache: Dict[str, Tuple[str, ...]] = {}
+        # CSR（压缩稀疏行）只读视图：节点映射为整数 id，邻居存放在连续数组中
+        # 第 i 个节点的邻居为 _neighbors_flat[_offsets[i]:_offsets[i + 1]]
+        # 拓扑变化时仅标记 _dirty，下次多跳路由时再惰性重建
+        self._node_index: Dict[str, int] = {}
+        self._id_to_name: List[str] = []
+        self._neighbors_flat: array = array('i')
+        self._offsets: array = array('i')
+        self._dirty: bool = True
+
+    def _invalidate_topology(self):
+        """拓扑发生变化：清空两跳索引并标记 CSR 视图需要重建"""
+        self._two_hop_cache.clear()
+        self._bcast_cache.clear()
+        self._dirty = True
+
+    def _rebuild_csr(self):
+        """将邻接集合压缩为 CSR 数组（仅在拓扑变化后执行）"""
+        if not self._dirty:
+            return
+        self._id_to_name = list(self._nodes)
+        self._node_index = {name: i for i, name in enumerate(self._id_to_name)}
+        index = self._node_index
+        flat = array('i')
+        offsets = array('i', [0])
+        for name in self._id_to_name:
+            flat.extend(index[n] for n in self._connections.get(name, ()) if n in index)
+            offsets.append(len(flat))
+        self._neighbors_flat = flat
+        self._offsets = offsets
+        self._dirty = False
         
     def add_node(self, node_id: str, endpoint: str, metadata: Optional[Dict[str, Any]] = None):
         """
@@ -171,7 +337,11 @@ class ANPNetwork:
             "metadata": metadata or {},
             "status": "active"
         }
-        self._connections[node_id] = []
+        # 重复添加会重置出边，同步清理反向索引中的旧记录
+        for target in self._connections.get(node_id, ()):
+            self._incoming[target].discard(node_id)
+        self._connections[node_id] = set()
+        self._invalidate_topology()
         
     def remove_node(self, node_id: str) -> bool:
         """
@@ -185,11 +355,17 @@ class ANPNetwork:
         """
         if node_id in self._nodes:
             del self._nodes[node_id]
-            del self._connections[node_id]
-            # 移除其他节点到此节点的连接
-            for connections in self._connections.values():
-                if node_id in connections:
-                    connections.remove(node_id)
+            # 移除其他节点到此节点的连接：只访问反向索引中的源节点，O(deg)
+            for src in self._incoming.pop(node_id, ()):
+                connections = self._connections.get(src)
+                if connections is not None:
+                    connections.discard(node_id)
+            # 移除此节点的出边在反向索引中的记录
+            for target in self._connections.pop(node_id, ()):
+                incoming = self._incoming.get(target)
+                if incoming is not None:
+                    incoming.discard(node_id)
+            self._invalidate_topology()
             return True
         return False
         
@@ -203,21 +379,27 @@ class ANPNetwork:
         """
         if from_node in self._connections and to_node in self._nodes:
             if to_node not in self._connections[from_node]:
-                self._connections[from_node].append(to_node)
+                self._connections[from_node].add(to_node)
+                self._incoming[to_node].add(from_node)
+                self._invalidate_topology()
                 
     def route_message(
         self,
         from_node: str,
         to_node: str,
-        message: Dict[str, Any]
+        message: Dict[str, Any],
+        max_hops: int = 6
     ) -> Optional[List[str]]:
         """
-        路由消息（简单的直接路由）
+        路由消息（最短跳数路由）
+
+        先尝试直连与一跳中转两条快速路径，失败后再做有界 BFS。
         
         Args:
             from_node: 源节点 ID
             to_node: 目标节点 ID
             message: 消息内容
+            max_hops: 最大跳数，限制搜索范围
             
         Returns:
             路由路径，如果无法路由则返回 None
@@ -225,18 +407,65 @@ class ANPNetwork:
         if from_node not in self._nodes or to_node not in self._nodes:
             return None
             
-        # 简单实现：直接路由
-        if to_node in self._connections.get(from_node, []):
+        if max_hops < 1:
+            return None
+
+        # 快速路径：直接路由
+        if to_node in self._connections[from_node]:
             return [from_node, to_node]
+        if max_hops < 2:
+            return None
             
-        # 尝试通过一跳中转
-        for intermediate in self._connections.get(from_node, []):
-            if to_node in self._connections.get(intermediate, []):
-                return [from_node, intermediate, to_node]
+        # 快速路径：通过一跳中转
+        intermediate = self._get_two_hop(from_node).get(to_node)
+        if intermediate is not None:
+            return [from_node, intermediate, to_node]
+        if max_hops < 3:
+            return None
+
+        # 有界逐层 BFS（无权图上即最短跳数路径），在 CSR 整数数组上进行
+        self._rebuild_csr()
+        offsets = self._offsets
+        flat = self._neighbors_flat
+        src = self._node_index[from_node]
+        dst = self._node_index[to_node]
+        parent = [-1] * len(self._id_to_name)
+        parent[src] = src
+        frontier = [src]
+        for _ in range(max_hops):
+            next_frontier = []
+            for u in frontier:
+                for i in range(offsets[u], offsets[u + 1]):
+                    v = flat[i]
+                    if parent[v] != -1:
+                        continue
+                    parent[v] = u
+                    if v == dst:
+                        path = [v]
+                        while v != src:
+                            v = parent[v]
+                            path.append(v)
+                        names = self._id_to_name
+                        return [names[i] for i in reversed(path)]
+                    next_frontier.append(v)
+            if not next_frontier:
+                break
+            frontier = next_frontier
                 
         return None
+
+    def _get_two_hop(self, from_node: str) -> Dict[str, str]:
+        """获取（必要时构建）from_node 的两跳可达索引"""
+        two_hop = self._two_hop_cache.get(from_node)
+        if two_hop is None:
+            two_hop = {}
+            for intermediate in self._connections[from_node]:
+                for target in self._connections.get(intermediate, ()):
+                    two_hop.setdefault(target, intermediate)
+            self._two_hop_cache[from_node] = two_hop
+        return two_hop
         
-    def broadcast_message(self, from_node: str, message: Dict[str, Any]) -> List[str]:
+    def broadcast_message(self, from_node: str, message: Dict[str, Any]) -> Sequence[str]:
         """
         广播消息到所有连接的节点
         
@@ -245,12 +474,45 @@ class ANPNetwork:
             message: 消息内容
             
         Returns:
-            接收消息的节点列表
+            接收消息的节点列表；源节点不存在时返回共享的不可变空元组
         """
         if from_node not in self._connections:
-            return []
+            return _EMPTY
+            
+        # 返回列表副本以保持兼容（调用方可以修改）；只需遍历时用 iter_broadcast_recipients
+        return list(self._broadcast_recipients(from_node))
+
+    def iter_broadcast_recipients(self, from_node: str) -> Iterator[str]:
+        """遍历广播接收方（不复制邻居列表）"""
+        return iter(self._broadcast_recipients(from_node))
+
+    def _broadcast_recipients(self, from_node: str) -> Tuple[str, ...]:
+        """获取（必要时缓存）from_node 的邻居元组"""
+        recipients = self._bcast_cache.get(from_node)
+        if recipients is None:
+            recipients = tuple(self._connections.get(from_node, _EMPTY))
+            if from_node in self._connections:
+                self._bcast_cache[from_node] = recipients
+        return recipients
+
+    def broadcast_message_bytes(
+        self,
+        from_node: str,
+        message: Dict[str, Any]
+    ) -> Tuple[bytes, Sequence[str]]:
+        """
+        广播消息（预先序列化版本）
+
+        消息只序列化一次，所有接收方共享同一份 bytes。
+        
+        Args:
+            from_node: 源节点 ID
+            message: 消息内容
             
-        return self._connections[from_node].copy()
+        Returns:
+            (序列化后的消息, 接收消息的节点列表)
+        """
+        return _dumps(message), self.broadcast_message(from_node, message)
         
     def get_network_stats(self) -> Dict[str, Any]:
         """
@@ -282,7 +544,7 @@ class ANPNetwork:
         """
         if node_id in self._nodes:
             node_info = self._nodes[node_id].copy()
-            node_info["connections"] = self._connections[node_id].copy()
+            node_info["connections"] = list(self._connections[node_id])
             return node_info
         return None
 
@@ -0,0 +1,314 @@
+"""
+Chrome / ChromeDriver 辅助函数
+
+供各个 Selenium 服务器脚本共用：
+- find_chrome_binary: 查找 Chrome 浏览器可执行文件，每个进程只探测一次
+- build_chrome_options: 按统一模板构建 ChromeOptions
+- resolve_chromedriver_path: 解析 ChromeDriver 路径，结果缓存在进程内和磁盘上，
+  后续启动无需再调用 ChromeDriverManager().install()
+- create_chrome_driver: 启动 Chrome WebDriver，缓存的驱动版本不匹配时重新解析后重试一次
+- widen_connection_pool: 放大 WebDriver 到 ChromeDriver 的 urllib3 连接池
+- css_locator / clickable / present: 缓存的定位元组与等待条件
+- screenshot_result: 把 PNG 字节整理成截图工具的返回结果（inline 或写盘）
+- run_batch: 批量工具共用的操作分发
+"""
+
+import base64
+import json
+import logging
+import os
+import shutil
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 跨进程持久化的 ChromeDriver 路径缓存
+DRIVER_PATH_CACHE = Path.home() / ".cache" / "yu_agent" / "chromedriver_path"
+
+# Chrome 安装位置（绝对路径）与 PATH 中的命令名，按优先级排列
+CHROME_PATHS = (
+    r"C:\Program Files\Google\Chrome\Application\chrome.exe",
+    r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
+)
+CHROME_COMMANDS = ("google-chrome", "google-chrome-stable", "chromium")
+
+# 所有 Selenium 服务器共用的 Chrome 启动参数模板
+CHROME_ARGS = (
+    "--headless=new",
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-blink-features=AutomationControlled",
+    "--disable-proxy-auto-detect",
+)
+CHROME_EXPERIMENTAL_OPTIONS = (
+    ("excludeSwitches", ["enable-automation"]),
+    ("useAutomationExtension", False),
+)
+
+
+@lru_cache(maxsize=1)
+def find_chrome_binary() -> Optional[str]:
+    """
+    查找 Chrome 浏览器可执行文件
+
+    绝对路径用 os.path.isfile 判断；命令名通过 shutil.which 在 PATH 中查找
+    （Path("google-chrome").exists() 只会检查当前目录）。结果在进程内缓存。
+
+    Returns:
+        Chrome 路径，找不到时返回 None（交给 Selenium 自行查找）
+    """
+    for path in CHROME_PATHS:
+        if os.path.isfile(path):
+            return path
+    for command in CHROME_COMMANDS:
+        found = shutil.which(command)
+        if found:
+            return found
+    return None
+
+
+def build_chrome_options(chrome_binary: Optional[str] = None):
+    """
+    按 CHROME_ARGS / CHROME_EXPERIMENTAL_OPTIONS 模板构建 ChromeOptions
+
+    每次返回新的对象（ChromeOptions 是可变的，不能在多个驱动间共享）。
+
+    Args:
+        chrome_binary: Chrome 可执行文件路径（可选）
+    """
+    from selenium import webdriver
+
+    options = webdriver.ChromeOptions()
+    if chrome_binary:
+        options.binary_location = chrome_binary
+    for arg in CHROME_ARGS:
+        options.add_argument(arg)
+    for name, value in CHROME_EXPERIMENTAL_OPTIONS:
+        # 列表值每次复制，避免不同 options 对象共享同一个可变列表
+        options.add_experimental_option(name, list(value) if isinstance(value, list) else value)
+    return options
+
+
+@lru_cache(maxsize=1)
+def resolve_chromedriver_path() -> Optional[str]:
+    """
+    解析 ChromeDriver 可执行文件路径
+
+    优先读取磁盘缓存（路径仍存在时直接使用），未命中时才调用
+    ChromeDriverManager().install() 并写回缓存。
+
+    Returns:
+        ChromeDriver 路径；未安装 webdriver_manager 时返回 None，
+        由 Selenium 自带的 Selenium Manager 负责查找驱动
+    """
+    try:
+        cached = DRIVER_PATH_CACHE.read_text(encoding="utf-8").strip()
+    except OSError:
+        cached = ""
+    if cached and os.path.isfile(cached):
+        return cached
+
+    try:
+        from webdriver_manager.chrome import ChromeDriverManager
+    except ImportError:
+        return None
+
+    path = ChromeDriverManager().install()
+    try:
+        DRIVER_PATH_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        DRIVER_PATH_CACHE.write_text(path, encoding="utf-8")
+    except OSError as e:
+        logger.warning(f"⚠️ 无法写入ChromeDriver路径缓存: {e}")
+    return path
+
+
+def invalidate_chromedriver_path():
+    """
+    丢弃缓存的 ChromeDriver 路径
+
+    Chrome 升级后旧驱动版本不匹配时调用，下次解析会重新走 ChromeDriverManager。
+    """
+    resolve_chromedriver_path.cache_clear()
+    try:
+        DRIVER_PATH_CACHE.unlink()
+    except OSError:
+        pass
+
+
+def create_chrome_driver(options, use_driver_manager: bool = True):
+    """
+    使用解析出的 ChromeDriver 启动 Chrome WebDriver
+
+    缓存的驱动与当前 Chrome 版本不匹配（SessionNotCreatedException）时，
+    丢弃缓存、重新解析后再试一次。
+
+    Args:
+        options: ChromeOptions
+        use_driver_manager: 为 False 时不解析驱动路径（缓存未命中时
+            resolve_chromedriver_path 会通过 webdriver-manager 联网下载），
+            直接交给 Selenium 自带的 Selenium Manager 查找驱动
+    """
+    from selenium import webdriver
+    from selenium.common.exceptions import SessionNotCreatedException
+    from selenium.webdriver.chrome.service import Service
+
+    if not use_driver_manager:
+        return webdriver.Chrome(options=options)
+
+    # ChromeDriver 路径有缓存，仅在缓存未命中时才调用 webdriver-manager
+    driver_path = resolve_chromedriver_path()
+    try:
+        return webdriver.Chrome(service=Service(driver_path), options=options)
+    except SessionNotCreatedException:
+        if driver_path is None:
+            raise
+        # 缓存的驱动与当前 Chrome 版本不匹配，重新解析后再试一次
+        invalidate_chromedriver_path()
+        return webdriver.Chrome(service=Service(resolve_chromedriver_path()), options=options)
+
+
+def widen_connection_pool(driver, maxsize: int = 20) -> bool:
+    """
+    放大 WebDriver 与 ChromeDriver 之间的 urllib3 连接池
+
+    Selenium 默认每个主机只保留 1 个连接，多个线程同时发送命令时会串行化并
+    报 "Connection pool is full"。这里直接修改 RemoteConnection 持有的
+    PoolManager 的 connection_pool_kw，不依赖只在较新 Selenium 中才有的 ClientConfig。
+
+    Args:
+        driver: WebDriver 实例
+        maxsize: 每个主机的最大连接数
+
+    Returns:
+        是否修改成功（Selenium 内部结构不符合预期时返回 False，保持默认行为）
+    """
+    conn = getattr(getattr(driver, "command_executor", None), "_conn", None)
+    pool_kw = getattr(conn, "connection_pool_kw", None)
+    if pool_kw is None:
+        return False
+    pool_kw["maxsize"] = maxsize
+    # 丢弃已按旧参数创建的连接池，后续请求按新的 maxsize 重新建池
+    conn.clear()
+    return True
+
+
+# ============================================================================
+# 定位器缓存 - 同一选择器复用同一个定位元组与等待条件对象
+# ============================================================================
+
+# WebDriverWait 轮询间隔（秒），默认 0.5 秒会让已就绪的元素平白多等数百毫秒
+POLL_FREQUENCY = 0.05
+
+
+@lru_cache(maxsize=512)
+def css_locator(selector: str):
+    """CSS 选择器 -> (By.CSS_SELECTOR, selector) 定位元组"""
+    from selenium.webdriver.common.by import By
+    return (By.CSS_SELECTOR, selector)
+
+
+@lru_cache(maxsize=512)
+def clickable(selector: str):
+    """缓存的 element_to_be_clickable 等待条件（条件对象无状态，可复用）"""
+    from selenium.webdriver.support import expected_conditions as EC
+    return EC.element_to_be_clickable(css_locator(selector))
+
+
+@lru_cache(maxsize=512)
+def present(selector: str):
+    """缓存的 presence_of_element_located 等待条件"""
+    from selenium.webdriver.support import expected_conditions as EC
+    return EC.presence_of_element_located(css_locator(selector))
+
+
+# ============================================================================
+# 工具结果
+# ============================================================================
+
+def screenshot_result(png: bytes, output_path: Optional[str] = None, inline: bool = False) -> Dict[str, Any]:
+    """
+    把截图的 PNG 字节整理成工具返回结果
+
+    Args:
+        png: driver.get_screenshot_as_png() 的结果，大小即字节数，无需写盘后再 stat
+        output_path: 截图保存路径（inline=True 时忽略）
+        inline: 为 True 时以 base64 返回 PNG 数据，不写磁盘
+
+    Returns:
+        结果字典
+    """
+    if inline:
+        logger.info(f"📸 截图完成: ({len(png)} bytes, inline)")
+        return {
+            "success": True,
+            "message": "✅ 截图成功",
+            "image_base64": base64.b64encode(png).decode("ascii"),
+            "size": len(png)
+        }
+
+    # 确保输出目录存在，并转换为绝对路径
+    output_path = str(Path(output_path).resolve())
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    Path(output_path).write_bytes(png)
+
+    logger.info(f"📸 截图保存: {output_path} ({len(png)} bytes)")
+    return {
+        "success": True,
+        "message": f"✅ 截图成功: {output_path}",
+        "file": output_path,
+        "size": len(png)
+    }
+
+
+def run_batch(ops: Dict[str, Callable[..., Dict[str, Any]]], actions: List[Dict[str, Any]],
+              stop_on_error: bool = False, reserved: frozenset = frozenset()) -> Dict[str, Any]:
+    """
+    按顺序执行批量操作
+
+    Args:
+        ops: op 名 -> 操作函数，返回结果字典或其 JSON 字符串
+        actions: 操作列表，形如 [{"op": "navigate", "url": ...}]，
+            也可以把参数放在 "args" 中：[{"op": "navigate", "args": {"url": ...}}]
+        stop_on_error: 为 True 时遇到第一个失败的操作即停止，后续操作不再执行
+        reserved: 调用方已绑定到操作函数上的参数名（如 driver、session_id）；
+            操作中出现这些参数时直接判为失败，不允许覆盖绑定的值
+
+    Returns:
+        结果字典，results 与 actions 逐条对应（提前停止时只包含已执行的操作）
+    """
+    results = []
+    for action in actions or []:
+        if not isinstance(action, dict):
+            # 非字典的条目也占一个结果位置，results 始终与 actions 一一对应
+            result = {"success": False, "error": f"Invalid action: {action!r}"}
+            results.append(result)
+            if stop_on_error:
+                break
+            continue
+        op = action.get("op")
+        args = action.get("args")
+        if args is None:
+            args = {k: v for k, v in action.items() if k != "op"}
+        func = ops.get(op) if isinstance(op, str) else None
+        if func is None:
+            result = {"success": False, "error": f"Unknown op: {op}"}
+        elif isinstance(args, dict) and reserved.intersection(args):
+            names = ", ".join(sorted(reserved.intersection(args)))
+            result = {"success": False, "error": f"Reserved args for {op}: {names}"}
+        else:
+            try:
+                result = func(**args)
+                if isinstance(result, str):
+                    result = json.loads(result)
+            except TypeError as e:
+                result = {"success": False, "error": f"Invalid args for {op}: {e}"}
+        results.append(result)
+        if stop_on_error and not result.get("success"):
+            break
+
+    return {
+        "success": all(r.get("success") for r in results),
+        "results": results
+    }
@@ -38,8 +38,10 @@ client = MCPClient(config)
 ```
 """
 
-from typing import Dict, Any, List, Optional, Union
+from typing import Callable, Dict, Any, List, Optional, Union
 import asyncio
+import logging
+import operator
 import os
 
 try:
@@ -54,6 +56,55 @@ except ImportError:
     SSETransport = None
     StreamableHttpTransport = None
 
+logger = logging.getLogger(__name__)
+
+# list_* 结果字段的批量取值器，避免逐项 hasattr/getattr
+_tool_get = operator.attrgetter("name", "description", "inputSchema")
+_resource_get = operator.attrgetter("uri", "name", "description", "mimeType")
+_prompt_get = operator.attrgetter("name", "description", "arguments")
+
+
+class _ShapeChanged(Exception):
+    """结果形状与已特化的解码器不一致，需要回退到通用路径"""
+
+
+def _decode_contents(items, primary: str, secondary: str) -> Any:
+    """通用解码路径：单项按属性优先级取值，多项返回列表"""
+    if len(items) == 1:
+        content = items[0]
+        if hasattr(content, primary):
+            return getattr(content, primary)
+        elif hasattr(content, secondary):
+            return getattr(content, secondary)
+    return [
+        getattr(c, primary, getattr(c, secondary, str(c)))
+        for c in items
+    ]
+
+
+def _specialize_contents(items, primary: str, secondary: str) -> Optional[Callable]:
+    """根据首次结果的形状生成特化解码器；无法特化时返回 None"""
+    if len(items) != 1:
+        return None
+    for attr in (primary, secondary):
+        if hasattr(items[0], attr):
+            getter = operator.attrgetter(attr)
+
+            def decode(items, _get=getter):
+                if len(items) != 1:
+                    raise _ShapeChanged
+                return _get(items[0])
+            return decode
+    return None
+
+
+_prompt_text_get = operator.attrgetter("text")
+
+
+def _decode_prompt_text(messages) -> List[Dict[str, Any]]:
+    """提示词特化解码：所有消息内容均带 text 属性"""
+    return [{"role": msg.role, "content": _prompt_text_get(msg.content)} for msg in messages]
+
 
 class MCPClient:
     """MCP 客户端，支持多种传输方式"""
@@ -95,105 +146,138 @@ class MCPClient:
         self.server_source = self._prepare_server_source(server_source)
         self.client: Optional[Client] = None
         self._context_manager = None
+        # 结果解码器在首次调用时按结果形状特化，之后直接复用
+        self._tool_result_decoder: Optional[Callable] = None
+        self._resource_result_decoder: Optional[Callable] = None
+        self._prompt_result_decoder: Optional[Callable] = None
 
     def _prepare_server_source(self, server_source: Union[str, List[str], FastMCP, Dict[str, Any]]):
         """准备服务器源，根据类型创建合适的传输配置"""
-        
+        kind = self._classify(server_source)
+        logger.debug("MCP 传输类型: %s (%s)", kind, server_source)
+        return self._BUILDERS[kind](self, server_source)
+
+    def _classify(self, server_source: Any) -> str:
+        """判断服务器源的类型，返回 _BUILDERS 中的键"""
         # 1. FastMCP 实例 - 内存传输
         if isinstance(server_source, FastMCP):
-            print(f"🧠 使用内存传输: {server_source.name}")
-            return server_source
-        
+            return "memory"
         # 2. 配置字典 - 根据配置创建传输
         if isinstance(server_source, dict):
-            print(f"⚙️ 使用配置传输: {server_source.get('transport', 'stdio')}")
-            return self._create_transport_from_config(server_source)
-        
-        # 3. HTTP URL - HTTP/SSE 传输
-        if isinstance(server_source, str) and (server_source.startswith("http://") or server_source.startswith("https://")):
-            transport_type = self.transport_type or "http"
-            print(f"🌐 使用 {transport_type.upper()} 传输: {server_source}")
-            if transport_type == "sse":
-                return SSETransport(url=server_source, **self.transport_kwargs)
-            else:
-                return StreamableHttpTransport(url=server_source, **self.transport_kwargs)
-
-        # 4. Python 脚本路径 - Stdio 传输
-        if isinstance(server_source, str) and server_source.endswith(".py"):
-            print(f"🐍 使用 Stdio 传输 (Python): {server_source}")
+            return "config"
+        if isinstance(server_source, str):
+            # 3. HTTP URL - HTTP/SSE 传输
+            if server_source.startswith(("http://", "https://")):
+                return "sse" if self.transport_type == "sse" else "http"
+            # 4. Python 脚本路径 - Stdio 传输
+            if server_source.endswith(".py"):
+                return "py_script"
+        # 5. 命令列表 - Stdio 传输
+        if isinstance(server_source, list) and len(server_source) >= 1:
+            return "cmd_list"
+        # 6. 其他情况 - 直接返回，让 FastMCP 自动推断
+        return "auto"
+
+    def _build_memory(self, server_source: FastMCP):
+        return server_source
+
+    def _build_http(self, server_source: str):
+        return StreamableHttpTransport(url=server_source, **self.transport_kwargs)
+
+    def _build_sse(self, server_source: str):
+        return SSETransport(url=server_source, **self.transport_kwargs)
+
+    def _build_py_script(self, server_source: str):
+        return PythonStdioTransport(
+            script_path=server_source,
+            args=self.server_args,
+            env=self.env if self.env else None,
+            **self.transport_kwargs
+        )
+
+    def _build_cmd_list(self, server_source: List[str]):
+        if server_source[0] == "python" and len(server_source) > 1 and server_source[1].endswith(".py"):
+            # Python 脚本
             return PythonStdioTransport(
-                script_path=server_source,
-                args=self.server_args,
+                script_path=server_source[1],
+                args=server_source[2:] + self.server_args,
                 env=self.env if self.env else None,
                 **self.transport_kwargs
             )
-
-        # 5. 命令列表 - Stdio 传输
-        if isinstance(server_source, list) and len(server_source) >= 1:
-            print(f"📝 使用 Stdio 传输 (命令): {' '.join(server_source)}")
-            if server_source[0] == "python" and len(server_source) > 1 and server_source[1].endswith(".py"):
-                # Python 脚本
-                return PythonStdioTransport(
-                    script_path=server_source[1],
-                    args=server_source[2:] + self.server_args,
-                    env=self.env if self.env else None,
-                    **self.transport_kwargs
-                )
-            else:
-                # 其他命令，使用通用 Stdio 传输
-                from fastmcp.client.transports import StdioTransport
-                return StdioTransport(
-                    command=server_source[0],
-                    args=server_source[1:] + self.server_args,
-                    env=self.env if self.env else None,
-                    **self.transport_kwargs
-                )
-        
-        # 6. 其他情况 - 直接返回，让 FastMCP 自动推断
-        print(f"🔍 自动推断传输: {server_source}")
+        # 其他命令，使用通用 Stdio 传输
+        from fastmcp.client.transports import StdioTransport
+        return StdioTransport(
+            command=server_source[0],
+            args=server_source[1:] + self.server_args,
+            env=self.env if self.env else None,
+            **self.transport_kwargs
+        )
+
+    def _build_auto(self, server_source: Any):
         return server_source
 
     def _create_transport_from_config(self, config: Dict[str, Any]):
         """从配置字典创建传输"""
         transport_type = config.get("transport", "stdio")
-        
-        if transport_type == "stdio":
-            # 检查是否是 Python 脚本
-            args = config.get("args", [])
-            if args and args[0].endswith(".py"):
-                return PythonStdioTransport(
-                    script_path=args[0],
-                    args=args[1:] + self.server_args,
-                    env=config.get("env"),
-                    cwd=config.get("cwd"),
-                    **self.transport_kwargs
-                )
-            else:
-                # 使用通用 Stdio 传输
-                from fastmcp.client.transports import StdioTransport
-                return StdioTransport(
-                    command=config.get("command", "python"),
-                    args=args + self.server_args,
-                    env=config.get("env"),
-                    cwd=config.get("cwd"),
-                    **self.transport_kwargs
-                )
-        elif transport_type == "sse":
-            return SSETransport(
-                url=config["url"],
-                headers=config.get("headers"),
-                auth=config.get("auth"),
-                **self.transport_kwargs
-            )
-        elif transport_type == "http":
-            return StreamableHttpTransport(
-                url=config["url"],
-                headers=config.get("headers"),
-                auth=config.get("auth"),
+        builder = self._CONFIG_BUILDERS.get(transport_type)
+        if builder is None:
+            raise ValueError(f"Unsupported transport type: {transport_type}")
+        return builder(self, config)
+
+    def _config_stdio(self, config: Dict[str, Any]):
+        # 检查是否是 Python 脚本
+        args = config.get("args", [])
+        if args and args[0].endswith(".py"):
+            return PythonStdioTransport(
+                script_path=args[0],
+                args=args[1:] + self.server_args,
+                env=config.get("env"),
+                cwd=config.get("cwd"),
                 **self.transport_kwargs
             )
-        else:
-            raise ValueError(f"Unsupported transport type: {transport_type}")
+        # 使用通用 Stdio 传输
+        from fastmcp.client.transports import StdioTransport
+        return StdioTransport(
+            command=config.get("command", "python"),
+            args=args + self.server_args,
+            env=config.get("env"),
+            cwd=config.get("cwd"),
+            **self.transport_kwargs
+        )
+
+    def _config_sse(self, config: Dict[str, Any]):
+        return SSETransport(
+            url=config["url"],
+            headers=config.get("headers"),
+            auth=config.get("auth"),
+            **self.transport_kwargs
+        )
+
+    def _config_http(self, config: Dict[str, Any]):
+        return StreamableHttpTransport(
+            url=config["url"],
+            headers=config.get("headers"),
+            auth=config.get("auth"),
+            **self.transport_kwargs
+        )
+
+    # 服务器源类型 -> 传输构建函数
+    _BUILDERS = {
+        "memory": _build_memory,
+        "config": _create_transport_from_config,
+        "http": _build_http,
+        "sse": _build_sse,
+        "py_script": _build_py_script,
+        "cmd_list": _build_cmd_list,
+        "auto": _build_auto,
+    }
+
+    # 配置字典中的 transport -> 传输构建函数
+    _CONFIG_BUILDERS = {
+        "stdio": _config_stdio,
+        "sse": _config_sse,
+        "http": _config_http,
+    }
 
     async def __aenter__(self):
         """异步上下文管理器入口"""
@@ -227,14 +311,21 @@ class MCPClient:
         else:
             tools = []
 
-        return [
-            {
-                "name": tool.name,
-                "description": tool.description or "",
-                "input_schema": tool.inputSchema if hasattr(tool, 'inputSchema') else {}
-            }
-            for tool in tools
-        ]
+        try:
+            return [
+                {"name": n, "description": d or "", "input_schema": schema}
+                for n, d, schema in map(_tool_get, tools)
+            ]
+        except AttributeError:
+            # 个别工具对象缺少 inputSchema 时回退到逐项取值
+            return [
+                {
+                    "name": tool.name,
+                    "description": tool.description or "",
+                    "input_schema": getattr(tool, 'inputSchema', {})
+                }
+                for tool in tools
+            ]
 
     async def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Any:
         """调用 MCP 工具"""
@@ -244,17 +335,17 @@ class MCPClient:
         result = await self.client.call_tool(tool_name, arguments)
 
         # 解析结果 - FastMCP 返回 ToolResult 对象
-        if hasattr(result, 'content') and result.content:
-            if len(result.content) == 1:
-                content = result.content[0]
-                if hasattr(content, 'text'):
-                    return content.text
-                elif hasattr(content, 'data'):
-                    return content.data
-            return [
-                getattr(c, 'text', getattr(c, 'data', str(c)))
-                for c in result.content
-            ]
+        decoder = self._tool_result_decoder
+        if decoder is not None:
+            try:
+                return decoder(result.content)
+            except (_ShapeChanged, AttributeError, TypeError):
+                self._tool_result_decoder = None
+
+        content = getattr(result, 'content', None)
+        if content:
+            self._tool_result_decoder = _specialize_contents(content, 'text', 'data')
+            return _decode_contents(content, 'text', 'data')
         return None
 
     async def list_resources(self) -> List[Dict[str, Any]]:
@@ -263,15 +354,21 @@ class MCPClient:
             raise RuntimeError("Client not connected. Use 'async with client:' context manager.")
 
         result = await self.client.list_resources()
-        return [
-            {
-                "uri": resource.uri,
-                "name": resource.name or "",
-                "description": resource.description or "",
-                "mime_type": getattr(resource, 'mimeType', None)
-            }
-            for resource in result.resources
-        ]
+        try:
+            return [
+                {"uri": uri, "name": n or "", "description": d or "", "mime_type": mime}
+                for uri, n, d, mime in map(_resource_get, result.resources)
+            ]
+        except AttributeError:
+            return [
+                {
+                    "uri": resource.uri,
+                    "name": resource.name or "",
+                    "description": resource.description or "",
+                    "mime_type": getattr(resource, 'mimeType', None)
+                }
+                for resource in result.resources
+            ]
 
     async def read_resource(self, uri: str) -> Any:
         """读取资源内容"""
@@ -281,17 +378,17 @@ class MCPClient:
         result = await self.client.read_resource(uri)
 
         # 解析资源内容
-        if hasattr(result, 'contents') and result.contents:
-            if len(result.contents) == 1:
-                content = result.contents[0]
-                if hasattr(content, 'text'):
-                    return content.text
-                elif hasattr(content, 'blob'):
-                    return content.blob
-            return [
-                getattr(c, 'text', getattr(c, 'blob', str(c)))
-                for c in result.contents
-            ]
+        decoder = self._resource_result_decoder
+        if decoder is not None:
+            try:
+                return decoder(result.contents)
+            except (_ShapeChanged, AttributeError, TypeError):
+                self._resource_result_decoder = None
+
+        contents = getattr(result, 'contents', None)
+        if contents:
+            self._resource_result_decoder = _specialize_contents(contents, 'text', 'blob')
+            return _decode_contents(contents, 'text', 'blob')
         return None
 
     async def list_prompts(self) -> List[Dict[str, Any]]:
@@ -300,14 +397,20 @@ class MCPClient:
             raise RuntimeError("Client not connected. Use 'async with client:' context manager.")
 
         result = await self.client.list_prompts()
-        return [
-            {
-                "name": prompt.name,
-                "description": prompt.description or "",
-                "arguments": getattr(prompt, 'arguments', [])
-            }
-            for prompt in result.prompts
-        ]
+        try:
+            return [
+                {"name": n, "description": d or "", "arguments": args}
+                for n, d, args in map(_prompt_get, result.prompts)
+            ]
+        except AttributeError:
+            return [
+                {
+                    "name": prompt.name,
+                    "description": prompt.description or "",
+                    "arguments": getattr(prompt, 'arguments', [])
+                }
+                for prompt in result.prompts
+            ]
 
     async def get_prompt(self, prompt_name: str, arguments: Optional[Dict[str, str]] = None) -> List[Dict[str, Any]]:
         """获取提示词内容"""
@@ -317,13 +420,22 @@ class MCPClient:
         result = await self.client.get_prompt(prompt_name, arguments or {})
 
         # 解析提示词消息
-        if hasattr(result, 'messages') and result.messages:
+        if self._prompt_result_decoder is not None:
+            try:
+                return self._prompt_result_decoder(result.messages)
+            except (AttributeError, TypeError):
+                self._prompt_result_decoder = None
+
+        messages = getattr(result, 'messages', None)
+        if messages:
+            if all(hasattr(msg.content, 'text') for msg in messages):
+                self._prompt_result_decoder = _decode_prompt_text
             return [
                 {
                     "role": msg.role,
                     "content": getattr(msg.content, 'text', str(msg.content)) if hasattr(msg.content, 'text') else str(msg.content)
                 }
-                for msg in result.messages
+                for msg in messages
             ]
         return []
 
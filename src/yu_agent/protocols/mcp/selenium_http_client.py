@@ -4,32 +4,70 @@ Selenium HTTP客户端 - 连接到HTTP服务器的MCP工具包装
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import asyncio
 import json
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
 
 logger = logging.getLogger(__name__)
 
+# 所有 SeleniumHTTPClient 实例共享一个连接池（通常都连接同一个本地服务器）。
+# requests.Session 发起相互独立的请求时是线程安全的，无需额外加锁。
+# 连接错误（请求尚未发出）自动重试；POST 的读错误不重试。
+_SESSION = requests.Session()
+_SESSION.mount("http://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(total=2, backoff_factor=0.1)
+))
+
 
 class SeleniumHTTPClient:
     """连接到Selenium HTTP服务器的客户端"""
 
-    def __init__(self, host: str = "127.0.0.1", port: int = 18888):
+    def __init__(self, host: str = "127.0.0.1", port: int = 18888,
+                 session_id: Optional[str] = None):
         """
         初始化客户端
 
         Args:
             host: 服务器地址
             port: 服务器端口
+            session_id: 会话ID（可选），服务器为每个会话分配独立的浏览器
         """
         self.base_url = f"http://{host}:{port}"
         self.timeout = 60
+        self.session_id = session_id
+
+    def __enter__(self) -> "SeleniumHTTPClient":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close_session()
+
+    def close_session(self):
+        """
+        释放共享连接池中的空闲连接（不会关闭服务器端浏览器，浏览器请用 close()）
+
+        共享 Session 关闭后仍可继续使用，后续请求会按需重新建立连接。
+        """
+        _SESSION.close()
 
     def _request(self, endpoint: str, data: Dict[str, Any] = None) -> Dict[str, Any]:
         """发送HTTP请求"""
         try:
             url = f"{self.base_url}{endpoint}"
-            response = requests.post(url, json=data or {}, timeout=self.timeout)
+            payload = dict(data or {})
+            if self.session_id:
+                payload["session_id"] = self.session_id
+            response = _SESSION.post(url, json=payload, timeout=self.timeout)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.ConnectionError:
@@ -47,22 +85,25 @@ class SeleniumHTTPClient:
             "wait_time": wait_time
         })
 
-    def screenshot(self, output_path: str, wait_for_selector: str = None) -> Dict[str, Any]:
-        """截图"""
+    def screenshot(self, output_path: str = None, wait_for_selector: str = None,
+                   inline: bool = False) -> Dict[str, Any]:
+        """截图（inline=True 时结果中的 image_base64 为 PNG 数据，服务器不写磁盘）"""
         return self._request("/browser_screenshot", {
             "output_path": output_path,
-            "wait_for_selector": wait_for_selector
+            "wait_for_selector": wait_for_selector,
+            "inline": inline
         })
 
-    def click(self, selector: str) -> Dict[str, Any]:
-        """点击元素"""
-        return self._request("/browser_click", {"selector": selector})
+    def click(self, selector: str, no_wait: bool = False) -> Dict[str, Any]:
+        """点击元素（no_wait=True 时不等待元素可点击）"""
+        return self._request("/browser_click", {"selector": selector, "no_wait": no_wait})
 
-    def fill(self, selector: str, text: str) -> Dict[str, Any]:
-        """填写表单"""
+    def fill(self, selector: str, text: str, no_wait: bool = False) -> Dict[str, Any]:
+        """填写表单（no_wait=True 时不等待元素出现）"""
         return self._request("/browser_fill", {
             "selector": selector,
-            "text": text
+            "text": text,
+            "no_wait": no_wait
         })
 
     def close(self) -> Dict[str, Any]:
@@ -72,3 +113,191 @@ class SeleniumHTTPClient:
     def get_info(self) -> Dict[str, Any]:
         """获取服务器信息"""
         return self._request("/get_server_info", {})
+
+    def batch(self, ops: List[Dict[str, Any]], stop_on_error: bool = False) -> Dict[str, Any]:
+        """
+        在一次HTTP请求中执行多个浏览器操作
+
+        Args:
+            ops: 操作列表，形如 [{"op": "navigate", "args": {"url": ...}}, ...]
+            stop_on_error: 为 True 时服务器遇到第一个失败的操作即停止
+
+        Returns:
+            服务器返回的结果，results 字段与 ops 顺序一致
+        """
+        return self._request("/browser_batch", {"ops": ops, "stop_on_error": stop_on_error})
+
+    def pipeline(self) -> "SeleniumPipeline":
+        """创建操作流水线，缓冲多个操作后一次性提交"""
+        return SeleniumPipeline(self)
+
+
+class SeleniumPipeline:
+    """缓冲浏览器操作，flush 时通过 /browser_batch 一次提交
+
+    用法::
+
+        with client.pipeline() as p:
+            p.navigate("https://example.com")
+            p.click("#submit")
+            results = p.flush()
+    """
+
+    def __init__(self, client: SeleniumHTTPClient):
+        self._client = client
+        self._ops: List[Dict[str, Any]] = []
+
+    def __enter__(self) -> "SeleniumPipeline":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        # 正常退出时提交尚未 flush 的操作
+        if exc_type is None and self._ops:
+            self.flush()
+
+    def _add(self, op: str, **args) -> "SeleniumPipeline":
+        self._ops.append({"op": op, "args": args})
+        return self
+
+    def navigate(self, url: str, wait_time: int = 10) -> "SeleniumPipeline":
+        """导航到URL"""
+        return self._add("navigate", url=url, wait_time=wait_time)
+
+    def screenshot(self, output_path: str, wait_for_selector: str = None) -> "SeleniumPipeline":
+        """截图"""
+        return self._add("screenshot", output_path=output_path, wait_for_selector=wait_for_selector)
+
+    def click(self, selector: str, no_wait: bool = False) -> "SeleniumPipeline":
+        """点击元素"""
+        return self._add("click", selector=selector, no_wait=no_wait)
+
+    def fill(self, selector: str, text: str, no_wait: bool = False) -> "SeleniumPipeline":
+        """填写表单"""
+        return self._add("fill", selector=selector, text=text, no_wait=no_wait)
+
+    def flush(self) -> List[Dict[str, Any]]:
+        """提交已缓冲的操作，返回每个操作的结果"""
+        ops, self._ops = self._ops, []
+        if not ops:
+            return []
+        response = self._client.batch(ops)
+        if "results" not in response:
+            # 请求本身失败（如连接错误），为每个操作返回同一错误
+            return [response] * len(ops)
+        return response["results"]
+
+
+class AsyncSeleniumHTTPClient:
+    """连接到Selenium HTTP服务器的异步客户端（基于 httpx.AsyncClient）"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 18888,
+                 session_id: Optional[str] = None):
+        """
+        初始化异步客户端
+
+        Args:
+            host: 服务器地址
+            port: 服务器端口
+            session_id: 会话ID（可选），服务器为每个会话分配独立的浏览器
+        """
+        if httpx is None:
+            raise ImportError(
+                "AsyncSeleniumHTTPClient requires httpx. Install it with: pip install httpx"
+            )
+        self.base_url = f"http://{host}:{port}"
+        self.timeout = 60
+        self.session_id = session_id
+        # 单个长连接客户端，HTTP/1.1 keep-alive 复用连接
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=self.timeout,
+            limits=httpx.Limits(max_keepalive_connections=8)
+        )
+
+    async def __aenter__(self) -> "AsyncSeleniumHTTPClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+
+    async def aclose(self):
+        """关闭底层 HTTP 连接池（不会关闭服务器端浏览器）"""
+        await self._client.aclose()
+
+    async def _request(self, endpoint: str, data: Dict[str, Any] = None) -> Dict[str, Any]:
+        """发送HTTP请求"""
+        try:
+            payload = dict(data or {})
+            if self.session_id:
+                payload["session_id"] = self.session_id
+            response = await self._client.post(endpoint, json=payload)
+            response.raise_for_status()
+            return response.json()
+        except httpx.ConnectError:
+            return {
+                "success": False,
+                "error": f"无法连接到Selenium服务器: {self.base_url}"
+            }
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    async def navigate(self, url: str, wait_time: int = 10) -> Dict[str, Any]:
+        """导航到URL"""
+        return await self._request("/browser_navigate", {
+            "url": url,
+            "wait_time": wait_time
+        })
+
+    async def screenshot(self, output_path: str = None, wait_for_selector: str = None,
+                         inline: bool = False) -> Dict[str, Any]:
+        """截图（inline=True 时结果中的 image_base64 为 PNG 数据，服务器不写磁盘）"""
+        return await self._request("/browser_screenshot", {
+            "output_path": output_path,
+            "wait_for_selector": wait_for_selector,
+            "inline": inline
+        })
+
+    async def click(self, selector: str, no_wait: bool = False) -> Dict[str, Any]:
+        """点击元素（no_wait=True 时不等待元素可点击）"""
+        return await self._request("/browser_click", {"selector": selector, "no_wait": no_wait})
+
+    async def fill(self, selector: str, text: str, no_wait: bool = False) -> Dict[str, Any]:
+        """填写表单（no_wait=True 时不等待元素出现）"""
+        return await self._request("/browser_fill", {
+            "selector": selector,
+            "text": text,
+            "no_wait": no_wait
+        })
+
+    async def close(self) -> Dict[str, Any]:
+        """关闭浏览器"""
+        return await self._request("/browser_close", {})
+
+    async def get_info(self) -> Dict[str, Any]:
+        """获取服务器信息"""
+        return await self._request("/get_server_info", {})
+
+    async def batch(self, operations: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        并发发送多个请求
+
+        Args:
+            operations: (endpoint, data) 列表，例如 [("/browser_navigate", {"url": ...})]
+
+        Returns:
+            与 operations 顺序一致的结果列表
+        """
+        return await asyncio.gather(*[self._request(ep, d) for ep, d in operations])
+
+
+def run_batch(
+    operations: List[Tuple[str, Dict[str, Any]]],
+    host: str = "127.0.0.1",
+    port: int = 18888
+) -> List[Dict[str, Any]]:
+    """同步调用方使用的便捷函数：在新的事件循环中执行 AsyncSeleniumHTTPClient.batch"""
+    async def _run():
+        async with AsyncSeleniumHTTPClient(host, port) as client:
+            return await client.batch(operations)
+
+    return asyncio.run(_run())
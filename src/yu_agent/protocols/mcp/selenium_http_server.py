@@ -8,27 +8,55 @@ import os
 import sys
 
 # ⚠️ 必须在导入任何其他模块之前禁用系统代理！
-# 使用更激进的方式：设置为空字符串而不是删除
-for proxy_var in ['http_proxy', 'https_proxy', 'HTTP_PROXY', 'HTTPS_PROXY', 'ALL_PROXY',
-                  'http_proxy_config', 'https_proxy_config', 'no_proxy', 'NO_PROXY']:
-    os.environ[proxy_var] = ''
-    if proxy_var in os.environ and os.environ[proxy_var]:
-        del os.environ[proxy_var]
-
-import json
-import logging
-from typing import Dict, Any
-from pathlib import Path
-from http.server import HTTPServer, BaseHTTPRequestHandler
-from urllib.parse import urlparse, parse_qs
-import threading
-
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
+# 直接移除代理环境变量。urllib/requests 会忽略值为空字符串的代理变量，
+# 因此移除与置空效果相同；若某个下游库确实需要空字符串哨兵，只对该变量再单独置空。
+_PROXY_VARS = ("http_proxy", "https_proxy", "HTTP_PROXY", "HTTPS_PROXY", "ALL_PROXY",
+               "http_proxy_config", "https_proxy_config", "no_proxy", "NO_PROXY")
+for _proxy_var in _PROXY_VARS:
+    os.environ.pop(_proxy_var, None)
+
+import json  # noqa: E402
+import logging  # noqa: E402
+from contextlib import contextmanager  # noqa: E402
+from functools import partial  # noqa: E402
+import time  # noqa: E402
+from typing import Dict, Any, List  # noqa: E402
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler  # noqa: E402
+from urllib.parse import urlparse, parse_qs  # noqa: E402
+from concurrent.futures import ThreadPoolExecutor  # noqa: E402
+import asyncio  # noqa: E402
+import socket  # noqa: E402
+import threading  # noqa: E402
+
+# 序列化优先使用 orjson（直接输出 UTF-8 bytes），未安装时回退到标准库 json；
+# 两者的 loads 都直接接受 bytes，无需先 decode
+try:
+    import orjson
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+    _loads = json.loads
+
+# 请求体大小上限（字节），超过时直接返回 413，不读取请求体
+MAX_BODY = 1 << 20
+
+# selenium / webdriver_manager 导入开销较大，延迟到真正需要驱动浏览器时再导入
+
+try:
+    from .chrome_utils import (
+        POLL_FREQUENCY, build_chrome_options, clickable, create_chrome_driver,
+        css_locator, find_chrome_binary, present, run_batch, screenshot_result,
+        widen_connection_pool
+    )
+except ImportError:
+    # 作为独立脚本运行时没有父包
+    from chrome_utils import (
+        POLL_FREQUENCY, build_chrome_options, clickable, create_chrome_driver,
+        css_locator, find_chrome_binary, present, run_batch, screenshot_result,
+        widen_connection_pool
+    )
 
 # 配置日志
 logging.basicConfig(
@@ -38,98 +66,228 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # ============================================================================
-# 全局WebDriver实例 - 在整个服务器生命周期内保持
+# 按会话管理的WebDriver实例 - 每个 session_id 独占一个浏览器
 # ============================================================================
 
-_driver_instance = None
-_driver_lock = threading.Lock()
-
-
-def get_driver():
-    """获取或初始化WebDriver"""
-    global _driver_instance
-
+DEFAULT_SESSION = "default"
+MAX_SESSIONS = 8               # 同时保持的浏览器数量上限，超出时淘汰最久未使用的空闲会话
+DRIVER_IDLE_TIMEOUT = 300      # 会话空闲超过该秒数后自动关闭浏览器
+_REAPER_INTERVAL = 60
+DRIVER_HTTP_POOL_MAXSIZE = 20  # 每个 WebDriver 到 ChromeDriver 的 HTTP 连接数上限
+
+# 外部常驻 ChromeDriver 的地址（如 http://127.0.0.1:9515）。设置后通过 webdriver.Remote 连接，
+# 不再由本进程启动 ChromeDriver，服务器重启时无需重新安装/启动驱动
+REMOTE_URL = os.environ.get("SELENIUM_REMOTE_URL") or None
+
+# session_id -> WebDriver；只在锁内修改，读取可以不加锁（CPython 中 dict 的单次读写是原子的）
+_drivers: Dict[str, Any] = {}
+# session_id -> 最近使用时间，用于 LRU 淘汰与空闲回收
+_last_used: Dict[str, float] = {}
+# session_id -> 正在处理的请求数；使用中的会话不会被 LRU 淘汰或空闲回收
+_in_use: Dict[str, int] = {}
+# session_id -> 互斥锁：WebDriver 不是线程安全的，同一会话的请求必须串行。
+# 与 _in_use 一同在 _driver_lock 内维护，会话没有请求时即删除
+_session_locks: Dict[str, threading.Lock] = {}
+_driver_lock = threading.RLock()
+_reaper_thread = None
+
+
+def get_driver(session_id: str = DEFAULT_SESSION):
+    """获取或初始化指定会话的WebDriver
+
+    双重检查：会话已存在时无锁返回，只有需要创建浏览器时才进入加锁路径。
+    """
+    driver = _drivers.get(session_id)
+    if driver is not None:
+        _last_used[session_id] = time.monotonic()
+        return driver
+    return init_driver(session_id, replace=False)
+
+
+def init_driver(session_id: str = DEFAULT_SESSION, replace: bool = True):
+    """初始化指定会话的WebDriver
+
+    浏览器启动较慢，在锁外创建，只在登记时持锁，不阻塞其他会话。
+
+    Args:
+        session_id: 会话ID
+        replace: 会话已有浏览器时是否替换；为 False 时保留已有实例并关闭新建的实例
+    """
+    driver = _create_driver()
     with _driver_lock:
-        if _driver_instance is None:
-            init_driver()
-        return _driver_instance
-
-
-def init_driver():
-    """初始化WebDriver"""
-    global _driver_instance
-
+        existing = _drivers.get(session_id)
+        if existing is not None and not replace:
+            # 其他线程已抢先创建
+            _last_used[session_id] = time.monotonic()
+            evicted = [driver]
+            driver = existing
+        else:
+            _drivers[session_id] = driver
+            _last_used[session_id] = time.monotonic()
+            evicted = _evict_lru(keep=session_id)
+            if existing is not None:
+                evicted.append(existing)
+            _start_reaper()
+    _quit_all(evicted)
+    return driver
+
+
+def _create_driver():
+    """创建一个新的WebDriver实例（全局单例与异步服务器的驱动池共用）"""
     try:
-        options = webdriver.ChromeOptions()
-
-        # 尝试找到Chrome浏览器路径
-        chrome_paths = [
-            r"C:\Program Files\Google\Chrome\Application\chrome.exe",
-            r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
-            "google-chrome",
-            "google-chrome-stable",
-            "chromium"
-        ]
-
-        chrome_binary = None
-        for path in chrome_paths:
-            try:
-                if Path(path).exists():
-                    chrome_binary = path
-                    break
-            except:
-                pass
-
+        # 尝试找到Chrome浏览器路径（每个进程只探测一次）
+        chrome_binary = find_chrome_binary()
         if chrome_binary:
-            options.binary_location = chrome_binary
             logger.info(f"📍 使用Chrome: {chrome_binary}")
+        options = build_chrome_options(chrome_binary)
 
-        options.add_argument("--headless=new")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--disable-blink-features=AutomationControlled")
-        options.add_argument("--disable-proxy-auto-detect")
-        options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        options.add_experimental_option('useAutomationExtension', False)
-
-        # 使用webdriver-manager自动管理ChromeDriver
-        service = Service(ChromeDriverManager().install())
-        _driver_instance = webdriver.Chrome(service=service, options=options)
+        if REMOTE_URL:
+            # 连接外部常驻的 ChromeDriver
+            from selenium import webdriver
+            driver = webdriver.Remote(command_executor=REMOTE_URL, options=options)
+        else:
+            driver = create_chrome_driver(options)
+        # 默认每个主机只有 1 个连接，驱动池/会话并发时会在 HTTP 层串行化
+        widen_connection_pool(driver, DRIVER_HTTP_POOL_MAXSIZE)
         logger.info("✅ WebDriver初始化成功")
+        return driver
     except Exception as e:
         logger.error(f"❌ WebDriver初始化失败: {e}")
         raise
 
 
-def close_driver():
-    """关闭WebDriver"""
-    global _driver_instance
+def warm_up_driver(session_id: str = DEFAULT_SESSION) -> bool:
+    """启动时预先创建会话的WebDriver，失败时只记录日志，之后按需再创建"""
+    try:
+        get_driver(session_id)
+        logger.info("✅ Pool ready: 1/1")
+        return True
+    except Exception as e:
+        logger.warning(f"⚠️ WebDriver预热失败，将在首个请求时创建: {e}")
+        return False
+
+
+def close_driver(session_id: str = None):
+    """关闭WebDriver
 
+    Args:
+        session_id: 要关闭的会话；为空时关闭所有会话
+    """
     with _driver_lock:
-        if _driver_instance:
-            try:
-                _driver_instance.quit()
-                _driver_instance = None
-                logger.info("🔌 WebDriver已关闭")
-            except Exception as e:
-                logger.error(f"❌ 关闭WebDriver失败: {e}")
+        if session_id is None:
+            drivers = list(_drivers.values())
+            _drivers.clear()
+            _last_used.clear()
+        else:
+            driver = _drivers.pop(session_id, None)
+            _last_used.pop(session_id, None)
+            drivers = [driver] if driver is not None else []
+    _quit_all(drivers)
+
+
+def _quit_all(drivers):
+    """在锁外逐个关闭WebDriver，避免慢速 quit() 阻塞其他会话"""
+    for driver in drivers:
+        try:
+            driver.quit()
+            logger.info("🔌 WebDriver已关闭")
+        except Exception as e:
+            logger.error(f"❌ 关闭WebDriver失败: {e}")
+
+
+def _evict_lru(keep: str) -> list:
+    """超出 MAX_SESSIONS 时移出最久未使用的空闲会话（调用方需持有锁）
+
+    正在处理请求的会话与刚创建的会话 keep 不会被淘汰；没有可淘汰的会话时暂时允许超出上限，
+    多出的浏览器在这些会话空闲后的下一次淘汰或空闲回收时关闭。
+    """
+    evicted = []
+    while len(_drivers) > MAX_SESSIONS:
+        idle = [sid for sid in _drivers if sid != keep and not _in_use.get(sid)]
+        if not idle:
+            break
+        oldest = min(idle, key=lambda sid: _last_used.get(sid, 0.0))
+        evicted.append(_drivers.pop(oldest))
+        _last_used.pop(oldest, None)
+    return evicted
+
+
+def _reap_idle_drivers():
+    """后台线程：定期关闭空闲超时的会话"""
+    while True:
+        time.sleep(_REAPER_INTERVAL)
+        deadline = time.monotonic() - DRIVER_IDLE_TIMEOUT
+        with _driver_lock:
+            idle = [sid for sid in _drivers
+                    if not _in_use.get(sid) and _last_used.get(sid, 0.0) < deadline]
+            drivers = [_drivers.pop(sid) for sid in idle]
+            # 清理已关闭会话残留的时间戳（无锁的 get_driver 可能与关闭并发写入）
+            for sid in [sid for sid in _last_used if sid not in _drivers]:
+                del _last_used[sid]
+        if drivers:
+            logger.info(f"🧹 关闭空闲会话: {idle}")
+        _quit_all(drivers)
+
+
+def _start_reaper():
+    """首次创建浏览器时启动空闲回收线程（调用方需持有锁）"""
+    global _reaper_thread
+
+    if _reaper_thread is None:
+        _reaper_thread = threading.Thread(
+            target=_reap_idle_drivers, name="selenium-reaper", daemon=True
+        )
+        _reaper_thread.start()
+
+
+@contextmanager
+def _session(session_id: str):
+    """占用会话：按会话串行执行，执行期间会话标记为使用中
+
+    使用中的会话不会被其他请求触发的 LRU 淘汰或空闲回收关闭浏览器。
+    计数与锁在 _driver_lock 内一同维护，最后一个请求结束时删除会话锁，
+    已关闭或从未创建浏览器的会话不会残留锁对象。
+    """
+    with _driver_lock:
+        _in_use[session_id] = _in_use.get(session_id, 0) + 1
+        lock = _session_locks.get(session_id)
+        if lock is None:
+            lock = _session_locks[session_id] = threading.Lock()
+    try:
+        with lock:
+            yield
+    finally:
+        with _driver_lock:
+            _in_use[session_id] -= 1
+            if not _in_use[session_id]:
+                del _in_use[session_id]
+                del _session_locks[session_id]
+
+
+def _call_in_session(session_id: str, func, *args):
+    """在会话内调用 func（供执行器线程使用）"""
+    with _session(session_id):
+        return func(*args)
 
 
 # ============================================================================
 # 工具函数
 # ============================================================================
 
-def browser_navigate(url: str, wait_time: int = 10) -> Dict[str, Any]:
+def browser_navigate(url: str, wait_time: int = 10, driver=None, session_id: str = DEFAULT_SESSION) -> Dict[str, Any]:
     """导航到指定URL"""
+    from selenium.webdriver.support.ui import WebDriverWait
+
     try:
-        driver = get_driver()
+        driver = driver if driver is not None else get_driver(session_id)
         logger.info(f"📍 导航到: {url}")
         driver.get(url)
 
-        # 等待页面加载
-        WebDriverWait(driver, wait_time).until(
-            lambda d: d.execute_script("return document.readyState") == "complete"
-        )
+        # 等待页面加载：driver.get() 通常在页面加载完成后才返回，先检查一次，已完成则无需进入轮询
+        if driver.execute_script("return document.readyState") != "complete":
+            WebDriverWait(driver, wait_time, poll_frequency=POLL_FREQUENCY).until(
+                lambda d: d.execute_script("return document.readyState") == "complete"
+            )
 
         return {
             "success": True,
@@ -142,46 +300,56 @@ def browser_navigate(url: str, wait_time: int = 10) -> Dict[str, Any]:
         return {"success": False, "error": str(e)}
 
 
-def browser_screenshot(output_path: str, wait_for_selector: str = None) -> Dict[str, Any]:
-    """对当前页面进行截图"""
+def browser_screenshot(output_path: str = None, wait_for_selector: str = None, inline: bool = False,
+                       driver=None, session_id: str = DEFAULT_SESSION) -> Dict[str, Any]:
+    """对当前页面进行截图（inline=True 时以 base64 返回 PNG，不写磁盘）"""
+    from selenium.webdriver.support.ui import WebDriverWait
+
     try:
-        driver = get_driver()
+        if not inline and not output_path:
+            return {"success": False, "error": "output_path is required unless inline=True"}
+
+        driver = driver if driver is not None else get_driver(session_id)
 
         # 如果指定了选择器，等待元素出现
         if wait_for_selector:
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, wait_for_selector))
+            WebDriverWait(driver, 10, poll_frequency=POLL_FREQUENCY).until(
+                present(wait_for_selector)
             )
 
-        # 确保输出目录存在，并转换为绝对路径
-        output_path = str(Path(output_path).resolve())
-        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
-
-        driver.save_screenshot(output_path)
-        file_size = Path(output_path).stat().st_size
-
-        logger.info(f"📸 截图保存: {output_path} ({file_size} bytes)")
-
-        return {
-            "success": True,
-            "message": f"✅ 截图成功: {output_path}",
-            "file": output_path,
-            "size": file_size
-        }
+        return screenshot_result(driver.get_screenshot_as_png(), output_path, inline)
     except Exception as e:
         logger.error(f"❌ 截图失败: {e}")
         return {"success": False, "error": str(e)}
 
 
-def browser_click(selector: str) -> Dict[str, Any]:
-    """点击页面元素"""
+# no_wait 点击：一次 execute_script 完成查找与点击，元素不存在时返回 false
+_JS_CLICK = (
+    "var el = document.querySelector(arguments[0]);"
+    "if (!el) { return false; } el.click(); return true;"
+)
+
+
+def browser_click(selector: str, driver=None, session_id: str = DEFAULT_SESSION,
+                  no_wait: bool = False) -> Dict[str, Any]:
+    """点击页面元素
+
+    Args:
+        no_wait: 为 True 时跳过 WebDriverWait 轮询，用一次 JS 调用直接点击，
+            适用于已确认加载完成的页面；元素不存在时立即失败
+    """
     try:
-        driver = get_driver()
+        driver = driver if driver is not None else get_driver(session_id)
 
-        element = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
-        )
-        element.click()
+        if no_wait:
+            if not driver.execute_script(_JS_CLICK, selector):
+                return {"success": False, "error": f"Element not found: {selector}"}
+        else:
+            from selenium.webdriver.support.ui import WebDriverWait
+            element = WebDriverWait(driver, 10, poll_frequency=POLL_FREQUENCY).until(
+                clickable(selector)
+            )
+            element.click()
 
         logger.info(f"🖱️  点击: {selector}")
 
@@ -194,14 +362,23 @@ def browser_click(selector: str) -> Dict[str, Any]:
         return {"success": False, "error": str(e)}
 
 
-def browser_fill(selector: str, text: str) -> Dict[str, Any]:
-    """填写表单输入框"""
+def browser_fill(selector: str, text: str, driver=None, session_id: str = DEFAULT_SESSION,
+                 no_wait: bool = False) -> Dict[str, Any]:
+    """填写表单输入框
+
+    Args:
+        no_wait: 为 True 时跳过 WebDriverWait 轮询，直接 find_element，元素不存在时立即失败
+    """
     try:
-        driver = get_driver()
+        driver = driver if driver is not None else get_driver(session_id)
 
-        element = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-        )
+        if no_wait:
+            element = driver.find_element(*css_locator(selector))
+        else:
+            from selenium.webdriver.support.ui import WebDriverWait
+            element = WebDriverWait(driver, 10, poll_frequency=POLL_FREQUENCY).until(
+                present(selector)
+            )
         element.clear()
         element.send_keys(text)
 
@@ -216,10 +393,13 @@ def browser_fill(selector: str, text: str) -> Dict[str, Any]:
         return {"success": False, "error": str(e)}
 
 
-def browser_close() -> Dict[str, Any]:
-    """关闭浏览器"""
+def browser_close(driver=None, session_id: str = DEFAULT_SESSION) -> Dict[str, Any]:
+    """关闭浏览器（传入 driver 时只关闭该实例，否则关闭 session_id 对应的会话）"""
     try:
-        close_driver()
+        if driver is not None:
+            driver.quit()
+        else:
+            close_driver(session_id)
         return {
             "success": True,
             "message": "✅ 浏览器已关闭"
@@ -229,6 +409,50 @@ def browser_close() -> Dict[str, Any]:
         return {"success": False, "error": str(e)}
 
 
+# 批量接口可用的操作：op 名 -> 工具函数
+_BATCH_OPS = {
+    "navigate": browser_navigate,
+    "screenshot": browser_screenshot,
+    "click": browser_click,
+    "fill": browser_fill,
+    "close": browser_close,
+}
+# 由 browser_batch 绑定的参数：批量操作里不能再指定，否则可以越过会话锁操作其他会话的浏览器
+_BATCH_RESERVED_ARGS = frozenset({"driver", "session_id"})
+
+
+def browser_batch(ops: List[Dict[str, Any]], driver=None,
+                  session_id: str = DEFAULT_SESSION,
+                  stop_on_error: bool = False) -> Dict[str, Any]:
+    """在一次请求中按顺序执行多个浏览器操作
+
+    Args:
+        ops: 操作列表，形如 [{"op": "navigate", "args": {"url": ...}}, ...]
+            或 [{"op": "navigate", "url": ...}, ...]
+        driver: 指定使用的WebDriver（默认使用 session_id 对应的会话）
+        session_id: 会话ID
+        stop_on_error: 为 True 时遇到第一个失败的操作即停止，后续操作不再执行
+
+    Returns:
+        包含每个操作结果的字典，results 与 ops 顺序一致
+        （提前停止时 results 只包含已执行的操作）
+    """
+    bound = {name: partial(func, driver=driver, session_id=session_id) for name, func in _BATCH_OPS.items()}
+    return run_batch(bound, ops, stop_on_error, reserved=_BATCH_RESERVED_ARGS)
+
+
+def browser_screenshot_png(wait_for_selector: str = None, driver=None,
+                           session_id: str = DEFAULT_SESSION) -> bytes:
+    """截图并直接返回 PNG 字节（不写磁盘，也不做 base64/JSON 编码），失败时抛出异常"""
+    driver = driver if driver is not None else get_driver(session_id)
+    if wait_for_selector:
+        from selenium.webdriver.support.ui import WebDriverWait
+        WebDriverWait(driver, 10, poll_frequency=POLL_FREQUENCY).until(
+            present(wait_for_selector)
+        )
+    return driver.get_screenshot_as_png()
+
+
 def get_server_info() -> Dict[str, Any]:
     """获取服务器信息"""
     return {
@@ -241,17 +465,165 @@ def get_server_info() -> Dict[str, Any]:
             "browser_click",
             "browser_fill",
             "browser_close",
+            "browser_batch",
+            "browser_screenshot_stream",
             "get_server_info"
         ]
     }
 
 
+# ============================================================================
+# 请求分发
+# ============================================================================
+
+# 路由表：路径 -> (工具函数, 参数规格, 是否操作浏览器)
+# 参数规格为 (函数参数名, 请求体字段, 类型转换, 默认值)；
+# 操作浏览器的工具函数额外接收 driver 与 session_id
+ROUTES: Dict[str, tuple] = {
+    '/browser_navigate': (browser_navigate, (
+        ("url", "url", None, None),
+        ("wait_time", "wait_time", int, 10),
+    ), True),
+    '/browser_screenshot': (browser_screenshot, (
+        ("output_path", "output_path", None, None),
+        ("wait_for_selector", "wait_for_selector", None, None),
+        ("inline", "inline", bool, False),
+    ), True),
+    '/browser_click': (browser_click, (
+        ("selector", "selector", None, None),
+        ("no_wait", "no_wait", bool, False),
+    ), True),
+    '/browser_fill': (browser_fill, (
+        ("selector", "selector", None, None),
+        ("text", "text", None, None),
+        ("no_wait", "no_wait", bool, False),
+    ), True),
+    '/browser_close': (browser_close, (), True),
+    '/browser_batch': (browser_batch, (
+        ("ops", "ops", None, None),
+        ("stop_on_error", "stop_on_error", bool, False),
+    ), True),
+    '/batch': (browser_batch, (
+        ("ops", "actions", None, None),
+        ("stop_on_error", "stop_on_error", bool, False),
+    ), True),
+    '/get_server_info': (get_server_info, (), False),
+}
+
+
+# 直接返回 PNG 字节流（Content-Type: image/png）的截图端点，不经过 JSON
+STREAM_SCREENSHOT_PATH = '/browser_screenshot_stream'
+
+
+def dispatch_screenshot_stream(path: str, data: Dict[str, Any], driver=None) -> bytes:
+    """截图流端点的分发函数，签名与 dispatch_request 一致"""
+    return browser_screenshot_png(
+        wait_for_selector=data.get('wait_for_selector'),
+        driver=driver,
+        session_id=data.get('session_id') or DEFAULT_SESSION
+    )
+
+
+def dispatch_request(path: str, data: Dict[str, Any], driver=None) -> Dict[str, Any]:
+    """根据请求路径调用对应的工具函数（同步/异步两种服务器共用）
+
+    driver 为空时使用请求体中 session_id 对应的会话（默认 "default"）；
+    异步服务器会传入从驱动池借出的实例。
+    """
+    entry = ROUTES.get(path)
+    if entry is None:
+        return {"success": False, "error": f"Unknown endpoint: {path}"}
+
+    func, spec, uses_driver = entry
+    kwargs = {}
+    for param, key, coerce, default in spec:
+        value = data.get(key, default)
+        if coerce is not None and value is not None:
+            value = coerce(value)
+        kwargs[param] = value
+    if uses_driver:
+        kwargs["driver"] = driver
+        kwargs["session_id"] = data.get('session_id') or DEFAULT_SESSION
+    return func(**kwargs)
+
+
 # ============================================================================
 # HTTP 请求处理器
 # ============================================================================
 
+# 所有 Selenium 操作共用的线程池，大小与浏览器数量上限一致：
+# 同时执行的操作不会多于可用的浏览器，多出的请求在此排队，而不是各自占用线程驱动 Chrome
+_SELENIUM_EXECUTOR = ThreadPoolExecutor(max_workers=MAX_SESSIONS, thread_name_prefix="selenium")
+
+
+def _dispatch_in_session(path: str, data: Dict[str, Any]):
+    """在请求处理线程中占用会话，轮到本请求后才把分发交给 _SELENIUM_EXECUTOR
+
+    同一会话的请求按会话串行执行。等待会话锁的是处理线程（数量由
+    BoundedThreadingHTTPServer 限制），不占用执行器线程，
+    某个会话积压请求时其他会话仍然可以拿到执行器线程。
+    """
+    session_id = data.get('session_id') or DEFAULT_SESSION
+    handler = dispatch_screenshot_stream if path == STREAM_SCREENSHOT_PATH else dispatch_request
+    with _session(session_id):
+        return _SELENIUM_EXECUTOR.submit(handler, path, data).result()
+
+
+class BoundedThreadingHTTPServer(ThreadingHTTPServer):
+    """每个请求一个线程，但同时处理的请求数不超过 max_workers
+
+    超出上限的连接在 accept 之后等待空闲名额，而不是无限制地创建线程。
+    """
+
+    daemon_threads = True
+
+    def __init__(self, server_address, handler_class, max_workers: int = 16,
+                 reuse_port: bool = False):
+        # SO_REUSEPORT 必须在 bind 之前设置，因此在调用父类构造（会执行 bind）前保存
+        self.reuse_port = reuse_port
+        self._slots = threading.BoundedSemaphore(max_workers)
+        super().__init__(server_address, handler_class)
+
+    def server_bind(self):
+        if self.reuse_port and hasattr(socket, "SO_REUSEPORT"):
+            # 允许多个服务器进程监听同一端口，由内核在进程间分配连接
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        super().server_bind()
+
+    def process_request(self, request, client_address):
+        self._slots.acquire()
+        try:
+            super().process_request(request, client_address)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def process_request_thread(self, request, client_address):
+        try:
+            super().process_request_thread(request, client_address)
+        finally:
+            self._slots.release()
+
+
 class SeleniumHTTPHandler(BaseHTTPRequestHandler):
-    """处理HTTP请求的处理器"""
+    """处理HTTP请求的处理器
+
+    使用 HTTP/1.1 长连接：客户端可以在同一 TCP 连接上连续发送请求，
+    因此每个响应都必须带 Content-Length。
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def _send_body(self, status: int, body: bytes, content_type: str = 'application/json'):
+        """发送带 Content-Length 的完整响应"""
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Access-Control-Allow-Origin', '*')
+        if self.close_connection:
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(body)
 
     def do_POST(self):
         """处理POST请求"""
@@ -259,85 +631,290 @@ class SeleniumHTTPHandler(BaseHTTPRequestHandler):
             # 解析请求路径
             path = urlparse(self.path).path
 
-            # 读取请求体
-            content_length = int(self.headers.get('Content-Length', 0))
+            # 读取请求体：先校验长度，超限时不分配内存
+            try:
+                content_length = int(self.headers.get('Content-Length', 0))
+            except ValueError:
+                content_length = -1
+            if content_length < 0 or content_length > MAX_BODY:
+                # 请求体未读取，连接上残留的数据无法解析，响应后关闭连接
+                self.close_connection = True
+                status = 413 if content_length > MAX_BODY else 400
+                self._send_body(status, _dumps({
+                    "success": False,
+                    "error": "Request body too large" if status == 413 else "Invalid Content-Length"
+                }))
+                return
             body = self.rfile.read(content_length)
 
             try:
-                data = json.loads(body.decode('utf-8')) if body else {}
-            except json.JSONDecodeError:
+                data = _loads(body) if body else {}
+            except ValueError:
                 data = {}
 
-            # 路由到相应的函数
-            if path == '/browser_navigate':
-                result = browser_navigate(
-                    url=data.get('url'),
-                    wait_time=int(data.get('wait_time', 10))
-                )
-            elif path == '/browser_screenshot':
-                result = browser_screenshot(
-                    output_path=data.get('output_path'),
-                    wait_for_selector=data.get('wait_for_selector')
-                )
-            elif path == '/browser_click':
-                result = browser_click(selector=data.get('selector'))
-            elif path == '/browser_fill':
-                result = browser_fill(
-                    selector=data.get('selector'),
-                    text=data.get('text')
-                )
-            elif path == '/browser_close':
-                result = browser_close()
-            elif path == '/get_server_info':
-                result = get_server_info()
-            else:
-                result = {"success": False, "error": f"Unknown endpoint: {path}"}
+            result = _dispatch_in_session(path, data)
+
+            if path == STREAM_SCREENSHOT_PATH:
+                # PNG 字节直接写入响应，不落盘、不做 base64
+                self._send_body(200, result, 'image/png')
+                return
 
             # 返回结果
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps(result, ensure_ascii=False).encode('utf-8'))
+            self._send_body(200, _dumps(result))
 
         except Exception as e:
             logger.error(f"❌ HTTP请求处理失败: {e}")
-            self.send_response(500)
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps({
+            self._send_body(500, _dumps({
                 "success": False,
                 "error": str(e)
-            }).encode('utf-8'))
+            }))
 
     def do_GET(self):
         """处理GET请求"""
         # 支持GET方式查询服务器信息
         path = urlparse(self.path).path
         if path == '/get_server_info':
-            result = get_server_info()
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps(result, ensure_ascii=False).encode('utf-8'))
+            self._send_body(200, _dumps(get_server_info()))
         else:
-            self.send_response(404)
-            self.end_headers()
+            self._send_body(404, b'', 'text/plain')
 
     def log_message(self, format, *args):
         """抑制默认日志"""
         pass
 
 
+# ============================================================================
+# 异步 HTTP 服务器（可选，需要 aiohttp）
+# ============================================================================
+
+def _closes_driver(path: str, data: Dict[str, Any], result) -> bool:
+    """判断请求执行后借出的WebDriver是否已被关闭
+
+    只认成功执行的 close：批量请求的 results 与操作逐条对应，
+    stop_on_error 提前停止时没有执行到的、以及被拒绝的 close 都不算。
+    """
+    if path == '/browser_close':
+        return True
+    if path in ('/browser_batch', '/batch'):
+        ops = data.get('ops' if path == '/browser_batch' else 'actions')
+        executed = zip(ops or [], result.get("results") or [])
+        return any(
+            isinstance(item, dict) and item.get("op") == "close" and r.get("success")
+            for item, r in executed
+        )
+    return False
+
+
+class WebDriverPool:
+    """固定大小的WebDriver池（异步服务器使用）
+
+    每个请求从池中借出一个浏览器，处理完毕后归还，不同请求可以并行驱动不同浏览器。
+    WebDriver 不是线程安全的，但同一时刻每个实例只会被一个请求持有。
+    浏览器在首次被借出时才创建；被 browser_close 关闭的实例会在下次借出时重建。
+    """
+
+    def __init__(self, size: int, executor: ThreadPoolExecutor):
+        self.size = size
+        self._executor = executor
+        self._slots: "asyncio.Queue" = asyncio.Queue()
+        for _ in range(size):
+            self._slots.put_nowait(None)
+
+    async def acquire(self):
+        """借出一个WebDriver（池空时等待）"""
+        driver = await self._slots.get()
+        if driver is None:
+            loop = asyncio.get_running_loop()
+            try:
+                driver = await loop.run_in_executor(self._executor, _create_driver)
+            except Exception:
+                self._slots.put_nowait(None)
+                raise
+        return driver
+
+    def release(self, driver):
+        """归还WebDriver；传入 None 表示该实例已关闭，下次借出时重建"""
+        self._slots.put_nowait(driver)
+
+    async def run(self, path: str, data: Dict[str, Any], handler=dispatch_request):
+        """借出WebDriver并在执行器线程中分发请求（handler 签名同 dispatch_request）"""
+        driver = await self.acquire()
+        loop = asyncio.get_running_loop()
+        closed = False
+        try:
+            result = await loop.run_in_executor(
+                self._executor, handler, path, data, driver
+            )
+            closed = _closes_driver(path, data, result)
+            return result
+        finally:
+            # 无论分发是否出错都要归还，否则池会永久少一个名额
+            self.release(None if closed else driver)
+
+    async def warm_up(self):
+        """预先创建池中所有WebDriver，避免首个请求承担浏览器冷启动；创建失败的名额保持惰性创建"""
+        loop = asyncio.get_running_loop()
+        slots = [self._slots.get_nowait() for _ in range(self._slots.qsize())]
+        drivers = await asyncio.gather(*[
+            loop.run_in_executor(self._executor, _create_driver) if d is None else asyncio.sleep(0, d)
+            for d in slots
+        ], return_exceptions=True)
+        ready = 0
+        for driver in drivers:
+            if isinstance(driver, BaseException):
+                self._slots.put_nowait(None)
+            else:
+                self._slots.put_nowait(driver)
+                ready += 1
+        logger.info(f"✅ Pool ready: {ready}/{self.size}")
+
+    async def close(self):
+        """关闭池中所有WebDriver"""
+        loop = asyncio.get_running_loop()
+        while not self._slots.empty():
+            driver = self._slots.get_nowait()
+            if driver is not None:
+                await loop.run_in_executor(self._executor, browser_close, driver)
+
+
+def create_async_app(pool_size: int = 1, warmup: bool = False):
+    """创建 aiohttp 应用，路由与 SeleniumHTTPHandler 保持一致
+
+    Args:
+        pool_size: WebDriver池大小，也是执行器的线程数。
+            注意浏览器状态（当前页面等）属于具体实例，pool_size > 1 时
+            连续的 navigate/click 请求可能落在不同浏览器上，适合彼此独立的请求。
+            需要保持页面状态的客户端应在请求体中携带 session_id：
+            这类请求绕过驱动池，使用该会话独占的浏览器，并按会话串行执行。
+        warmup: 启动时预先创建池中所有浏览器
+    """
+    try:
+        from aiohttp import web
+    except ImportError:
+        raise ImportError(
+            "Async Selenium server requires aiohttp. Install it with: pip install aiohttp"
+        )
+
+    def _json_response(result: Dict[str, Any]):
+        return web.Response(
+            body=_dumps(result),
+            content_type='application/json',
+            headers={'Access-Control-Allow-Origin': '*'}
+        )
+
+    executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="selenium")
+
+    async def handle_post(request):
+        try:
+            data = _loads(await request.read()) if request.can_read_body else {}
+        except ValueError:
+            data = {}
+        data = data or {}
+        stream = request.path == STREAM_SCREENSHOT_PATH
+        handler = dispatch_screenshot_stream if stream else dispatch_request
+        session_id = data.get('session_id')
+        try:
+            if session_id:
+                # session_id -> [asyncio.Lock, 等待/执行中的请求数]，没有请求时删除
+                locks = request.app['session_locks']
+                entry = locks.get(session_id)
+                if entry is None:
+                    entry = locks[session_id] = [asyncio.Lock(), 0]
+                entry[1] += 1
+                try:
+                    async with entry[0]:
+                        result = await asyncio.get_running_loop().run_in_executor(
+                            executor, _call_in_session, session_id, handler, request.path, data
+                        )
+                finally:
+                    entry[1] -= 1
+                    if not entry[1]:
+                        del locks[session_id]
+            else:
+                result = await request.app['driver_pool'].run(request.path, data, handler)
+        except Exception as e:
+            if not stream:
+                raise
+            logger.error(f"❌ 截图失败: {e}")
+            return web.Response(
+                status=500,
+                body=_dumps({"success": False, "error": str(e)}),
+                content_type='application/json'
+            )
+        if stream:
+            return web.Response(
+                body=result,
+                content_type='image/png',
+                headers={'Access-Control-Allow-Origin': '*'}
+            )
+        return _json_response(result)
+
+    async def handle_get_info(request):
+        return _json_response(get_server_info())
+
+    async def on_startup(app):
+        # asyncio.Queue 需在事件循环内创建
+        app['driver_pool'] = WebDriverPool(pool_size, executor)
+        app['session_locks'] = {}
+        if warmup:
+            await app['driver_pool'].warm_up()
+
+    async def on_cleanup(app):
+        await app['driver_pool'].close()
+        await asyncio.get_running_loop().run_in_executor(executor, close_driver)
+        executor.shutdown(wait=False)
+
+    # 超过 MAX_BODY 的请求体由 aiohttp 直接拒绝（413）
+    app = web.Application(client_max_size=MAX_BODY)
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    app.router.add_get('/get_server_info', handle_get_info)
+    app.router.add_post('/{endpoint}', handle_post)
+    return app
+
+
+def run_async_server(host: str = "127.0.0.1", port: int = 18888, pool_size: int = 1,
+                     warmup: bool = False):
+    """使用 aiohttp 事件循环运行服务器"""
+    from aiohttp import web
+
+    app = create_async_app(pool_size, warmup)
+    logger.info(f"🚀 Selenium HTTP服务器(aiohttp)启动成功")
+    logger.info(f"📍 地址: http://{host}:{port}")
+    logger.info(f"🧩 WebDriver池大小: {pool_size}")
+    web.run_app(app, host=host, port=port, print=None)
+
+
 # ============================================================================
 # 主程序
 # ============================================================================
 
 if __name__ == "__main__":
+    import argparse
     import signal
 
-    host = "127.0.0.1"
-    port = 18888  # 自定义端口
+    parser = argparse.ArgumentParser(description="Selenium HTTP 服务器")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=18888)  # 自定义端口
+    parser.add_argument("--async-server", action="store_true",
+                        help="使用 aiohttp 事件循环代替标准库 HTTPServer")
+    parser.add_argument("--pool-size", type=int, default=1,
+                        help="异步服务器的WebDriver池大小（仅 --async-server 生效）")
+    parser.add_argument("--no-warmup", action="store_true",
+                        help="不在启动时预先创建浏览器（首个请求时再创建）")
+    parser.add_argument("--max-workers", type=int, default=16,
+                        help="标准库服务器同时处理的最大请求数")
+    parser.add_argument("--reuse-port", action="store_true",
+                        help="设置 SO_REUSEPORT，允许多个服务器进程共享端口"
+                             "（会话只存在于各自进程中，需配合按会话路由的负载均衡）")
+    parser.add_argument("--remote-url", default=REMOTE_URL,
+                        help="连接外部常驻的 ChromeDriver（如 http://127.0.0.1:9515），"
+                             "参见 scripts/chromedriver.service")
+    args = parser.parse_args()
+    REMOTE_URL = args.remote_url
+
+    host = args.host
+    port = args.port
 
     def signal_handler(sig, frame):
         logger.info("📛 收到关闭信号，正在关闭...")
@@ -348,7 +925,16 @@ if __name__ == "__main__":
     signal.signal(signal.SIGTERM, signal_handler)
 
     try:
-        server = HTTPServer((host, port), SeleniumHTTPHandler)
+        if args.async_server:
+            run_async_server(host, port, args.pool_size, warmup=not args.no_warmup)
+            sys.exit(0)
+
+        server = BoundedThreadingHTTPServer(
+            (host, port), SeleniumHTTPHandler, args.max_workers, reuse_port=args.reuse_port
+        )
+        if not args.no_warmup:
+            # 端口已绑定但尚未开始处理请求，预热期间到达的连接会排队等待
+            warm_up_driver()
         logger.info(f"🚀 Selenium HTTP服务器启动成功")
         logger.info(f"📍 地址: http://{host}:{port}")
         logger.info(f"✅ WebDriver将保持连接状态")
@@ -6,8 +6,7 @@ Selenium MCP 服务器 - 使用hello_agents.protocols.MCPServer
 
 import json
 import logging
-from typing import Dict, Any
-from pathlib import Path
+from typing import Dict, Any, List
 import os
 
 # 禁用系统代理
@@ -15,10 +14,19 @@ for proxy_var in ['http_proxy', 'https_proxy', 'HTTP_PROXY', 'HTTPS_PROXY', 'ALL
     if proxy_var in os.environ:
         del os.environ[proxy_var]
 
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait  # noqa: E402
+
+try:
+    from .chrome_utils import (
+        POLL_FREQUENCY, build_chrome_options, clickable, create_chrome_driver,
+        present, run_batch, screenshot_result
+    )
+except ImportError:
+    # 作为独立脚本运行时没有父包
+    from chrome_utils import (
+        POLL_FREQUENCY, build_chrome_options, clickable, create_chrome_driver,
+        present, run_batch, screenshot_result
+    )
 
 try:
     from hello_agents.protocols import MCPServer
@@ -36,22 +44,18 @@ selenium_server = MCPServer(name="selenium-server", description="Selenium浏览
 # 全局WebDriver实例
 driver = None
 
+# 是否通过 webdriver-manager 解析 ChromeDriver 路径（缓存未命中时会联网下载驱动）。
+# 本服务器一直由 Selenium Manager 查找驱动，设置 YU_AGENT_USE_WEBDRIVER_MANAGER=1 时才启用
+USE_WEBDRIVER_MANAGER = os.environ.get("YU_AGENT_USE_WEBDRIVER_MANAGER", "").lower() in ("1", "true", "yes")
+
 
 def init_driver():
     """初始化WebDriver"""
     global driver
     if driver is None:
         try:
-            options = webdriver.ChromeOptions()
-            options.add_argument("--headless=new")
-            options.add_argument("--no-sandbox")
-            options.add_argument("--disable-dev-shm-usage")
-            options.add_argument("--disable-blink-features=AutomationControlled")
-            options.add_argument("--disable-proxy-auto-detect")
-            options.add_experimental_option("excludeSwitches", ["enable-automation"])
-            options.add_experimental_option('useAutomationExtension', False)
-
-            driver = webdriver.Chrome(options=options)
+            # 默认由 Selenium Manager 查找驱动，见 USE_WEBDRIVER_MANAGER
+            driver = create_chrome_driver(build_chrome_options(), use_driver_manager=USE_WEBDRIVER_MANAGER)
             logger.info("✅ WebDriver初始化成功")
         except Exception as e:
             logger.error(f"❌ WebDriver初始化失败: {e}")
@@ -75,10 +79,11 @@ def browser_navigate(url: str, wait_time: int = 10) -> str:
         logger.info(f"📍 导航到: {url}")
         driver.get(url)
 
-        # 等待页面加载
-        WebDriverWait(driver, wait_time).until(
-            lambda d: d.execute_script("return document.readyState") == "complete"
-        )
+        # 等待页面加载：driver.get() 通常在页面加载完成后才返回，先检查一次，已完成则无需进入轮询
+        if driver.execute_script("return document.readyState") != "complete":
+            WebDriverWait(driver, wait_time, poll_frequency=POLL_FREQUENCY).until(
+                lambda d: d.execute_script("return document.readyState") == "complete"
+            )
 
         result = {
             "success": True,
@@ -92,13 +97,14 @@ def browser_navigate(url: str, wait_time: int = 10) -> str:
         return json.dumps(result, ensure_ascii=False)
 
 
-def browser_screenshot(output_path: str, wait_for_selector: str = None) -> str:
+def browser_screenshot(output_path: str = None, wait_for_selector: str = None, inline: bool = False) -> str:
     """
     对当前页面进行截图
 
     Args:
-        output_path: 截图保存路径
+        output_path: 截图保存路径（inline=True 时可省略）
         wait_for_selector: 等待特定元素出现的CSS选择器（可选）
+        inline: 为 True 时以 base64 返回 PNG 数据，不写磁盘
 
     Returns:
         执行结果JSON字符串
@@ -107,27 +113,16 @@ def browser_screenshot(output_path: str, wait_for_selector: str = None) -> str:
         if driver is None:
             return json.dumps({"success": False, "error": "浏览器未初始化"}, ensure_ascii=False)
 
+        if not inline and not output_path:
+            return json.dumps({"success": False, "error": "output_path is required unless inline=True"}, ensure_ascii=False)
+
         # 如果指定了选择器，等待元素出现
         if wait_for_selector:
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, wait_for_selector))
+            WebDriverWait(driver, 10, poll_frequency=POLL_FREQUENCY).until(
+                present(wait_for_selector)
             )
 
-        # 确保输出目录存在
-        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
-
-        driver.save_screenshot(output_path)
-        file_size = Path(output_path).stat().st_size
-
-        logger.info(f"📸 截图保存: {output_path} ({file_size} bytes)")
-
-        result = {
-            "success": True,
-            "message": f"✅ 截图成功: {output_path}",
-            "file": output_path,
-            "size": file_size
-        }
-        return json.dumps(result, ensure_ascii=False)
+        return json.dumps(screenshot_result(driver.get_screenshot_as_png(), output_path, inline), ensure_ascii=False)
     except Exception as e:
         result = {"success": False, "error": str(e)}
         return json.dumps(result, ensure_ascii=False)
@@ -147,8 +142,8 @@ def browser_click(selector: str) -> str:
         if driver is None:
             return json.dumps({"success": False, "error": "浏览器未初始化"}, ensure_ascii=False)
 
-        element = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
+        element = WebDriverWait(driver, 10, poll_frequency=POLL_FREQUENCY).until(
+            clickable(selector)
         )
         element.click()
 
@@ -179,8 +174,8 @@ def browser_fill(selector: str, text: str) -> str:
         if driver is None:
             return json.dumps({"success": False, "error": "浏览器未初始化"}, ensure_ascii=False)
 
-        element = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, selector))
+        element = WebDriverWait(driver, 10, poll_frequency=POLL_FREQUENCY).until(
+            present(selector)
         )
         element.clear()
         element.send_keys(text)
@@ -221,6 +216,30 @@ def browser_close() -> str:
         return json.dumps(result, ensure_ascii=False)
 
 
+# 批量工具可用的操作：op 名 -> 工具函数
+_BATCH_OPS = {
+    "navigate": browser_navigate,
+    "screenshot": browser_screenshot,
+    "click": browser_click,
+    "fill": browser_fill,
+    "close": browser_close,
+}
+
+
+def browser_batch(actions: List[Dict[str, Any]], stop_on_error: bool = False) -> str:
+    """
+    在一次工具调用中按顺序执行多个浏览器操作
+
+    Args:
+        actions: 操作列表，形如 [{"op": "navigate", "url": ...}, {"op": "click", "selector": ...}]
+        stop_on_error: 为 True 时遇到第一个失败的操作即停止
+
+    Returns:
+        执行结果JSON字符串，results 与 actions 顺序一致
+    """
+    return json.dumps(run_batch(_BATCH_OPS, actions, stop_on_error), ensure_ascii=False)
+
+
 def get_server_info() -> str:
     """
     获取服务器信息
@@ -238,6 +257,7 @@ def get_server_info() -> str:
             "browser_click",
             "browser_fill",
             "browser_close",
+            "browser_batch",
             "get_server_info"
         ]
     }
@@ -250,6 +270,7 @@ selenium_server.add_tool(browser_screenshot)
 selenium_server.add_tool(browser_click)
 selenium_server.add_tool(browser_fill)
 selenium_server.add_tool(browser_close)
+selenium_server.add_tool(browser_batch)
 selenium_server.add_tool(get_server_info)
 
 
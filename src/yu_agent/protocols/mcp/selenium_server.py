@@ -16,10 +16,10 @@ for proxy_var in ['http_proxy', 'https_proxy', 'HTTP_PROXY', 'HTTPS_PROXY', 'ALL
 os.environ['NO_PROXY'] = '*'
 os.environ['no_proxy'] = '*'
 
-import json
-import logging
-from typing import Dict, Any
-from pathlib import Path
+import json  # noqa: E402
+import logging  # noqa: E402
+import threading  # noqa: E402
+from typing import Dict, Any, List  # noqa: E402
 
 # 添加项目根目录到路径，使得可以导入yu_agent
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -27,15 +27,14 @@ project_root = os.path.dirname(os.path.dirname(os.path.dirname(current_dir)))
 sys.path.insert(0, project_root)
 sys.path.insert(0, os.path.join(project_root, "src"))
 
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.support.ui import WebDriverWait  # noqa: E402
 
 try:
     from yu_agent.protocols.mcp.server import MCPServer
+    from yu_agent.protocols.mcp.chrome_utils import (
+        POLL_FREQUENCY, build_chrome_options, clickable, create_chrome_driver,
+        find_chrome_binary, present, run_batch, screenshot_result
+    )
 except ImportError as e:
     print(f"❌ 导入MCPServer失败: {e}")
     exit(1)
@@ -49,13 +48,20 @@ selenium_server = MCPServer(name="selenium-server", description="Selenium浏览
 
 # 全局WebDriver实例 - 在模块加载时初始化，保持整个服务器生命周期
 _driver_instance = None
+_driver_lock = threading.Lock()
 
 def get_driver():
-    """获取全局WebDriver实例，如果不存在则初始化"""
-    global _driver_instance
-    if _driver_instance is None:
-        init_driver()
-    return _driver_instance
+    """获取全局WebDriver实例，如果不存在则初始化
+
+    双重检查：实例已存在时无锁返回，只有首次初始化时加锁，避免并发调用重复启动浏览器。
+    """
+    driver = _driver_instance
+    if driver is not None:
+        return driver
+    with _driver_lock:
+        if _driver_instance is None:
+            init_driver()
+        return _driver_instance
 
 
 def init_driver():
@@ -65,41 +71,11 @@ def init_driver():
         return
 
     try:
-        options = webdriver.ChromeOptions()
-
-        # 尝试找到Chrome浏览器
-        chrome_paths = [
-            r"C:\Program Files\Google\Chrome\Application\chrome.exe",
-            r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
-            "google-chrome",
-            "google-chrome-stable",
-            "chromium"
-        ]
-
-        chrome_binary = None
-        for path in chrome_paths:
-            try:
-                if Path(path).exists():
-                    chrome_binary = path
-                    break
-            except:
-                pass
-
+        # 尝试找到Chrome浏览器（每个进程只探测一次）
+        chrome_binary = find_chrome_binary()
         if chrome_binary:
-            options.binary_location = chrome_binary
             logger.info(f"📍 使用Chrome: {chrome_binary}")
-
-        options.add_argument("--headless=new")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--disable-blink-features=AutomationControlled")
-        options.add_argument("--disable-proxy-auto-detect")
-        options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        options.add_experimental_option('useAutomationExtension', False)
-
-        # 使用webdriver-manager自动管理ChromeDriver
-        service = Service(ChromeDriverManager().install())
-        _driver_instance = webdriver.Chrome(service=service, options=options)
+        _driver_instance = create_chrome_driver(build_chrome_options(chrome_binary))
         logger.info("✅ WebDriver初始化成功")
     except Exception as e:
         logger.error(f"❌ WebDriver初始化失败: {e}")
@@ -118,21 +94,22 @@ def browser_navigate(url: str, wait_time: int = 10) -> str:
         执行结果JSON字符串
     """
     try:
-        init_driver()
+        driver = get_driver()
 
         logger.info(f"📍 导航到: {url}")
-        get_driver().get(url)
+        driver.get(url)
 
-        # 等待页面加载
-        WebDriverWait(get_driver(), wait_time).until(
-            lambda d: d.execute_script("return document.readyState") == "complete"
-        )
+        # 等待页面加载：driver.get() 通常在页面加载完成后才返回，先检查一次，已完成则无需进入轮询
+        if driver.execute_script("return document.readyState") != "complete":
+            WebDriverWait(driver, wait_time, poll_frequency=POLL_FREQUENCY).until(
+                lambda d: d.execute_script("return document.readyState") == "complete"
+            )
 
         result = {
             "success": True,
             "message": f"✅ 成功导航到: {url}",
-            "url": get_driver().current_url,
-            "title": get_driver().title
+            "url": driver.current_url,
+            "title": driver.title
         }
         return json.dumps(result, ensure_ascii=False)
     except Exception as e:
@@ -140,43 +117,33 @@ def browser_navigate(url: str, wait_time: int = 10) -> str:
         return json.dumps(result, ensure_ascii=False)
 
 
-def browser_screenshot(output_path: str, wait_for_selector: str = None) -> str:
+def browser_screenshot(output_path: str = None, wait_for_selector: str = None, inline: bool = False) -> str:
     """
     对当前页面进行截图
 
     Args:
-        output_path: 截图保存路径
+        output_path: 截图保存路径（inline=True 时可省略）
         wait_for_selector: 等待特定元素出现的CSS选择器（可选）
+        inline: 为 True 时以 base64 返回 PNG 数据，不写磁盘
 
     Returns:
         执行结果JSON字符串
     """
     try:
-        if get_driver() is None:
+        driver = get_driver()
+        if driver is None:
             return json.dumps({"success": False, "error": "浏览器未初始化"}, ensure_ascii=False)
 
+        if not inline and not output_path:
+            return json.dumps({"success": False, "error": "output_path is required unless inline=True"}, ensure_ascii=False)
+
         # 如果指定了选择器，等待元素出现
         if wait_for_selector:
-            WebDriverWait(get_driver(), 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, wait_for_selector))
+            WebDriverWait(driver, 10, poll_frequency=POLL_FREQUENCY).until(
+                present(wait_for_selector)
             )
 
-        # 确保输出目录存在，并转换为绝对路径
-        output_path = str(Path(output_path).resolve())
-        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
-
-        get_driver().save_screenshot(output_path)
-        file_size = Path(output_path).stat().st_size
-
-        logger.info(f"📸 截图保存: {output_path} ({file_size} bytes)")
-
-        result = {
-            "success": True,
-            "message": f"✅ 截图成功: {output_path}",
-            "file": output_path,
-            "size": file_size
-        }
-        return json.dumps(result, ensure_ascii=False)
+        return json.dumps(screenshot_result(driver.get_screenshot_as_png(), output_path, inline), ensure_ascii=False)
     except Exception as e:
         result = {"success": False, "error": str(e)}
         return json.dumps(result, ensure_ascii=False)
@@ -193,11 +160,12 @@ def browser_click(selector: str) -> str:
         执行结果JSON字符串
     """
     try:
-        if get_driver() is None:
+        driver = get_driver()
+        if driver is None:
             return json.dumps({"success": False, "error": "浏览器未初始化"}, ensure_ascii=False)
 
-        element = WebDriverWait(get_driver(), 10).until(
-            EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
+        element = WebDriverWait(driver, 10, poll_frequency=POLL_FREQUENCY).until(
+            clickable(selector)
         )
         element.click()
 
@@ -225,11 +193,12 @@ def browser_fill(selector: str, text: str) -> str:
         执行结果JSON字符串
     """
     try:
-        if get_driver() is None:
+        driver = get_driver()
+        if driver is None:
             return json.dumps({"success": False, "error": "浏览器未初始化"}, ensure_ascii=False)
 
-        element = WebDriverWait(get_driver(), 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, selector))
+        element = WebDriverWait(driver, 10, poll_frequency=POLL_FREQUENCY).until(
+            present(selector)
         )
         element.clear()
         element.send_keys(text)
@@ -270,6 +239,30 @@ def browser_close() -> str:
         return json.dumps(result, ensure_ascii=False)
 
 
+# 批量工具可用的操作：op 名 -> 工具函数
+_BATCH_OPS = {
+    "navigate": browser_navigate,
+    "screenshot": browser_screenshot,
+    "click": browser_click,
+    "fill": browser_fill,
+    "close": browser_close,
+}
+
+
+def browser_batch(actions: List[Dict[str, Any]], stop_on_error: bool = False) -> str:
+    """
+    在一次工具调用中按顺序执行多个浏览器操作
+
+    Args:
+        actions: 操作列表，形如 [{"op": "navigate", "url": ...}, {"op": "click", "selector": ...}]
+        stop_on_error: 为 True 时遇到第一个失败的操作即停止
+
+    Returns:
+        执行结果JSON字符串，results 与 actions 顺序一致
+    """
+    return json.dumps(run_batch(_BATCH_OPS, actions, stop_on_error), ensure_ascii=False)
+
+
 def get_server_info() -> str:
     """
     获取服务器信息
@@ -287,6 +280,7 @@ def get_server_info() -> str:
             "browser_click",
             "browser_fill",
             "browser_close",
+            "browser_batch",
             "get_server_info"
         ]
     }
@@ -299,6 +293,7 @@ selenium_server.add_tool(browser_screenshot)
 selenium_server.add_tool(browser_click)
 selenium_server.add_tool(browser_fill)
 selenium_server.add_tool(browser_close)
+selenium_server.add_tool(browser_batch)
 selenium_server.add_tool(get_server_info)
 
 
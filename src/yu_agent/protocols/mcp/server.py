@@ -5,7 +5,10 @@
 fastmcp 是一个快速创建 MCP 服务器的 Python 库。
 """
 
-from typing import Dict, Any, List, Optional, Callable
+import asyncio
+import functools
+import inspect
+from typing import Dict, Any, List, Optional, Callable, Iterable, Tuple, Union
 try:
     from fastmcp import FastMCP
 except ImportError:
@@ -17,11 +20,14 @@ except ImportError:
 
 class MCPServer:
     """基于 fastmcp 库的 MCP 服务器"""
+
+    __slots__ = ("mcp", "name", "description", "_bare_tool", "_bare_prompt", "_sem")
     
     def __init__(
         self,
         name: str,
-        description: Optional[str] = None
+        description: Optional[str] = None,
+        max_concurrency: Optional[int] = None
     ):
         """
         初始化 MCP 服务器
@@ -29,10 +35,18 @@ class MCPServer:
         Args:
             name: 服务器名称
             description: 服务器描述
+            max_concurrency: 工具并发执行上限（可选）。设置后每个工具都由同一个
+                asyncio.Semaphore 限流，同步工具放到线程中执行，不再阻塞事件循环，
+                http/sse 传输下互不相关的工具调用可以并行处理。
+                同步工具需要是线程安全的；默认不启用，工具按原样注册
         """
         self.mcp = FastMCP(name=name)
         self.name = name
         self.description = description or f"{name} MCP Server"
+        self._sem = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        # 不带参数的注册装饰器可以复用，避免每次注册都重新构造
+        self._bare_tool = self.mcp.tool()
+        self._bare_prompt = self.mcp.prompt()
         
     def add_tool(
         self,
@@ -48,12 +62,60 @@ class MCPServer:
             name: 工具名称（可选，默认使用函数名）
             description: 工具描述（可选，默认使用函数文档字符串）
         """
+        func = self._bounded(func)
         # 使用装饰器注册工具
         if name or description:
             self.mcp.tool(name=name, description=description)(func)
         else:
-            self.mcp.tool()(func)
+            self._bare_tool(func)
+
+    def add_tools(
+        self,
+        tools: Iterable[Union[Callable, Tuple[Callable, Optional[str], Optional[str]]]]
+    ):
+        """
+        批量添加工具到服务器
+
+        启动时注册大量工具时使用：只在一个循环内完成注册，
+        不带名称/描述的工具复用同一个装饰器。
+
+        Args:
+            tools: 工具列表，元素为函数本身或 (func, name, description) 元组
+        """
+        bare_tool = self._bare_tool
+        tool = self.mcp.tool
+        for entry in tools:
+            if callable(entry):
+                bare_tool(self._bounded(entry))
+                continue
+            func, name, description = entry
+            func = self._bounded(func)
+            if name or description:
+                tool(name=name, description=description)(func)
+            else:
+                bare_tool(func)
         
+    def _bounded(self, func: Callable) -> Callable:
+        """按 max_concurrency 包装工具函数；未启用时原样返回
+
+        functools.wraps 保留 __wrapped__，FastMCP 仍按原函数签名生成参数 schema。
+        """
+        sem = self._sem
+        if sem is None:
+            return func
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                async with sem:
+                    return await func(*args, **kwargs)
+        else:
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                async with sem:
+                    return await asyncio.to_thread(func, *args, **kwargs)
+        return wrapper
+
     def add_resource(
         self,
         func: Callable,
@@ -94,11 +156,14 @@ class MCPServer:
         if name or description:
             self.mcp.prompt(name=name, description=description)(func)
         else:
-            self.mcp.prompt()(func)
+            self._bare_prompt(func)
         
     def run(self, transport: str = "stdio", **kwargs):
         """运行服务器
 
+        stdio 传输只有一个客户端、一条管道，请求按顺序处理；需要服务多个并发客户端时
+        应使用 http/sse 传输。网络传输下如果安装了 uvloop，会自动使用 uvloop 事件循环。
+
         Args:
             transport: 传输方式 ("stdio", "http", "sse")
             **kwargs: 传输特定的参数
@@ -116,6 +181,8 @@ class MCPServer:
             # SSE 传输
             server.run(transport="sse", host="0.0.0.0", port=8081)
         """
+        if transport in ("http", "sse") and _run_with_uvloop(self.mcp, transport, **kwargs):
+            return
         self.mcp.run(transport=transport, **kwargs)
         
     def get_info(self) -> Dict[str, Any]:
@@ -132,10 +199,25 @@ class MCPServer:
         }
 
 
+def _run_with_uvloop(mcp, transport: str, **kwargs) -> bool:
+    """在 uvloop 事件循环中运行服务器（可选依赖，未安装时返回 False，由调用方使用默认事件循环）
+
+    uvloop.run 只为这次运行创建事件循环，不修改进程级的事件循环策略。
+    """
+    try:
+        import uvloop
+    except ImportError:
+        return False
+    uvloop.run(mcp.run_async(transport=transport, **kwargs))
+    return True
+
+
 # 便捷的服务器构建器
 class MCPServerBuilder:
     """MCP 服务器构建器，提供链式 API"""
 
+    __slots__ = ("server",)
+
     def __init__(self, name: str, description: Optional[str] = None):
         self.server = MCPServer(name, description)
         
@@ -143,6 +225,11 @@ class MCPServerBuilder:
         """添加工具（链式调用）"""
         self.server.add_tool(func, name, description)
         return self
+
+    def with_tools(self, tools: Iterable[Union[Callable, Tuple[Callable, Optional[str], Optional[str]]]]) -> 'MCPServerBuilder':
+        """批量添加工具（链式调用），参数格式同 MCPServer.add_tools"""
+        self.server.add_tools(tools)
+        return self
         
     def with_resource(self, func: Callable, uri: Optional[str] = None, name: Optional[str] = None, description: Optional[str] = None) -> 'MCPServerBuilder':
         """添加资源（链式调用）"""
@@ -176,17 +263,12 @@ def create_example_server() -> MCPServer:
         """计算数学表达式
         
         Args:
-            expression: 要计算的数学表达式，例如 "2 + 2" 或 "10 * 5"
-        """
-        try:
-            # 安全的表达式求值（仅支持基本运算）
-            allowed_chars = set("0123456789+-*/() .")
-            if not all(c in allowed_chars for c in expression):
-                return f"Error: Invalid characters in expression"
-            result = eval(expression)
-            return f"Result: {result}"
-        except Exception as e:
-            return f"Error: {str(e)}"
+            expression: 要计算的数学表达式，例如 "2 + 2" 或 "sqrt(16)"
+        """
+        # 交给 CalculatorTool：语法树白名单校验后再执行，不直接 eval 用户输入。
+        # 在函数内导入，避免启动服务器时加载整个工具包
+        from ...tools.builtin.calculator import calculate
+        return calculate(expression)
     
     server.add_tool(calculator, name="calculator", description="Calculate a mathematical expression")
     
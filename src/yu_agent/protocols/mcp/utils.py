@@ -5,9 +5,49 @@ MCP 协议工具函数
 这些函数主要用于处理 MCP 协议的数据结构。
 """
 
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, List, Optional, TypedDict, Union
 import json
 
+# 上下文解析与响应编码优先使用 orjson，未安装时回退到标准库 json
+try:
+    import orjson
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:
+    _loads = json.loads
+
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
+class _ErrorBodyRequired(TypedDict):
+    message: str
+    code: str
+
+
+class ErrorBody(_ErrorBodyRequired, total=False):
+    """错误响应中的 error 字段"""
+    details: Dict[str, Any]
+
+
+class ErrorResponse(TypedDict):
+    """create_error_response 的返回结构"""
+    error: ErrorBody
+
+
+class _SuccessResponseRequired(TypedDict):
+    success: bool
+    data: Any
+
+
+class SuccessResponse(_SuccessResponseRequired, total=False):
+    """create_success_response 的返回结构"""
+    metadata: Dict[str, Any]
+
+
+# 上下文的必需字段
+_CONTEXT_FIELDS = frozenset(("messages", "tools", "resources", "metadata"))
+
 
 def create_context(
     messages: Optional[List[Dict[str, Any]]] = None,
@@ -33,11 +73,12 @@ def create_context(
         ...     tools=[{"name": "calculator", "description": "计算器"}]
         ... )
     """
+    # 只为未传入的字段分配新的空容器；返回的上下文归调用方所有，不能共享不可变的单例
     return {
-        "messages": messages or [],
-        "tools": tools or [],
-        "resources": resources or [],
-        "metadata": metadata or {}
+        "messages": messages if messages is not None else [],
+        "tools": tools if tools is not None else [],
+        "resources": resources if resources is not None else [],
+        "metadata": metadata if metadata is not None else {}
     }
 
 
@@ -60,26 +101,26 @@ def parse_context(context: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
     """
     if isinstance(context, str):
         try:
-            context = json.loads(context)
-        except json.JSONDecodeError as e:
+            context = _loads(context)
+        except ValueError as e:
             raise ValueError(f"Invalid JSON context: {e}")
     
     if not isinstance(context, dict):
         raise ValueError("Context must be a dictionary or JSON string")
     
-    # 确保必需字段存在
-    for field in ["messages", "tools", "resources"]:
-        context.setdefault(field, [])
-    context.setdefault("metadata", {})
-    
-    return context
+    # 确保必需字段存在：已有字段（包括额外字段）原样保留，只为缺失的字段分配空容器。
+    # 返回新字典，不再修改调用方传入的 context
+    result = dict(context)
+    for field in _CONTEXT_FIELDS - context.keys():
+        result[field] = {} if field == "metadata" else []
+    return result
 
 
 def create_error_response(
     error_message: str,
     error_code: Optional[str] = None,
     details: Optional[Dict[str, Any]] = None
-) -> Dict[str, Any]:
+) -> ErrorResponse:
     """
     创建错误响应
     
@@ -94,23 +135,17 @@ def create_error_response(
     Example:
         >>> error = create_error_response("Tool not found", "TOOL_NOT_FOUND")
     """
-    response = {
-        "error": {
-            "message": error_message,
-            "code": error_code or "UNKNOWN_ERROR"
-        }
-    }
-    
+    # 每种形状一次构造完成，不再创建后追加字段
+    code = error_code or "UNKNOWN_ERROR"
     if details:
-        response["error"]["details"] = details
-    
-    return response
+        return {"error": {"message": error_message, "code": code, "details": details}}
+    return {"error": {"message": error_message, "code": code}}
 
 
 def create_success_response(
     data: Any,
     metadata: Optional[Dict[str, Any]] = None
-) -> Dict[str, Any]:
+) -> SuccessResponse:
     """
     创建成功响应
     
@@ -124,15 +159,39 @@ def create_success_response(
     Example:
         >>> response = create_success_response({"result": 42})
     """
-    response = {
-        "success": True,
-        "data": data
-    }
-    
     if metadata:
-        response["metadata"] = metadata
-    
-    return response
+        return {"success": True, "data": data, "metadata": metadata}
+    return {"success": True, "data": data}
+
+
+def create_error_bytes(
+    error_message: str,
+    error_code: Optional[str] = None,
+    details: Optional[Dict[str, Any]] = None
+) -> bytes:
+    """
+    创建已编码为 JSON（UTF-8 bytes）的错误响应
+
+    参数与 create_error_response 相同。适用于直接写出响应体的高频处理函数，
+    省去上层再做一次序列化。
+    """
+    return _dumps(create_error_response(error_message, error_code, details))
+
+
+def create_success_bytes(
+    data: Any,
+    metadata: Optional[Dict[str, Any]] = None
+) -> bytes:
+    """
+    创建已编码为 JSON（UTF-8 bytes）的成功响应
+
+    参数与 create_success_response 相同。
+
+    Example:
+        >>> create_success_bytes({"result": 42})
+        b'{"success":true,"data":{"result":42}}'
+    """
+    return _dumps(create_success_response(data, metadata))
 
 
 __all__ = [
@@ -140,5 +199,10 @@ __all__ = [
     "parse_context",
     "create_error_response",
     "create_success_response",
+    "create_error_bytes",
+    "create_success_bytes",
+    "ErrorBody",
+    "ErrorResponse",
+    "SuccessResponse",
 ]
 
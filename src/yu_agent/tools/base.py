@@ -14,6 +14,9 @@ class ToolParameter(BaseModel):
 
 class Tool(ABC):
     """工具基类"""
+
+    # 基类只声明自身属性；未声明 __slots__ 的子类仍然拥有 __dict__，行为不变
+    __slots__ = ("name", "description")
     
     def __init__(self, name: str, description: str):
         self.name = name
@@ -1,17 +1,28 @@
 """计算器工具"""
 
 import ast
+import logging
 import operator
 import math
+from functools import lru_cache
 from typing import Dict, Any
 
 from ..base import Tool
 from ...core.exceptions import ToolException
 
+logger = logging.getLogger(__name__)
+
+# numexpr（可选）：纯数值表达式可以交给它的 C 实现计算
+try:
+    import numexpr
+    import numpy as np
+except ImportError:
+    numexpr = None
+
 class CalculatorTool(Tool):
     """Python计算器工具"""
     
-    # 支持的操作符
+    # 支持的操作符（只用于校验，运算由编译后的字节码执行）
     OPERATORS = {
         ast.Add: operator.add,
         ast.Sub: operator.sub,
@@ -38,6 +49,9 @@ class CalculatorTool(Tool):
         'pi': math.pi,
         'e': math.e,
     }
+
+    # 校验用的名字白名单（与 FUNCTIONS 同源，校验与执行共用一份白名单）
+    _FUNC_NAMES = frozenset(FUNCTIONS)
     
     def __init__(self):
         super().__init__(
@@ -50,58 +64,59 @@ class CalculatorTool(Tool):
         执行计算
 
         Args:
-            parameters: 包含input参数的字典
+            parameters: 包含input参数的字典；vectorized=True 时纯数值表达式交给 numexpr 计算
 
         Returns:
             计算结果
         """
         # 支持两种参数格式：input 和 expression
         expression = parameters.get("input", "") or parameters.get("expression", "")
+        vectorized = bool(parameters.get("vectorized", False))
         if not expression:
             return "错误：计算表达式不能为空"
 
-        print(f"🧮 正在计算: {expression}")
+        # 使用惰性格式化的 debug 日志：未开启 DEBUG 时不格式化字符串，也不争用 stdout
+        logger.debug("🧮 正在计算: %s", expression)
 
         try:
-            # 解析表达式
-            node = ast.parse(expression, mode='eval')
-            result = self._eval_node(node.body)
-            result_str = str(result)
-            print(f"✅ 计算结果: {result_str}")
+            result_str = _cached_eval(expression.strip(), vectorized)
+            logger.debug("✅ 计算结果: %s", result_str)
             return result_str
         except Exception as e:
             error_msg = f"计算失败: {str(e)}"
-            print(f"❌ {error_msg}")
+            logger.debug("❌ %s", error_msg)
             return error_msg
     
-    def _eval_node(self, node):
-        """递归计算AST节点"""
-        if isinstance(node, ast.Constant):  # Python 3.8+
-            return node.value
-        elif isinstance(node, ast.Num):  # Python < 3.8
-            return node.n
+    @classmethod
+    def _validate_node(cls, node):
+        """递归校验AST节点，只允许常量、白名单运算符和 _FUNC_NAMES 中的函数/常量
+
+        运算本身交给编译后的字节码执行，这里只负责拒绝不安全的语法。
+        """
+        if isinstance(node, ast.Constant):
+            return
         elif isinstance(node, ast.BinOp):
-            return self.OPERATORS[type(node.op)](
-                self._eval_node(node.left), 
-                self._eval_node(node.right)
-            )
+            if type(node.op) not in cls.OPERATORS:
+                raise ValueError(f"不支持的运算符: {type(node.op).__name__}")
+            cls._validate_node(node.left)
+            cls._validate_node(node.right)
         elif isinstance(node, ast.UnaryOp):
-            return self.OPERATORS[type(node.op)](self._eval_node(node.operand))
+            if type(node.op) not in cls.OPERATORS:
+                raise ValueError(f"不支持的运算符: {type(node.op).__name__}")
+            cls._validate_node(node.operand)
         elif isinstance(node, ast.Call):
-            func_name = node.func.id
-            if func_name in self.FUNCTIONS:
-                args = [self._eval_node(arg) for arg in node.args]
-                return self.FUNCTIONS[func_name](*args)
-            else:
-                raise ValueError(f"不支持的函数: {func_name}")
+            if not isinstance(node.func, ast.Name) or node.func.id not in cls._FUNC_NAMES:
+                raise ValueError(f"不支持的函数: {getattr(node.func, 'id', ast.unparse(node.func))}")
+            if node.keywords:
+                raise ValueError(f"不支持关键字参数: {node.func.id}")
+            for arg in node.args:
+                cls._validate_node(arg)
         elif isinstance(node, ast.Name):
-            if node.id in self.FUNCTIONS:
-                return self.FUNCTIONS[node.id]
-            else:
+            if node.id not in cls._FUNC_NAMES:
                 raise ValueError(f"未定义的变量: {node.id}")
         else:
             raise ValueError(f"不支持的表达式类型: {type(node)}")
-    
+
     def get_parameters(self):
         """获取工具参数定义"""
         from ..base import ToolParameter
@@ -111,9 +126,79 @@ class CalculatorTool(Tool):
                 type="string",
                 description="要计算的数学表达式，支持基本运算和数学函数",
                 required=True
+            ),
+            ToolParameter(
+                name="vectorized",
+                type="boolean",
+                description="是否使用 numexpr 计算纯数值表达式（需要安装 numexpr，整数按 64 位计算）",
+                required=False,
+                default=False
             )
         ]
 
+
+# eval 使用的全局命名空间：禁用所有内置函数，名字只能解析到 CalculatorTool.FUNCTIONS
+_EVAL_GLOBALS = {"__builtins__": {}}
+
+# numexpr 支持的运算与函数（FUNCTIONS 的子集）
+_NUMEXPR_OPS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.USub)
+_NUMEXPR_FUNCTIONS = frozenset({'abs', 'sqrt', 'sin', 'cos', 'tan', 'log', 'exp'})
+_NUMEXPR_CONSTANTS = {'pi': math.pi, 'e': math.e}
+
+
+def _numexpr_compatible(node) -> bool:
+    """判断（已通过白名单校验的）表达式是否只包含 numexpr 能计算的数值运算"""
+    for child in ast.walk(node):
+        if isinstance(child, (ast.BinOp, ast.UnaryOp)):
+            if not isinstance(child.op, _NUMEXPR_OPS):
+                return False
+        elif isinstance(child, ast.Call):
+            if child.func.id not in _NUMEXPR_FUNCTIONS or len(child.args) != 1:
+                return False
+        elif isinstance(child, ast.Name):
+            if child.id not in _NUMEXPR_FUNCTIONS and child.id not in _NUMEXPR_CONSTANTS:
+                return False
+        elif isinstance(child, ast.Constant):
+            if type(child.value) not in (int, float):
+                return False
+        elif not isinstance(child, (ast.operator, ast.unaryop, ast.expr_context)):
+            return False
+    return True
+
+
+@lru_cache(maxsize=1024)
+def _cached_eval(expr: str, vectorized: bool = False) -> str:
+    """
+    解析、校验并计算表达式，返回结果字符串
+
+    语法树通过白名单校验后编译为字节码执行，运算在解释器内部完成，
+    不再逐个节点递归求值。纯函数，按表达式字符串缓存：重复出现的表达式直接命中缓存。
+    计算失败时抛出异常（异常不会被缓存）。
+
+    vectorized=True 且安装了 numexpr 时，纯数值表达式由 numexpr 计算；
+    numexpr 无法处理的表达式回退到字节码执行。numexpr 遇到 log(0)、sqrt(-1)、1/0
+    等不报错而是得到 inf/nan，这类非有限结果也回退到字节码执行，
+    由它抛出与默认路径相同的错误。
+    """
+    tree = ast.parse(expr, mode='eval')
+    CalculatorTool._validate_node(tree.body)
+    if vectorized and numexpr is not None and _numexpr_compatible(tree.body):
+        try:
+            # 非有限结果在下面统一处理，不需要 numpy 在常量折叠时再发 RuntimeWarning
+            with np.errstate(all="ignore"):
+                value = numexpr.evaluate(expr, local_dict=_NUMEXPR_CONSTANTS).item()
+        except Exception:
+            value = None
+        if value is not None and math.isfinite(value):
+            return str(value)
+    code = compile(tree, '<calc>', 'eval')
+    return str(eval(code, _EVAL_GLOBALS, CalculatorTool.FUNCTIONS))
+
+
+# 便捷函数共用的工具实例（CalculatorTool 无状态，可以复用）
+_default_calculator = CalculatorTool()
+
+
 # 便捷函数
 def calculate(expression: str) -> str:
     """
@@ -125,5 +210,4 @@ def calculate(expression: str) -> str:
     Returns:
         计算结果字符串
     """
-    tool = CalculatorTool()
-    return tool.run({"input": expression})
+    return _default_calculator.run({"input": expression})
@@ -25,10 +25,194 @@ terminal.show_directory_structure(".")
 ```
 """
 
+import os
 import platform
+import queue
+import shlex
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
 from typing import Optional
 from .terminal_tool import TerminalTool
 
+# 操作系统在进程内不会变化，导入时检测一次
+_SYSTEM = platform.system()
+_IS_WINDOWS = _SYSTEM == "Windows"
+_IS_UNIX = _SYSTEM in ("Linux", "Darwin")  # Darwin = macOS
+
+# 各平台的命令模板，按当前平台在导入时选定一套，调用时只需 format。
+# 参数在填入模板前已经转义（见 _quote / _quote_head），模板中不再加引号
+_WINDOWS_TEMPLATES = {
+    "list": "dir /B {0}",                      # 简洁模式
+    "list_detailed": "dir /A {0}",             # 显示所有，包括隐藏
+    "search": "findstr /S /R {0} {1}\\*",      # 递归搜索
+    "tree": "tree /F {0}",                     # 显示文件
+    "count": "find /C /V \"\" {0}",            # 统计行数
+    "head": "powershell -Command \"Get-Content {0} -Head {1}\"",
+    "cat": "type {0}",
+}
+_UNIX_TEMPLATES = {
+    "list": "ls -la {0}",
+    "list_detailed": "ls -laR {0}",
+    "search": "grep -r {0} {1}",
+    "tree": "tree -L 3 {0}",
+    "count": "wc -l {0}",
+    "head": "head -n {1} {0}",
+    "cat": "cat {0}",
+}
+
+if _IS_WINDOWS:
+    def _quote(arg: str) -> str:
+        """按 cmd.exe 规则转义参数（cmd 不识别单引号）"""
+        return subprocess.list2cmdline([arg])
+
+    def _quote_head(arg: str) -> str:
+        """转义为 PowerShell 单引号字面量（head 模板整体已在 cmd 双引号内）"""
+        return "'" + arg.replace("'", "''") + "'"
+else:
+    _quote = shlex.quote
+    _quote_head = shlex.quote
+
+
+class _PersistentShell:
+    """常驻 shell 进程
+
+    命令通过 stdin 写入同一个 shell，命令结束后先输出一个换行、再输出一行带唯一标记的结束符
+    （附带返回码），读取 stdout 直到遇到该标记。额外的换行保证标记总是位于行首
+    （命令输出末尾没有换行时也一样），读取后再去掉。命令的 stderr 重定向到临时文件，
+    结束后读出并按 TerminalTool 的 [stderr] 格式附加。省去每条命令 fork/exec 一个新 shell 的开销。
+    超时或 shell 意外退出时终止进程，下一条命令会重新启动 shell。
+    """
+
+    def __init__(self):
+        self._proc: Optional[subprocess.Popen] = None
+        # 命令 stderr 的临时文件，随 shell 进程创建和删除
+        self._err_path: Optional[str] = None
+        self._lines: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._lock = threading.Lock()
+
+    def _start(self):
+        if _IS_WINDOWS:
+            # /Q 关闭命令回显（同时不输出提示符），/D 不执行 AutoRun
+            args = ["cmd.exe", "/Q", "/D"]
+        else:
+            args = [shutil.which("bash") or "/bin/sh"]
+            if args[0].endswith("bash"):
+                args += ["--noprofile", "--norc"]
+        fd, self._err_path = tempfile.mkstemp(prefix="yu_shell_", suffix=".err")
+        os.close(fd)
+        self._proc = subprocess.Popen(
+            args,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
+        )
+        self._lines = queue.Queue()
+        threading.Thread(
+            target=self._pump, args=(self._proc.stdout, self._lines), daemon=True
+        ).start()
+
+    @staticmethod
+    def _pump(stream, lines: "queue.Queue[Optional[str]]"):
+        """后台线程：逐行读取 shell 输出，EOF 时放入 None"""
+        for line in stream:
+            lines.put(line)
+        lines.put(None)
+
+    def run(self, command: str, cwd: Path, timeout: int, max_output_size: int) -> str:
+        """在 cwd 下执行命令，输出格式与 TerminalTool._execute_command 一致（stderr 已合并到输出）"""
+        with self._lock:
+            if self._proc is None or self._proc.poll() is not None:
+                self._start()
+            marker = f"__DONE_{uuid.uuid4().hex}__"
+            if _IS_WINDOWS:
+                # %ERRORLEVEL% 在整行解析时展开，取到的仍是上一行命令的返回码
+                script = (
+                    f"cd /D {_quote(str(cwd))} && ({command}) < NUL 2> {_quote(self._err_path)}\n"
+                    f"echo.& echo {marker} %ERRORLEVEL%\n"
+                )
+            else:
+                # 每次先 cd 到 TerminalTool 的当前目录；stdin 重定向，防止命令读走后续输入
+                script = (
+                    f"cd {shlex.quote(str(cwd))} && {{ {command}\n}} < /dev/null 2> {shlex.quote(self._err_path)}\n"
+                    f"printf '\\n%s %s\\n' \"{marker}\" $?\n"
+                )
+            try:
+                # 先清空上一条命令的 stderr（cd 失败时重定向不会生效）
+                open(self._err_path, "w").close()
+                self._proc.stdin.write(script)
+                self._proc.stdin.flush()
+            except OSError as e:
+                self.close()
+                return f"❌ 命令执行失败: {e}"
+
+            output = []
+            size = 0
+            complete = True  # 输出超过上限后不再收集，此时末尾的额外换行也不在 output 中
+            returncode = None
+            deadline = time.monotonic() + timeout
+            while True:
+                try:
+                    line = self._lines.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    self.close()
+                    return f"❌ 命令执行超时（超过 {timeout} 秒）"
+                if line is None:
+                    self.close()
+                    return "❌ 命令执行失败: shell 进程意外退出"
+                if line.startswith(marker):
+                    returncode = int(line[len(marker):].strip() or 0)
+                    break
+                if size <= max_output_size:
+                    output.append(line)
+                    size += len(line)
+                else:
+                    complete = False
+            stderr = self._read_stderr()
+
+        text = "".join(output)
+        # 去掉结束标记前额外输出的换行
+        if complete and text.endswith("\n"):
+            text = text[:-1]
+        if stderr:
+            text += f"\n[stderr]\n{stderr}"
+        if len(text) > max_output_size:
+            text = text[:max_output_size]
+            text += f"\n\n⚠️ 输出被截断（超过 {max_output_size} 字节）"
+        if returncode != 0:
+            text = f"⚠️ 命令返回码: {returncode}\n\n{text}"
+        return text if text else "✅ 命令执行成功（无输出）"
+
+    def _read_stderr(self) -> str:
+        """读取上一条命令写入临时文件的 stderr"""
+        try:
+            with open(self._err_path, encoding="utf-8", errors="replace") as f:
+                return f.read()
+        except OSError:
+            return ""
+
+    def close(self):
+        """终止 shell 进程并删除 stderr 临时文件"""
+        proc, self._proc = self._proc, None
+        err_path, self._err_path = self._err_path, None
+        if proc is not None:
+            try:
+                proc.kill()
+                proc.wait(timeout=5)
+            except Exception:
+                pass
+        if err_path is not None:
+            try:
+                os.unlink(err_path)
+            except OSError:
+                pass
+
 
 class CrossPlatformTerminal:
     """跨平台终端工具包装器
@@ -63,15 +247,46 @@ class CrossPlatformTerminal:
     ```
     """
 
-    def __init__(self, workspace: str = "."):
+    is_windows = _IS_WINDOWS
+    is_linux = _IS_UNIX
+    _tpl = _WINDOWS_TEMPLATES if _IS_WINDOWS else _UNIX_TEMPLATES
+
+    def __init__(self, workspace: str = ".", persistent_shell: bool = False):
         """初始化跨平台终端
 
         Args:
             workspace: 工作目录
+            persistent_shell: 是否在一个常驻 shell 进程中执行命令（而不是每条命令启动一个新进程），
+                适合连续执行大量短命令的场景；命令仍经过 TerminalTool 的白名单检查
         """
         self.terminal = TerminalTool(workspace=workspace)
-        self.is_windows = platform.system() == "Windows"
-        self.is_linux = platform.system() in ("Linux", "Darwin")  # Darwin = macOS
+        self._shell = _PersistentShell() if persistent_shell else None
+
+    def _run(self, command: str) -> str:
+        """执行命令：启用常驻 shell 时在其中执行，否则交给 TerminalTool"""
+        if self._shell is None:
+            return self.terminal.run({"command": command})
+        try:
+            parts = shlex.split(command)
+        except ValueError as e:
+            return f"❌ 命令解析失败: {e}"
+        if not parts or parts[0] == "cd" or parts[0] not in self.terminal.ALLOWED_COMMANDS:
+            # 空命令、cd 和不在白名单中的命令仍由 TerminalTool 处理（更新当前目录/返回相同的错误信息）
+            return self.terminal.run({"command": command})
+        return self._shell.run(
+            command, self.terminal.current_dir, self.terminal.timeout, self.terminal.max_output_size
+        )
+
+    def close(self):
+        """关闭常驻 shell 进程（未启用时无操作）"""
+        if self._shell is not None:
+            self._shell.close()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
 
     def list_files(self, path: str = ".") -> str:
         """列出目录文件 - 跨平台
@@ -90,14 +305,7 @@ class CrossPlatformTerminal:
             # Windows 输出: dir /B 的结果
             # Linux 输出: ls -la 的结果
         """
-        if self.is_windows:
-            # Windows: dir /B (简洁模式)
-            cmd = f"dir /B {path}"
-        else:
-            # Linux/Mac: ls -la
-            cmd = f"ls -la {path}"
-
-        return self.terminal.run({"command": cmd})
+        return self._run(self._tpl["list"].format(_quote(path)))
 
     def list_files_detailed(self, path: str = ".") -> str:
         """列出目录文件（详细信息） - 跨平台
@@ -110,14 +318,7 @@ class CrossPlatformTerminal:
         Returns:
             命令执行结果
         """
-        if self.is_windows:
-            # Windows: dir /A (显示所有，包括隐藏)
-            cmd = f"dir /A {path}"
-        else:
-            # Linux/Mac: ls -laR
-            cmd = f"ls -laR {path}"
-
-        return self.terminal.run({"command": cmd})
+        return self._run(self._tpl["list_detailed"].format(_quote(path)))
 
     def search_pattern(self, pattern: str, path: str = ".") -> str:
         """搜索文件内容 - 跨平台
@@ -134,17 +335,10 @@ class CrossPlatformTerminal:
         示例：
             >>> terminal = CrossPlatformTerminal()
             >>> print(terminal.search_pattern("def", "."))
-            # Windows 输出: findstr /S /R "def" .\* 的结果
-            # Linux 输出: grep -r "def" . 的结果
+            # Windows 输出: findstr /S /R def .\* 的结果
+            # Linux 输出: grep -r def . 的结果
         """
-        if self.is_windows:
-            # Windows: findstr /R "pattern" (递归搜索)
-            cmd = f"findstr /S /R \"{pattern}\" {path}\\*"
-        else:
-            # Linux/Mac: grep -r "pattern"
-            cmd = f"grep -r \"{pattern}\" {path}"
-
-        return self.terminal.run({"command": cmd})
+        return self._run(self._tpl["search"].format(_quote(pattern), _quote(path)))
 
     def show_directory_structure(self, path: str = ".") -> str:
         """显示目录树形结构 - 跨平台
@@ -162,14 +356,7 @@ class CrossPlatformTerminal:
             >>> print(terminal.show_directory_structure("."))
             # 显示目录树
         """
-        if self.is_windows:
-            # Windows: tree /F (显示文件)
-            cmd = f"tree /F {path}"
-        else:
-            # Linux/Mac: tree -L 3
-            cmd = f"tree -L 3 {path}"
-
-        return self.terminal.run({"command": cmd})
+        return self._run(self._tpl["tree"].format(_quote(path)))
 
     def count_lines(self, filepath: str) -> str:
         """统计文件行数 - 跨平台
@@ -188,14 +375,7 @@ class CrossPlatformTerminal:
             # Windows 输出: 行数信息
             # Linux 输出: 行数信息
         """
-        if self.is_windows:
-            # Windows: find /C /V "" (统计行数)
-            cmd = f"find /C /V \"\" {filepath}"
-        else:
-            # Linux/Mac: wc -l
-            cmd = f"wc -l {filepath}"
-
-        return self.terminal.run({"command": cmd})
+        return self._run(self._tpl["count"].format(_quote(filepath)))
 
     def change_directory(self, target_dir: str) -> str:
         """改变目录 - 跨平台
@@ -244,21 +424,10 @@ class CrossPlatformTerminal:
             >>> print(terminal.show_file_content("main.py", lines=20))
         """
         if lines:
-            if self.is_windows:
-                # Windows: 使用powershell
-                cmd = f"powershell -Command \"Get-Content '{filepath}' -Head {lines}\""
-            else:
-                # Linux/Mac: head -n
-                cmd = f"head -n {lines} {filepath}"
+            cmd = self._tpl["head"].format(_quote_head(filepath), int(lines))
         else:
-            if self.is_windows:
-                # Windows: type
-                cmd = f"type {filepath}"
-            else:
-                # Linux/Mac: cat
-                cmd = f"cat {filepath}"
-
-        return self.terminal.run({"command": cmd})
+            cmd = self._tpl["cat"].format(_quote(filepath))
+        return self._run(cmd)
 
     def run_custom_command(self, command: str) -> str:
         """运行自定义命令（仅当需要特定平台命令时使用）
@@ -277,4 +446,4 @@ class CrossPlatformTerminal:
             >>> # 直接运行特定平台命令
             >>> print(terminal.run_custom_command("echo 'hello'"))
         """
-        return self.terminal.run({"command": command})
+        return self._run(command)
@@ -4,12 +4,166 @@
 可以作为工具添加到任何Agent中，为Agent提供记忆功能。
 """
 
+import logging
+import re
+import sys
+import threading
+import time
+import weakref
+from collections import deque
 from typing import Optional, List, Dict, Any
 from datetime import datetime  # 使用标准库 datetime
 
 from ..base import Tool, ToolParameter
 from ...memory import MemoryManager, MemoryConfig
 
+logger = logging.getLogger(__name__)
+
+# 记忆类型名（驻留字符串）：模块内统一使用这些常量，相等比较可直接命中同一对象
+_WORKING = sys.intern("working")
+_EPISODIC = sys.intern("episodic")
+_SEMANTIC = sys.intern("semantic")
+_PERCEPTUAL = sys.intern("perceptual")
+
+# 感知记忆：文件扩展名 -> 模态，未列出的扩展名按 text 处理
+_EXT_MODALITY = {
+    **dict.fromkeys(("png", "jpg", "jpeg", "bmp", "gif", "webp"), "image"),
+    **dict.fromkeys(("mp3", "wav", "flac", "m4a", "ogg"), "audio"),
+}
+
+# 记忆类型的中文名称（用于格式化输出）
+_TYPE_LABEL = {
+    _WORKING: "工作记忆",
+    _EPISODIC: "情景记忆",
+    _SEMANTIC: "语义记忆",
+    _PERCEPTUAL: "感知记忆",
+}
+
+
+def _preview(content: str, max_chars: int) -> str:
+    """截取内容预览，超出长度时添加省略号"""
+    return content[:max_chars] + "..." if len(content) > max_chars else content
+
+
+# 用户输入中出现这些词时，本轮对话额外记录为情景记忆
+_RECORD_TRIGGERS = ("重要", "记住", "务必", "牢记")
+# 所有触发词预编译为一个正则，只需扫描一遍输入即可完成匹配
+_RECORD_TRIGGER_RE = re.compile("|".join(map(re.escape, _RECORD_TRIGGERS)))
+
+# 各操作失败时的提示前缀；异常统一在 execute 中捕获并转换为 "<前缀>: <原因>"
+_ACTION_FAILURE = {
+    "add": "添加记忆失败",
+    "search": "搜索记忆失败",
+    "summary": "获取摘要失败",
+    "stats": "获取统计信息失败",
+    "update": "更新记忆失败",
+    "remove": "删除记忆失败",
+    "forget": "遗忘记忆失败",
+    "consolidate": "整合记忆失败",
+    "clear_all": "清空记忆失败",
+}
+
+# 摘要模板：头部一次格式化，各分区的行由生成器产出后各 join 一次
+_SUMMARY_HEADER = "记忆系统摘要\n总记忆数: {total}\n当前会话: {session}\n对话轮次: {turns}"
+_SUMMARY_TYPE_ROW = "  • {label}: {count} 条 (平均重要性: {avg:.2f})"
+_SUMMARY_MEMORY_ROW = "  {index}. {preview} (重要性: {importance:.2f})"
+
+# 摘要缓存的有效期（秒）：记忆未变化时，重复调用 summary 直接返回上次的结果
+_SUMMARY_CACHE_TTL = 5.0
+
+# 自动记录的缓冲区：攒够这么多条记忆或距上次写入超过这么多秒，就在后台批量写入一次
+_AUTO_RECORD_FLUSH_ITEMS = 16
+_AUTO_RECORD_FLUSH_SECONDS = 2.0
+# 写入失败的记忆放回缓冲区等待重试，缓冲区超过该上限时丢弃最早的记忆
+_AUTO_RECORD_MAX_PENDING = 256
+
+
+def _flush_pending(pending: deque, memory_manager: MemoryManager, lock: threading.RLock) -> int:
+    """把缓冲区中的记忆批量写入 memory_manager，返回写入条数
+
+    不引用 MemoryTool 本身，因此也可以作为 weakref.finalize 的回调，在工具被回收或进程退出时写入剩余记忆。
+    校验失败（如记忆类型未启用）的条目重试也不会成功，直接丢弃；其他失败的条目放回缓冲区等待下次写入。
+    """
+    with lock:
+        # 逐个 popleft 取出：刷新期间新追加的记忆留给下一次
+        items = [pending.popleft() for _ in range(len(pending))]
+        if not items:
+            return 0
+        failed: List[Dict[str, Any]] = []
+        try:
+            memory_manager.add_memories_batch(items)
+            return len(items)
+        except ValueError:
+            # 整批校验失败时不会写入任何记忆：逐条写入，只跳过校验失败的条目
+            written = 0
+            for item in items:
+                try:
+                    memory_manager.add_memories_batch([item])
+                    written += 1
+                except ValueError as e:
+                    logger.warning("自动记录对话失败: %s", e)
+                except Exception as e:
+                    logger.warning("自动记录对话失败，稍后重试: %s", e)
+                    failed.append(item)
+        except Exception as e:
+            logger.warning("自动记录对话失败，稍后重试: %s", e)
+            written = 0
+            failed = items
+
+        if failed:
+            pending.extendleft(reversed(failed))
+            overflow = len(pending) - _AUTO_RECORD_MAX_PENDING
+            if overflow > 0:
+                for _ in range(overflow):
+                    pending.popleft()
+                logger.warning("自动记录缓冲区已满，丢弃最早的 %d 条记忆", overflow)
+        return written
+
+
+def _auto_record_flush_loop(tool_ref: "weakref.ref", wake: threading.Event):
+    """后台写入线程：定时或被唤醒时刷新缓冲区；工具对象被回收后退出
+
+    线程只持有工具的弱引用，不会让 MemoryTool 因后台线程而无法释放。
+    """
+    while True:
+        wake.wait(_AUTO_RECORD_FLUSH_SECONDS)
+        wake.clear()
+        tool = tool_ref()
+        if tool is None:
+            return
+        tool.flush()
+        del tool
+
+
+# 工具参数定义只在模块加载时构造一次
+_MEMORY_TOOL_PARAMS = (
+    ToolParameter(
+        name = "action",
+        type = "string",
+        description = (
+            "要执行的操作："
+            "add(添加记忆), search(搜索记忆), summary(获取摘要), stats(获取统计), "
+            "update(更新记忆), remove(删除记忆), forget(遗忘记忆), consolidate(整合记忆), clear_all(清空所有记忆)"
+        ),
+        required = True
+    ),
+    ToolParameter(name="content", type="string", description="记忆内容（add/update时可用；感知记忆可作描述）", required=False),
+    ToolParameter(name="query", type="string", description="搜索查询（search时可用）", required=False),
+    ToolParameter(name="memory_type", type="string", description="记忆类型：working, episodic, semantic, perceptual（默认：working）", required=False, default="working"),
+    ToolParameter(name="importance", type="number", description="重要性分数，0.0-1.0（add/update时可用）", required=False),
+    ToolParameter(name="limit", type="integer", description="搜索结果数量限制（默认：5）", required=False, default=5),
+    ToolParameter(name="memory_id", type="string", description="目标记忆ID（update/remove时必需）", required=False),
+    ToolParameter(name="file_path", type="string", description="感知记忆：本地文件路径（image/audio）", required=False),
+    ToolParameter(name="modality", type="string", description="感知记忆模态：text/image/audio（不传则按扩展名推断）", required=False),
+    ToolParameter(name="strategy", type="string", description="遗忘策略：importance_based/time_based/capacity_based（forget时可用）", required=False, default="importance_based"),
+    ToolParameter(name="threshold", type="number", description="遗忘阈值（forget时可用，默认0.1）", required=False, default=0.1),
+    ToolParameter(name="max_age_days", type="integer", description="最大保留天数（forget策略为time_based时可用）", required=False, default=30),
+    ToolParameter(name="from_type", type="string", description="整合来源类型（consolidate时可用，默认working）", required=False, default="working"),
+    ToolParameter(name="to_type", type="string", description="整合目标类型（consolidate时可用，默认episodic）", required=False, default="episodic"),
+    ToolParameter(name="importance_threshold", type="number", description="整合重要性阈值（默认0.7）", required=False, default=0.7),
+)
+
+
 class MemoryTool(Tool):
         """
         记忆工具
@@ -22,6 +176,23 @@ class MemoryTool(Tool):
         - 本类将具体的存储与检索逻辑委托给 `MemoryManager` 实现，负责持久化与向量检索等。
         """
 
+        # 每个用户一个实例，固定属性集合不需要 __dict__
+        __slots__ = (
+            "memory_config",
+            "memory_types",
+            "memory_manager",
+            "current_session_id",
+            "conversation_count",
+            "_last_iso",
+            "_summary_cache",
+            "_dispatch",
+            "_pending",
+            "_flush_lock",
+            "_flush_wake",
+            "_flusher",
+            "__weakref__",
+        )
+
         def __init__(self, user_id: str = "default_user", memory_config: MemoryConfig = None, memory_types: List[str] = None):
             """初始化 MemoryTool
 
@@ -34,17 +205,18 @@ class MemoryTool(Tool):
 
             # 存储配置信息与支持的记忆类型
             self.memory_config = memory_config or MemoryConfig()
-            self.memory_types = memory_types or ["working", "semantic", "episodic"]
+            self.memory_types = memory_types or [_WORKING, _SEMANTIC, _EPISODIC]
+            enabled = frozenset(self.memory_types)
 
             # 创建 MemoryManager 实例（负责实际的记忆存取）
             # 注意: 变量命名保持为 `memory_manager`，避免拼写不一致问题
             self.memory_manager = MemoryManager(
                 config=self.memory_config,
                 user_id=user_id,
-                enable_working="working" in self.memory_types,
-                enable_episodic="episodic" in self.memory_types,
-                enable_semantic="semantic" in self.memory_types,
-                enable_perceptual="perceptual" in self.memory_types
+                enable_working=_WORKING in enabled,
+                enable_episodic=_EPISODIC in enabled,
+                enable_semantic=_SEMANTIC in enabled,
+                enable_perceptual=_PERCEPTUAL in enabled
             )
 
             # 会话相关状态
@@ -52,6 +224,31 @@ class MemoryTool(Tool):
             # `conversation_count` 记录对话轮次，用于自动记录对话时的索引
             self.current_session_id = None
             self.conversation_count = 0
+            # 最近一次格式化的时间戳：(毫秒时间戳, ISO 字符串)，同一毫秒内的添加复用同一字符串
+            self._last_iso = (0, "")
+            # 摘要缓存：(缓存键, 生成时间, 摘要文本)，缓存键包含记忆版本号与会话状态
+            self._summary_cache: Optional[tuple] = None
+            # 自动记录的待写入缓冲区，由后台线程或 flush() 批量写入 MemoryManager
+            self._pending: deque = deque()
+            # 可重入：读取记忆的操作持有它再调用 flush()，期间后台线程不会写入
+            self._flush_lock = threading.RLock()
+            self._flush_wake = threading.Event()
+            self._flusher: Optional[threading.Thread] = None
+            # 工具被回收或进程退出时写入缓冲区中剩余的记忆（回调不持有工具本身）
+            weakref.finalize(self, _flush_pending, self._pending, self.memory_manager, self._flush_lock)
+
+            # action -> 处理方法；stats/clear_all 不接受参数，忽略多余的 kwargs
+            self._dispatch = {
+                "add": self._add_memory_text,
+                "search": self._search_memory,
+                "summary": self._get_summary,
+                "stats": lambda **kwargs: self._get_stats(),
+                "update": self._update_memory,
+                "remove": self._remove_memory,
+                "forget": self._forget,
+                "consolidate": self._consolidate,
+                "clear_all": lambda **kwargs: self._clear_all(),
+            }
 
         def run(self,parameters: Dict[str, Any]) -> str:
             """执行工具
@@ -64,39 +261,14 @@ class MemoryTool(Tool):
             if not self.validate_parameters(parameters):
                 return "参数验证失败，请检查输入参数。"
             
-            # 提取要执行的 action，并将其余参数传给 `execute` 方法
-            action = parameters.get("action")
-            kwargs = {k: v for k, v in parameters.items() if k != "action"}
+            # 提取要执行的 action，并将其余参数传给 `execute` 方法（浅拷贝后弹出，不修改调用方的字典）
+            kwargs = parameters.copy()
+            action = kwargs.pop("action", None)
             return self.execute(action, **kwargs)
         
         def get_parameters(self) -> List[ToolParameter]:
-            """获取工具参数定义"""
-            return [
-                ToolParameter(
-                    name = "action",
-                    type = "string",
-                    description = (
-                        "要执行的操作："
-                        "add(添加记忆), search(搜索记忆), summary(获取摘要), stats(获取统计), "
-                        "update(更新记忆), remove(删除记忆), forget(遗忘记忆), consolidate(整合记忆), clear_all(清空所有记忆)"
-                    ),
-                    required = True
-                ),
-                ToolParameter(name="content", type="string", description="记忆内容（add/update时可用；感知记忆可作描述）", required=False),
-                ToolParameter(name="query", type="string", description="搜索查询（search时可用）", required=False),
-                ToolParameter(name="memory_type", type="string", description="记忆类型：working, episodic, semantic, perceptual（默认：working）", required=False, default="working"),
-                ToolParameter(name="importance", type="number", description="重要性分数，0.0-1.0（add/update时可用）", required=False),
-                ToolParameter(name="limit", type="integer", description="搜索结果数量限制（默认：5）", required=False, default=5),
-                ToolParameter(name="memory_id", type="string", description="目标记忆ID（update/remove时必需）", required=False),
-                ToolParameter(name="file_path", type="string", description="感知记忆：本地文件路径（image/audio）", required=False),
-                ToolParameter(name="modality", type="string", description="感知记忆模态：text/image/audio（不传则按扩展名推断）", required=False),
-                ToolParameter(name="strategy", type="string", description="遗忘策略：importance_based/time_based/capacity_based（forget时可用）", required=False, default="importance_based"),
-                ToolParameter(name="threshold", type="number", description="遗忘阈值（forget时可用，默认0.1）", required=False, default=0.1),
-                ToolParameter(name="max_age_days", type="integer", description="最大保留天数（forget策略为time_based时可用）", required=False, default=30),
-                ToolParameter(name="from_type", type="string", description="整合来源类型（consolidate时可用，默认working）", required=False, default="working"),
-                ToolParameter(name="to_type", type="string", description="整合目标类型（consolidate时可用，默认episodic）", required=False, default="episodic"),
-                ToolParameter(name="importance_threshold", type="number", description="整合重要性阈值（默认0.7）", required=False, default=0.7)
-            ]
+            """获取工具参数定义（每次 run 都会经 validate_parameters 调用，返回预先构造好的定义）"""
+            return list(_MEMORY_TOOL_PARAMS)
         
         def execute(self, action: str, **kwargs) -> str:
             """执行记忆操作
@@ -105,86 +277,115 @@ class MemoryTool(Tool):
                 kwargs: 其他相关参数，具体取决于操作类型
             Returns:
                 str: 操作结果描述
+
+            这里是所有操作唯一的错误边界：各 `_*` 处理方法直接抛出异常，
+            在此统一转换为对应操作的失败提示。
             """
-            if action == "add":
-                return self._add_memory(**kwargs)
-            elif action == "search":
-                return self._search_memory(**kwargs)
-            elif action == "summary":
-                return self._get_summary(**kwargs)
-            elif action == "stats":
-                return self._get_stats()
-            elif action == "update":
-                return self._update_memory(**kwargs)
-            elif action == "remove":
-                return self._remove_memory(**kwargs)
-            elif action == "forget":
-                return self._forget(**kwargs)
-            elif action == "consolidate":
-                return self._consolidate(**kwargs)
-            elif action == "clear_all":
-                return self._clear_all()
-            else:
-                return f"不支持的操作: {action}。支持的操作: add, search, summary, stats, update, remove, forget, consolidate, clear_all"
-
-        def _add_memory(
+            handler = self._dispatch.get(action)
+            if handler is None:
+                return f"不支持的操作: {action}。支持的操作: {', '.join(self._dispatch)}"
+            # 带文件路径的添加走感知记忆路径，其余添加走纯文本路径
+            if action == "add" and kwargs.get("file_path"):
+                handler = self._add_memory_perceptual
+            try:
+                # 先写入缓冲中的对话记忆，保证搜索/统计等操作能看到最近的对话；
+                # 持有 _flush_lock 会等待后台线程正在进行的写入，操作期间也不会有新的写入
+                with self._flush_lock:
+                    self.flush()
+                    return handler(**kwargs)
+            except Exception as e:
+                return f"{_ACTION_FAILURE[action]}: {str(e)}"
+
+        def _add_memory_text(
             self,
             content: str = "",
-            memory_type: str = "working",
+            memory_type: str = _WORKING,
             importance: Optional[float] = 0.5,
             file_path: Optional[str] = None,
             modality: Optional[str] = None,
             **metadata
         ) -> str:
-            """添加记忆
+            """添加记忆（不带文件路径的常见路径）
 
             说明:
-            - 支持感知记忆（`perceptual`）: 如果传入 `file_path`，会尝试推断 `modality` 并将原始文件路径放入 `raw_data`。
-            - 会在 metadata 中注入 `session_id` 与 `timestamp`。
-            - 添加失败时返回错误提示。
+            - 只在 metadata 中注入 `session_id` 与 `timestamp`，不做模态推断。
+            - `file_path` 为空时 `modality` 不生效，与感知记忆路径的参数保持一致。
+            - 添加失败时直接抛出异常，由 `execute` 转换为错误提示。
             """
-            try:
-                # 确保有会话id
-                if self.current_session_id is None:
-                    self.current_session_id = f"session_{datetime.now().strftime('%Y%m%d%H%M%S')}"
-
-                # 如果是感知记忆并提供了文件路径，注入模态与原始数据引用
-                if memory_type == "perceptual" and file_path:
-                    inferred = modality or self._infer_modality(file_path)
-                    metadata.setdefault("modality", inferred)
-                    metadata.setdefault("raw_data", file_path)
-
-                # 注入会话与时间戳信息
-                metadata.update({
-                    "session_id": self.current_session_id,
-                    "timestamp": datetime.now().isoformat()
-                })
-
-                # 调用底层 MemoryManager 添加记忆
-                memory_id = self.memory_manager.add_memory(
-                    content=content,
-                    memory_type=memory_type,
-                    importance=importance,
-                    metadata=metadata,
-                    auto_classify=False,  # 禁用自动分类，使用明确指定的类型
-                )
+            # 工具参数来自 JSON 解析，类型名先驻留，后续各层按类型查表时可按对象同一性命中
+            memory_type = sys.intern(memory_type)
+            return self._submit_memory(content, memory_type, importance, self._build_metadata(metadata))
+
+        def _add_memory_perceptual(
+            self,
+            content: str = "",
+            memory_type: str = _WORKING,
+            importance: Optional[float] = 0.5,
+            file_path: Optional[str] = None,
+            modality: Optional[str] = None,
+            **metadata
+        ) -> str:
+            """添加带文件路径的记忆
 
-                return f"记忆已添加 (ID: {memory_id[:8]}...)"
+            说明:
+            - 感知记忆（`perceptual`）会推断 `modality`（未显式传入时按扩展名），并将原始文件路径放入 `raw_data`。
+            - 其余与 `_add_memory_text` 相同。
+            """
+            memory_type = sys.intern(memory_type)
+            self._attach_raw_data(memory_type, metadata, file_path, modality)
+            return self._submit_memory(content, memory_type, importance, self._build_metadata(metadata))
 
-            except Exception as e:
-                return f"添加记忆失败: {str(e)}"
+        def _submit_memory(
+            self, content: str, memory_type: str, importance: Optional[float], metadata: Dict[str, Any]
+        ) -> str:
+            """经 MemoryManager 的合并写入队列添加记忆：多个线程同时添加时共用一次批量嵌入与写入"""
+            memory_id = self.memory_manager.add_memory_async(
+                content=content,
+                memory_type=memory_type,
+                importance=importance,
+                metadata=metadata,
+                auto_classify=False,  # 禁用自动分类，使用明确指定的类型
+            ).result()
+
+            return f"记忆已添加 (ID: {memory_id[:8]}...)"
+
+        def _attach_raw_data(
+            self,
+            memory_type: str,
+            metadata: Dict[str, Any],
+            file_path: Optional[str],
+            modality: Optional[str],
+        ):
+            """感知记忆且提供了文件路径时，向 metadata 注入模态与原始数据引用"""
+            if memory_type == _PERCEPTUAL and file_path:
+                inferred = modality or self._infer_modality(file_path)
+                metadata.setdefault("modality", inferred)
+                metadata.setdefault("raw_data", file_path)
+
+        def _build_metadata(self, metadata: Dict[str, Any]) -> Dict[str, Any]:
+            """补全记忆元数据：注入会话与时间戳信息"""
+            # 确保有会话id
+            if self.current_session_id is None:
+                self.current_session_id = f"session_{datetime.now().strftime('%Y%m%d%H%M%S')}"
+
+            # 注入会话与时间戳信息
+            metadata.update({
+                "session_id": self.current_session_id,
+                "timestamp": self._now_iso()
+            })
+            return metadata
+
+        def _now_iso(self) -> str:
+            """当前时间的 ISO 字符串（毫秒精度），批量添加时每毫秒只格式化一次"""
+            now_ms = time.time_ns() // 1_000_000
+            if now_ms != self._last_iso[0]:
+                self._last_iso = (now_ms, datetime.fromtimestamp(now_ms / 1000).isoformat())
+            return self._last_iso[1]
 
         def _infer_modality(self, path: str) -> str:
             """根据扩展名推断模态（默认image/audio/text）"""
-            try:
-                ext = (path.rsplit('.', 1)[-1] or '').lower()
-                if ext in {"png", "jpg", "jpeg", "bmp", "gif", "webp"}:
-                    return "image"
-                if ext in {"mp3", "wav", "flac", "m4a", "ogg"}:
-                    return "audio"
-                return "text"
-            except Exception:
-                return "text"
+            i = path.rfind('.')
+            return _EXT_MODALITY.get(path[i + 1:].lower(), "text") if i >= 0 else "text"
 
 
         def _search_memory(
@@ -196,225 +397,198 @@ class MemoryTool(Tool):
             min_importance: float = 0.1
         ) -> str:
             """搜索记忆"""
-            try:
-                # 处理单数形式的memory_type参数
-                if memory_type and not memory_types:
-                    memory_types = [memory_type]
+            # 处理单数形式的memory_type参数
+            if memory_type and not memory_types:
+                memory_types = [memory_type]
 
-                results = self.memory_manager.retrieve_memories(
-                    query=query,
-                    limit=limit,
-                    memory_types=memory_types,
-                    min_importance=min_importance
-                )
+            results = self.memory_manager.retrieve_memories(
+                query=query,
+                limit=limit,
+                memory_types=memory_types,
+                min_importance=min_importance
+            )
 
-                if not results:
-                    return f"未找到与 '{query}' 相关的记忆"
+            if not results:
+                return f"未找到与 '{query}' 相关的记忆"
 
-                # 格式化结果
-                formatted_results = []
-                formatted_results.append(f"找到 {len(results)} 条相关记忆:")
+            # 格式化结果（预览前500字符，过长则添加省略号）
+            return f"找到 {len(results)} 条相关记忆:\n" + "\n".join(
+                f"{i}. [{_TYPE_LABEL.get(m.memory_type, m.memory_type)}] "
+                f"{_preview(m.content, 500)} (重要性: {m.importance:.2f})"
+                for i, m in enumerate(results, 1)
+            )
 
-                for i, memory in enumerate(results, 1):
-                    memory_type_label = {
-                        "working": "工作记忆",
-                        "episodic": "情景记忆",
-                        "semantic": "语义记忆",
-                        "perceptual": "感知记忆"
-                    }.get(memory.memory_type, memory.memory_type)
+        def _get_summary(self, limit: int = 10) -> str:
+            """获取记忆摘要
 
-                    content_preview = memory.content[:500] + "..." if len(memory.content) > 500 else memory.content # 预览前500字符，过长则添加省略号
-                    formatted_results.append(
-                        f"{i}. [{memory_type_label}] {content_preview} (重要性: {memory.importance:.2f})"
+            结果按 (记忆版本号, limit, 会话, 对话轮次) 缓存 _SUMMARY_CACHE_TTL 秒；
+            任何增删改都会使版本号变化，缓存随之失效（有效期用于兜底工作记忆的 TTL 过期）。
+            """
+            cache_key = (
+                self.memory_manager.version, limit, self.current_session_id, self.conversation_count
+            )
+            cached = self._summary_cache
+            if cached and cached[0] == cache_key and time.monotonic() - cached[1] < _SUMMARY_CACHE_TTL:
+                return cached[2]
+
+            stats = self.memory_manager.get_memory_stats()
+
+            # 各类型记忆统计
+            type_section = ""
+            if stats['memories_by_type']:
+                type_section = "\n\n记忆类型分布:\n" + "\n".join(
+                    _SUMMARY_TYPE_ROW.format(
+                        label=_TYPE_LABEL.get(memory_type, memory_type),
+                        count=type_stats.get('count', 0),
+                        avg=type_stats.get('avg_importance', 0),
                     )
+                    for memory_type, type_stats in stats['memories_by_type'].items()
+                )
 
-                return "\n".join(formatted_results)
-
-            except Exception as e:
-                return f"搜索记忆失败: {str(e)}"
+            # 获取重要记忆：去重、排序与截断由 MemoryManager 在存储层完成
+            unique_memories = self.memory_manager.retrieve_top_important(
+                limit=limit,
+                min_importance=0.5
+            )
 
-        def _get_summary(self, limit: int = 10) -> str:
-            """获取记忆摘要"""
-            try:
-                stats = self.memory_manager.get_memory_stats()
-
-                summary_parts = [
-                    f"记忆系统摘要",
-                    f"总记忆数: {stats['total_memories']}",
-                    f"当前会话: {self.current_session_id or '未开始'}",
-                    f"对话轮次: {self.conversation_count}"
-                ]
-
-                # 各类型记忆统计
-                if stats['memories_by_type']:
-                    summary_parts.append("\n记忆类型分布:")
-                    for memory_type, type_stats in stats['memories_by_type'].items():
-                        count = type_stats.get('count', 0)
-                        avg_importance = type_stats.get('avg_importance', 0)
-                        type_label = {
-                            "working": "工作记忆",
-                            "episodic": "情景记忆",
-                            "semantic": "语义记忆",
-                            "perceptual": "感知记忆"
-                        }.get(memory_type, memory_type)
-
-                        summary_parts.append(f"  • {type_label}: {count} 条 (平均重要性: {avg_importance:.2f})")
-
-                # 获取重要记忆 - 修复重复问题
-                important_memories = self.memory_manager.retrieve_memories(
-                    query="",
-                    memory_types=None,  # 从所有类型中检索
-                    limit=limit * 3,  # 获取更多候选，然后去重
-                    min_importance=0.5  # 降低阈值以获取更多记忆
+            important_section = ""
+            if unique_memories:
+                important_section = f"\n\n重要记忆 (前{len(unique_memories)}条):\n" + "\n".join(
+                    _SUMMARY_MEMORY_ROW.format(index=i, preview=_preview(m.content, 60), importance=m.importance)
+                    for i, m in enumerate(unique_memories, 1)
                 )
 
-                if important_memories:
-                    # 去重：使用记忆ID和内容双重去重
-                    seen_ids = set()
-                    seen_contents = set()
-                    unique_memories = []
-                    
-                    for memory in important_memories:
-                        # 使用ID去重
-                        if memory.id in seen_ids:
-                            continue
-                        
-                        # 使用内容去重（防止相同内容的不同记忆）
-                        content_key = memory.content.strip().lower()
-                        if content_key in seen_contents:
-                            continue
-                        
-                        seen_ids.add(memory.id)
-                        seen_contents.add(content_key)
-                        unique_memories.append(memory)
-                    
-                    # 按重要性排序
-                    unique_memories.sort(key=lambda x: x.importance, reverse=True) # 这个lambda函数的作用是根据记忆对象的importance属性进行排序，reverse=True表示降序排列，即重要性高的记忆会排在前面。
-                    summary_parts.append(f"\n重要记忆 (前{min(limit, len(unique_memories))}条):")
-
-                    for i, memory in enumerate(unique_memories[:limit], 1):
-                        content_preview = memory.content[:60] + "..." if len(memory.content) > 60 else memory.content
-                        summary_parts.append(f"  {i}. {content_preview} (重要性: {memory.importance:.2f})")
-
-                return "\n".join(summary_parts)
-
-            except Exception as e:
-                return f"获取摘要失败: {str(e)}"
+            header = _SUMMARY_HEADER.format(
+                total=stats['total_memories'],
+                session=self.current_session_id or '未开始',
+                turns=self.conversation_count,
+            )
+            summary = f"{header}{type_section}{important_section}"
+            self._summary_cache = (cache_key, time.monotonic(), summary)
+            return summary
 
         def _get_stats(self) -> str:
             """获取统计信息"""
-            try:
-                stats = self.memory_manager.get_memory_stats()
-
-                stats_info = [
-                    f"记忆系统统计",
-                    f"总记忆数: {stats['total_memories']}",
-                    f"启用的记忆类型: {', '.join(stats['enabled_types'])}",
-                    f"会话ID: {self.current_session_id or '未开始'}",
-                    f"对话轮次: {self.conversation_count}"
-                ]
-
-                return "\n".join(stats_info)
+            stats = self.memory_manager.get_memory_stats()
+
+            stats_info = [
+                f"记忆系统统计",
+                f"总记忆数: {stats['total_memories']}",
+                f"启用的记忆类型: {', '.join(stats['enabled_types'])}",
+                f"会话ID: {self.current_session_id or '未开始'}",
+                f"对话轮次: {self.conversation_count}"
+            ]
 
-            except Exception as e:
-                return f"获取统计信息失败: {str(e)}"
+            return "\n".join(stats_info)
 
         def auto_record_conversation(self, user_input: str, agent_response: str):
             """自动记录对话
 
-            这个方法可以被Agent调用来自动记录对话历史
+            这个方法可以被Agent调用来自动记录对话历史。
+            记忆先放入缓冲区，攒够 _AUTO_RECORD_FLUSH_ITEMS 条或每隔
+            _AUTO_RECORD_FLUSH_SECONDS 秒由后台线程通过 add_memories_batch 批量写入，
+            对话轮次本身不等待嵌入与存储。
             """
             self.conversation_count += 1
-            # 记录用户输入
-            self._add_memory(
-                content=f"用户: {user_input}",
-                memory_type="working",
-                importance=0.6,
-                type="user_input",
-                conversation_id=self.conversation_count
-            )
 
-            # 记录Agent响应
-            self._add_memory(
-                content=f"助手: {agent_response}",
-                memory_type="working",
-                importance=0.7,
-                type="agent_response",
-                conversation_id=self.conversation_count
-            )
+            def pending_item(content: str, memory_type: str, importance: float, kind: str) -> Dict[str, Any]:
+                metadata = self._build_metadata({"type": kind, "conversation_id": self.conversation_count})
+                return {
+                    "content": content,
+                    "memory_type": memory_type,
+                    "importance": importance,
+                    "metadata": metadata,
+                    "auto_classify": False,  # 使用明确指定的类型
+                }
+
+            # 记录用户输入与Agent响应
+            pending = [
+                pending_item(f"用户: {user_input}", _WORKING, 0.6, "user_input"),
+                pending_item(f"助手: {agent_response}", _WORKING, 0.7, "agent_response"),
+            ]
 
             # 如果是重要对话，记录为情景记忆
-            if len(agent_response) > 100 or "重要" in user_input or "记住" in user_input:
+            if len(agent_response) > 100 or _RECORD_TRIGGER_RE.search(user_input):
                 interaction_content = f"对话 - 用户: {user_input}\n助手: {agent_response}"
-                self._add_memory(
-                    content=interaction_content,
-                    memory_type="episodic",
-                    importance=0.8,
-                    type="interaction",
-                    conversation_id=self.conversation_count
-                )
+                pending.append(pending_item(interaction_content, _EPISODIC, 0.8, "interaction"))
+
+            self._pending.extend(pending)
+            self._ensure_flusher()
+            if len(self._pending) >= _AUTO_RECORD_FLUSH_ITEMS:
+                self._flush_wake.set()
+
+        def flush(self) -> int:
+            """把缓冲区中的对话记忆立即批量写入 MemoryManager
+
+            写入失败时记录日志，不影响对话流程；可重试的记忆留在缓冲区中。
+            进程退出时会自动写入剩余记忆。
+
+            Returns:
+                本次写入的记忆条数
+            """
+            return _flush_pending(self._pending, self.memory_manager, self._flush_lock)
+
+        def _ensure_flusher(self):
+            """按需启动后台写入线程"""
+            if self._flusher is not None and self._flusher.is_alive():
+                return
+            with self._flush_lock:
+                if self._flusher is None or not self._flusher.is_alive():
+                    self._flusher = threading.Thread(
+                        target=_auto_record_flush_loop,
+                        args=(weakref.ref(self), self._flush_wake),
+                        name="memory-auto-record",
+                        daemon=True,
+                    )
+                    self._flusher.start()
 
         def _update_memory(self, memory_id: str, content: str = None, importance: float = None, **metadata) -> str:
             """更新记忆"""
-            try:
-                success = self.memory_manager.update_memory(
-                    memory_id=memory_id,
-                    content=content,
-                    importance=importance,
-                    metadata=metadata or None
-                )
-                return "记忆已更新" if success else "未找到要更新的记忆"
-            except Exception as e:
-                return f"更新记忆失败: {str(e)}"
+            success = self.memory_manager.update_memory(
+                memory_id=memory_id,
+                content=content,
+                importance=importance,
+                metadata=metadata or None
+            )
+            return "记忆已更新" if success else "未找到要更新的记忆"
 
         def _remove_memory(self, memory_id: str) -> str:
             """删除记忆"""
-            try:
-                success = self.memory_manager.remove_memory(memory_id)
-                return "记忆已删除" if success else "未找到要删除的记忆"
-            except Exception as e:
-                return f"删除记忆失败: {str(e)}"
+            success = self.memory_manager.remove_memory(memory_id)
+            return "记忆已删除" if success else "未找到要删除的记忆"
 
         def _forget(self, strategy: str = "importance_based", threshold: float = 0.1, max_age_days: int = 30) -> str:
             """遗忘记忆（支持多种策略）"""
-            try:
-                count = self.memory_manager.forget_memories(
-                    strategy=strategy,
-                    threshold=threshold,
-                    max_age_days=max_age_days
-                )
-                return f"已遗忘 {count} 条记忆（策略: {strategy}）"
-            except Exception as e:
-                return f"遗忘记忆失败: {str(e)}"
+            count = self.memory_manager.forget_memories(
+                strategy=strategy,
+                threshold=threshold,
+                max_age_days=max_age_days
+            )
+            return f"已遗忘 {count} 条记忆（策略: {strategy}）"
 
-        def _consolidate(self, from_type: str = "working", to_type: str = "episodic", importance_threshold: float = 0.7) -> str:
+        def _consolidate(self, from_type: str = _WORKING, to_type: str = _EPISODIC, importance_threshold: float = 0.7) -> str:
             """整合记忆（将重要的短期记忆提升为长期记忆）"""
-            try:
-                count = self.memory_manager.consolidate_memories(
-                    from_type=from_type,
-                    to_type=to_type,
-                    importance_threshold=importance_threshold,
-                )
-                return f"已整合 {count} 条记忆为长期记忆（{from_type} → {to_type}，阈值={importance_threshold}）"
-            except Exception as e:
-                return f"整合记忆失败: {str(e)}"
+            count = self.memory_manager.consolidate_memories(
+                from_type=from_type,
+                to_type=to_type,
+                importance_threshold=importance_threshold,
+            )
+            return f"已整合 {count} 条记忆为长期记忆（{from_type} → {to_type}，阈值={importance_threshold}）"
 
         def _clear_all(self) -> str:
             """清空所有记忆"""
-            try:
-                self.memory_manager.clear_all_memories()
-                return "已清空所有记忆"
-            except Exception as e:
-                return f"清空记忆失败: {str(e)}"
+            self.memory_manager.clear_all_memories()
+            return "已清空所有记忆"
 
         def add_knowledge(self, content: str, importance: float = 0.9):
             """添加知识到语义记忆
 
             便捷方法，用于添加重要知识
             """
-            return self._add_memory(
+            return self.execute(
+                "add",
                 content=content,
-                memory_type="semantic",
+                memory_type=_SEMANTIC,
                 importance=importance,
                 knowledge_type="factual",
                 source="manual"
@@ -425,11 +599,13 @@ class MemoryTool(Tool):
 
             这个方法可以被Agent调用来获取相关的记忆上下文
             """
-            results = self.memory_manager.retrieve_memories(
-                query=query,
-                limit=limit,
-                min_importance=0.3
-            )
+            with self._flush_lock:
+                self.flush()
+                results = self.memory_manager.retrieve_memories(
+                    query=query,
+                    limit=limit,
+                    min_importance=0.3
+                )
 
             if not results:
                 return ""
@@ -442,21 +618,27 @@ class MemoryTool(Tool):
 
         def clear_session(self):
             """清除当前会话"""
-            self.current_session_id = None
-            self.conversation_count = 0
+            with self._flush_lock:
+                self.flush()
+                self.current_session_id = None
+                self.conversation_count = 0
 
-            # 清理工作记忆
-            wm = self.memory_manager.memory_types.get('working') if hasattr(self.memory_manager, 'memory_types') else None
-            if wm:
-                wm.clear()
+                # 清理工作记忆
+                wm = self.memory_manager.memory_types.get('working') if hasattr(self.memory_manager, 'memory_types') else None
+                if wm:
+                    wm.clear()
 
         def consolidate_memories(self):
             """整合记忆"""
-            return self.memory_manager.consolidate_memories()
+            with self._flush_lock:
+                self.flush()
+                return self.memory_manager.consolidate_memories()
 
         def forget_old_memories(self, max_age_days: int = 30):
             """遗忘旧记忆"""
-            return self.memory_manager.forget_memories(
-                strategy="time_based",
-                max_age_days=max_age_days
-            )
+            with self._flush_lock:
+                self.flush()
+                return self.memory_manager.forget_memories(
+                    strategy="time_based",
+                    max_age_days=max_age_days
+                )
@@ -151,7 +151,7 @@ class TerminalTool(Tool):
     # - 网络危险: nc, telnet, curl (外网访问)
     #
     # 允许的命令分类及安全理由：
-    ALLOWED_COMMANDS = {
+    ALLOWED_COMMANDS: frozenset = frozenset({
         # 文件列表与信息 - 只读操作，安全
         'ls',      # 列出目录内容
         'dir',     # 同上（Windows风格）
@@ -203,7 +203,16 @@ class TerminalTool(Tool):
         'bash',    # Bash shell
         'sh',      # POSIX shell
         'powershell', # Windows: PowerShell
-    }
+    })
+
+    # 白名单的展示字符串在类定义时生成一次，run/get_parameters 不再每次排序拼接
+    _ALLOWED_SORTED = tuple(sorted(ALLOWED_COMMANDS))
+    _ALLOWED_DESC = ", ".join(_ALLOWED_SORTED)
+    _ALLOWED_HEAD = ", ".join(_ALLOWED_SORTED[:10])
+    _COMMAND_DESCRIPTION = (
+        f"要执行的命令（白名单: {_ALLOWED_HEAD}...）\n"
+        "示例: 'ls -la', 'cat file.txt', 'grep pattern *.py', 'head -n 20 data.csv'"
+    )
     
     def __init__(
         self,
@@ -323,7 +332,7 @@ class TerminalTool(Tool):
         
         # 检查命令是否在白名单中
         if base_command not in self.ALLOWED_COMMANDS:
-            return f"❌ 不允许的命令: {base_command}\n允许的命令: {', '.join(sorted(self.ALLOWED_COMMANDS))}"
+            return f"❌ 不允许的命令: {base_command}\n允许的命令: {self._ALLOWED_DESC}"
         
         # 特殊处理 cd 命令
         if base_command == 'cd':
@@ -360,10 +369,7 @@ class TerminalTool(Tool):
             ToolParameter(
                 name="command",
                 type="string",
-                description=(
-                    f"要执行的命令（白名单: {', '.join(sorted(list(self.ALLOWED_COMMANDS)[:10]))}...）\n"
-                    "示例: 'ls -la', 'cat file.txt', 'grep pattern *.py', 'head -n 20 data.csv'"
-                ),
+                description=self._COMMAND_DESCRIPTION,
                 required=True
             ),
         ]
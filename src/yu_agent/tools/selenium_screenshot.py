@@ -10,18 +10,86 @@ for proxy_var in ['http_proxy', 'https_proxy', 'HTTP_PROXY', 'HTTPS_PROXY', 'ALL
     if proxy_var in os.environ:
         del os.environ[proxy_var]
 
-from yu_agent.tools.base import Tool, ToolParameter
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from pathlib import Path
-import logging
+from yu_agent.tools.base import Tool, ToolParameter  # noqa: E402
+from yu_agent.protocols.mcp.chrome_utils import (  # noqa: E402
+    create_chrome_driver,
+    find_chrome_binary,
+)
+from selenium import webdriver  # noqa: E402
+from selenium.webdriver.common.by import By  # noqa: E402
+from selenium.webdriver.support.ui import WebDriverWait  # noqa: E402
+from selenium.webdriver.support import expected_conditions as EC  # noqa: E402
+from pathlib import Path  # noqa: E402
+from typing import Dict, Optional, Set, Tuple  # noqa: E402
+from urllib.parse import urlparse  # noqa: E402
+import atexit  # noqa: E402
+import logging  # noqa: E402
+import queue  # noqa: E402
+import threading  # noqa: E402
 
 logger = logging.getLogger(__name__)
 
+# 进程级 WebDriver 池：(headless, window_size) -> 空闲的浏览器
+# 工具实例关闭时把浏览器归还到池中，后续实例直接复用，不再重复启动 Chrome
+_DRIVER_POOL: Dict[Tuple[bool, str], "queue.Queue[webdriver.Chrome]"] = {}
+_DRIVER_POOL_LOCK = threading.Lock()
+# shutdown_pool 之后归还的浏览器直接关闭
+_pool_closed = False
+
+
+def _pool_for(key: Tuple[bool, str]) -> "queue.Queue[webdriver.Chrome]":
+    """取得某种配置对应的空闲队列（不存在时创建）"""
+    with _DRIVER_POOL_LOCK:
+        pool = _DRIVER_POOL.get(key)
+        if pool is None:
+            pool = _DRIVER_POOL[key] = queue.Queue()
+        return pool
+
+
+def _create_driver(headless: bool, window_size: str) -> webdriver.Chrome:
+    """按配置启动一个新的 Chrome WebDriver"""
+    options = webdriver.ChromeOptions()
+
+    # Chrome 路径每个进程只探测一次
+    chrome_binary = find_chrome_binary()
+    if chrome_binary:
+        logger.info(f"📍 找到Chrome: {chrome_binary}")
+        options.binary_location = chrome_binary
+
+    # 窗口大小
+    if window_size:
+        options.add_argument(f"--window-size={window_size}")
+
+    # Headless模式
+    if headless:
+        options.add_argument("--headless=new")
+
+    # 其他优化选项
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    options.add_argument("--disable-proxy-auto-detect")  # 禁用代理自动检测
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_experimental_option('useAutomationExtension', False)
+
+    return create_chrome_driver(options)
+
+
+def _origin_of(url: str) -> Optional[str]:
+    """取得 URL 的安全源（scheme://host[:port]），about:blank、data: 等没有可清除存储的页面返回 None"""
+    parsed = urlparse(url or "")
+    if parsed.scheme not in ("http", "https") or not parsed.netloc:
+        return None
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+def _quit_driver(driver: webdriver.Chrome):
+    """关闭浏览器，忽略已失效会话的错误"""
+    try:
+        driver.quit()
+    except Exception as e:
+        logger.debug(f"关闭WebDriver失败: {e}")
+
 
 class SeleniumScreenshotTool(Tool):
     """
@@ -32,6 +100,7 @@ class SeleniumScreenshotTool(Tool):
     - 等待页面加载完成
     - 生成高质量截图
     - 支持自定义等待时间
+    - 浏览器在进程内池化复用，可用 warm_up() 预先启动
 
     示例：
     ```python
@@ -55,62 +124,34 @@ class SeleniumScreenshotTool(Tool):
         """
         self.headless = headless
         self.window_size = window_size
+        # 当前实例借出的浏览器；close() 时归还到进程级池
         self.driver = None
+        # 借出期间访问过的站点源，归还时逐个清除其存储
+        self._visited_origins: Set[str] = set()
 
         super().__init__(
             name="selenium_screenshot",
             description="使用Selenium对网页进行截图"
         )
 
+    @property
+    def _pool_key(self) -> Tuple[bool, str]:
+        return (bool(self.headless), self.window_size)
+
     def _init_driver(self):
-        """初始化Selenium WebDriver"""
+        """借出一个Selenium WebDriver：优先复用池中空闲的浏览器，池空时才新建"""
         if self.driver is not None:
             return
 
         try:
-            options = webdriver.ChromeOptions()
-
-            # 尝试找到Chrome浏览器路径
-            chrome_paths = [
-                r"C:\Program Files\Google\Chrome\Application\chrome.exe",
-                r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
-                "google-chrome",
-                "google-chrome-stable",
-                "chromium"
-            ]
-
-            chrome_binary = None
-            for path in chrome_paths:
-                try:
-                    if Path(path).exists():
-                        chrome_binary = path
-                        logger.info(f"📍 找到Chrome: {chrome_binary}")
-                        break
-                except:
-                    pass
-
-            if chrome_binary:
-                options.binary_location = chrome_binary
+            self.driver = _pool_for(self._pool_key).get_nowait()
+            logger.info("♻️ 复用池中的WebDriver")
+            return
+        except queue.Empty:
+            pass
 
-            # 窗口大小
-            if self.window_size:
-                options.add_argument(f"--window-size={self.window_size}")
-
-            # Headless模式
-            if self.headless:
-                options.add_argument("--headless=new")
-
-            # 其他优化选项
-            options.add_argument("--no-sandbox")
-            options.add_argument("--disable-dev-shm-usage")
-            options.add_argument("--disable-blink-features=AutomationControlled")
-            options.add_argument("--disable-proxy-auto-detect")  # 禁用代理自动检测
-            options.add_experimental_option("excludeSwitches", ["enable-automation"])
-            options.add_experimental_option('useAutomationExtension', False)
-
-            # 使用webdriver-manager管理ChromeDriver
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=options)
+        try:
+            self.driver = _create_driver(self.headless, self.window_size)
             logger.info("✅ Selenium WebDriver初始化成功")
 
         except Exception as e:
@@ -118,6 +159,76 @@ class SeleniumScreenshotTool(Tool):
             logger.error(error_msg)
             raise Exception(error_msg)
 
+    def _release_driver(self, driver: webdriver.Chrome):
+        """清除浏览器状态后归还到池中；重置失败（会话已失效等）时直接关闭
+
+        下一个借出该浏览器的工具实例不能看到上一个实例的登录状态，因此归还前清除
+        所有站点的 Cookie，以及借出期间访问过的每个站点源的存储（localStorage、IndexedDB、缓存等），
+        再回到空白页和初始窗口大小。
+        """
+        origins, self._visited_origins = self._visited_origins, set()
+        if _pool_closed:
+            _quit_driver(driver)
+            return
+        try:
+            # 点击链接、脚本跳转等导航不经过 run()，当前页面的源也要清除
+            current = _origin_of(driver.current_url)
+            if current:
+                origins.add(current)
+            driver.delete_all_cookies()
+            # delete_all_cookies 只作用于当前站点，通过 DevTools 协议清除所有站点的 Cookie
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            # Storage.clearDataForOrigin 只接受具体的源，不支持通配符
+            for origin in sorted(origins):
+                driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+            driver.get("about:blank")
+            if self.window_size:
+                width, height = (int(v) for v in self.window_size.split("x"))
+                driver.set_window_size(width, height)
+        except Exception as e:
+            logger.warning(f"⚠️ WebDriver无法复用，已关闭: {e}")
+            _quit_driver(driver)
+            return
+        _pool_for(self._pool_key).put(driver)
+
+    @classmethod
+    def warm_up(cls, count: int = 1, headless: bool = True, window_size: str = "1920x1080") -> int:
+        """预先启动 count 个浏览器放入池中，避免首次截图承担 Chrome 冷启动
+
+        Returns:
+            成功启动的浏览器数量（失败的名额之后按需再创建）
+
+        Raises:
+            RuntimeError: 池已被 shutdown_pool 关闭（新启动的浏览器不会再有人关闭）
+        """
+        if _pool_closed:
+            raise RuntimeError("WebDriver池已关闭，不能再预热")
+        pool = _pool_for((bool(headless), window_size))
+        ready = 0
+        for _ in range(count):
+            try:
+                pool.put(_create_driver(headless, window_size))
+                ready += 1
+            except Exception as e:
+                logger.warning(f"⚠️ WebDriver预热失败: {e}")
+        logger.info(f"✅ Pool ready: {ready}/{count}")
+        return ready
+
+    @classmethod
+    def shutdown_pool(cls):
+        """关闭池中所有空闲的浏览器（进程退出时通过 atexit 自动调用）"""
+        global _pool_closed
+        with _DRIVER_POOL_LOCK:
+            _pool_closed = True
+            pools = list(_DRIVER_POOL.values())
+            _DRIVER_POOL.clear()
+        for pool in pools:
+            while True:
+                try:
+                    _quit_driver(pool.get_nowait())
+                except queue.Empty:
+                    break
+
     def run(self, params: dict) -> str:
         """
         执行截图
@@ -151,6 +262,9 @@ class SeleniumScreenshotTool(Tool):
             self._init_driver()
 
             logger.info(f"📍 访问URL: {url}")
+            origin = _origin_of(url)
+            if origin:
+                self._visited_origins.add(origin)
             self.driver.get(url)
 
             # 等待页面加载
@@ -248,15 +362,25 @@ class SeleniumScreenshotTool(Tool):
             return f"❌ 获取内容失败: {str(e)}"
 
     def close(self):
-        """关闭浏览器"""
+        """释放浏览器：归还到进程级池中供后续工具实例复用（真正关闭见 shutdown_pool）"""
         if self.driver:
-            self.driver.quit()
-            self.driver = None
-            logger.info("✅ 浏览器已关闭")
+            driver, self.driver = self.driver, None
+            self._release_driver(driver)
+            logger.info("✅ 浏览器已归还")
 
     def __del__(self):
-        """析构时清理资源"""
-        self.close()
+        """析构时直接关闭仍持有的浏览器
+
+        不在垃圾回收过程中执行清除状态、归还到池等多次 WebDriver 网络调用；
+        需要复用浏览器时应显式调用 close()。
+        """
+        driver = getattr(self, "driver", None)
+        if driver is not None:
+            self.driver = None
+            _quit_driver(driver)
+
+
+atexit.register(SeleniumScreenshotTool.shutdown_pool)
 
 
 # 使用示例
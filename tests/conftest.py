@@ -0,0 +1,10 @@
+"""pytest 公共配置：与 tests/test_context/test.py 一致，把 src 目录加入搜索路径"""
+
+import os
+import sys
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+# 导入 yu_agent 时会读取数据库配置，测试不连接 Neo4j，提供占位密码即可
+os.environ.setdefault("NEO4J_PASSWORD", "test")
@@ -0,0 +1,70 @@
+"""DocumentStore 基类：只实现原有抽象方法的子类也能使用批量读取与重要性检索"""
+
+from yu_agent.memory.storage.document_store import DocumentStore
+
+
+class DictDocumentStore(DocumentStore):
+    """只实现基础接口的最小文档存储"""
+
+    def __init__(self):
+        self.rows = {}
+
+    def add_memory(self, memory_id, user_id, content, memory_type, timestamp, importance, properties=None):
+        self.rows[memory_id] = {
+            "memory_id": memory_id, "user_id": user_id, "content": content,
+            "memory_type": memory_type, "timestamp": timestamp, "importance": importance,
+            "properties": properties or {},
+        }
+        return memory_id
+
+    def get_memory(self, memory_id):
+        return self.rows.get(memory_id)
+
+    def search_memories(self, user_id=None, memory_type=None, start_time=None, end_time=None,
+                        importance_threshold=None, limit=10):
+        docs = [
+            d for d in self.rows.values()
+            if (not user_id or d["user_id"] == user_id)
+            and (not memory_type or d["memory_type"] == memory_type)
+            and (not importance_threshold or d["importance"] >= importance_threshold)
+        ]
+        docs.sort(key=lambda d: (d["importance"], d["timestamp"]), reverse=True)
+        return docs[:limit]
+
+    def update_memory(self, memory_id, content=None, importance=None, properties=None):
+        return False
+
+    def delete_memory(self, memory_id):
+        return self.rows.pop(memory_id, None) is not None
+
+    def get_database_stats(self):
+        return {"total": len(self.rows)}
+
+    def add_document(self, content, metadata=None):
+        return ""
+
+    def get_document(self, document_id):
+        return None
+
+
+def test_get_memories_default_skips_missing_ids():
+    store = DictDocumentStore()
+    store.add_memory("a", "u", "甲", "episodic", 1, 0.5)
+
+    assert list(store.get_memories(["a", "missing"])) == ["a"]
+
+
+def test_search_top_important_default_dedupes_and_merges_types():
+    store = DictDocumentStore()
+    # 重复内容占满第一轮候选，需要扩大候选数才能凑够 limit
+    for i in range(4):
+        store.add_memory(f"dup{i}", "u", " 重复 ", "semantic", i, 0.9)
+    store.add_memory("e1", "u", "情景一", "episodic", 1, 0.8)
+    store.add_memory("s1", "u", "语义一", "semantic", 2, 0.7)
+    store.add_memory("w1", "u", "工作一", "working", 3, 0.95)
+    store.add_memory("low", "u", "不重要", "episodic", 4, 0.1)
+
+    docs = store.search_top_important(user_id="u", memory_types=["episodic", "semantic"],
+                                      importance_threshold=0.5, limit=3)
+
+    assert [d["memory_id"] for d in docs] == ["dup3", "e1", "s1"]
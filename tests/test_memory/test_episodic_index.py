@@ -0,0 +1,69 @@
+"""EpisodicMemory 批量向量索引：按嵌入服务上限分批、失败时逐条回退"""
+
+from datetime import datetime
+
+from yu_agent.memory import MemoryItem
+from yu_agent.memory.types.episodic import EpisodicMemory
+
+
+class CappedEmbedder:
+    """模拟 DashScope：单次最多 max_batch_size 条，指定内容嵌入失败"""
+
+    max_batch_size = 10
+
+    def __init__(self, bad=()):
+        self.bad = set(bad)
+        self.calls = []
+
+    def encode(self, texts):
+        self.calls.append(texts)
+        if isinstance(texts, str):
+            if texts in self.bad:
+                raise RuntimeError("bad input")
+            return [float(len(texts))]
+        if len(texts) > self.max_batch_size or self.bad.intersection(texts):
+            raise RuntimeError("batch rejected")
+        return [[float(len(t))] for t in texts]
+
+
+class RecordingVectorStore:
+    def __init__(self):
+        self.ids = []
+
+    def add_vectors(self, vectors, metadata, ids):
+        assert len(vectors) == len(metadata) == len(ids)
+        self.ids.extend(ids)
+
+
+def _memory(embedder):
+    memory = EpisodicMemory.__new__(EpisodicMemory)
+    memory.embedder = embedder
+    memory.vector_store = RecordingVectorStore()
+    return memory
+
+
+def _items(n):
+    return [
+        MemoryItem(id=f"m{i}", content=f"事件 {i}", memory_type="episodic", user_id="u",
+                   timestamp=datetime.now(), importance=0.5)
+        for i in range(n)
+    ]
+
+
+def test_batch_is_split_to_provider_limit():
+    embedder = CappedEmbedder()
+    memory = _memory(embedder)
+
+    memory._index_vectors(_items(23))
+
+    assert [len(c) for c in embedder.calls] == [10, 10, 3]
+    assert memory.vector_store.ids == [f"m{i}" for i in range(23)]
+
+
+def test_failed_batch_falls_back_to_single_items():
+    embedder = CappedEmbedder(bad={"事件 4"})
+    memory = _memory(embedder)
+
+    memory._index_vectors(_items(12))
+
+    assert memory.vector_store.ids == [f"m{i}" for i in range(12) if i != 4]
@@ -0,0 +1,18 @@
+"""导入 yu_agent.memory 时不应加载重量级存储后端"""
+
+import os
+import subprocess
+import sys
+
+
+def test_import_memory_does_not_load_qdrant():
+    src = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "src")
+    code = (
+        "import sys, yu_agent.memory; "
+        "loaded = [m for m in ('qdrant_client', 'yu_agent.memory.storage.qdrant_store') if m in sys.modules]; "
+        "print(','.join(loaded))"
+    )
+    # 在新的解释器中检查，避免受其他测试已导入模块的影响
+    env = dict(os.environ, PYTHONPATH=src)
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True)
+    assert result.stdout.strip() == ""
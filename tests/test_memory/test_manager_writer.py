@@ -0,0 +1,40 @@
+"""MemoryManager 异步写入线程"""
+
+import gc
+
+from yu_agent.memory import MemoryConfig, MemoryManager
+
+
+def _working_only_manager() -> MemoryManager:
+    return MemoryManager(
+        config=MemoryConfig(),
+        user_id="test_user",
+        enable_working=True,
+        enable_episodic=False,
+        enable_semantic=False,
+        enable_perceptual=False,
+    )
+
+
+def test_invalid_request_fails_alone_without_duplicate_writes():
+    manager = _working_only_manager()
+    futures = [
+        manager.add_memory_async(f"记忆 {i}", memory_type="working", auto_classify=False)
+        for i in range(3)
+    ]
+    bad = manager.add_memory_async("无效", memory_type="unknown", auto_classify=False)
+
+    assert all(future.result(timeout=5) for future in futures)
+    assert isinstance(bad.exception(timeout=5), ValueError)
+    assert manager.get_memory_stats()["total_memories"] == 3
+
+
+def test_writer_thread_exits_after_manager_is_collected():
+    manager = _working_only_manager()
+    manager.add_memory_async("记忆", memory_type="working", auto_classify=False).result(timeout=5)
+    writer = manager._writer
+
+    del manager
+    gc.collect()
+    writer.join(timeout=3)
+    assert not writer.is_alive()
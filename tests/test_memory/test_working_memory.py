@@ -0,0 +1,50 @@
+"""WorkingMemory 列缓冲区：扩容、删除与压缩后与记忆列表保持对齐"""
+
+from datetime import datetime
+
+from yu_agent.memory import MemoryConfig, MemoryItem
+from yu_agent.memory.types.working import WorkingMemory
+
+
+def _item(i, importance=0.5):
+    return MemoryItem(id=str(i), content=f"记忆 {i} " * (i % 3 + 1), memory_type="working",
+                      user_id="u", timestamp=datetime.now(), importance=importance)
+
+
+def _assert_aligned(memory):
+    assert memory._size == len(memory.memories)
+    assert list(memory._importance) == [m.importance for m in memory.memories]
+    assert list(memory._tokens) == [len(m.content.split()) for m in memory.memories]
+    assert memory.current_tokens == int(memory._tokens.sum())
+
+
+def test_columns_grow_and_stay_aligned():
+    config = MemoryConfig(working_memory_capacity=4, working_memory_tokens=10_000)
+    memory = WorkingMemory(config)
+    memory.max_capacity = 100  # 超过初始缓冲区，触发扩容
+    buffer = memory._importance_buf
+
+    for i in range(20):
+        memory.add(_item(i, importance=i / 20))
+
+    assert memory._importance_buf is not buffer
+    assert memory._importance_buf.size >= 20
+    _assert_aligned(memory)
+
+    memory.remove("7")
+    memory.update("3", importance=0.99)
+    assert memory.forget(strategy="importance_based", threshold=0.3) == 5
+    assert "7" not in [m.id for m in memory.memories]
+    _assert_aligned(memory)
+
+
+def test_capacity_eviction_reuses_buffer():
+    memory = WorkingMemory(MemoryConfig(working_memory_capacity=3, working_memory_tokens=10_000))
+    buffer = memory._importance_buf
+
+    for i in range(10):
+        memory.add(_item(i, importance=i / 10))
+
+    assert memory._importance_buf is buffer
+    assert [m.id for m in memory.memories] == ["7", "8", "9"]
+    _assert_aligned(memory)
@@ -0,0 +1,44 @@
+"""ANPDiscovery 注册与发现缓存"""
+
+from yu_agent.protocols.anp import ANPDiscovery, ServiceInfo
+
+
+def _ids(services):
+    return sorted(s.service_id for s in services)
+
+
+def test_heartbeat_keeps_cached_results():
+    discovery = ANPDiscovery()
+    discovery.register_service(ServiceInfo("a", "calc", "http://a", metadata={"status": "up"}))
+    assert _ids(discovery.discover_services(filters={"status": "up"})) == ["a"]
+
+    version = discovery._version
+    discovery.register_service(ServiceInfo("a", "calc", "http://a", metadata={"status": "up"}))
+    assert discovery._version == version
+
+
+def test_reregistering_mutated_service_invalidates_cache():
+    discovery = ANPDiscovery()
+    a = ServiceInfo("a", "calc", "http://a", metadata={"status": "down"})
+    b = ServiceInfo("b", "calc", "http://b", metadata={"status": "up"})
+    discovery.register_service(a)
+    discovery.register_service(b)
+    assert _ids(discovery.discover_services(filters={"status": "up"})) == ["b"]
+
+    a.metadata["status"] = "up"
+    discovery.register_service(a)
+    assert _ids(discovery.discover_services(filters={"status": "up"})) == ["a", "b"]
+
+
+def test_reregistering_mutated_service_type_updates_index():
+    discovery = ANPDiscovery()
+    a = ServiceInfo("a", "calc", "http://a")
+    discovery.register_service(a)
+
+    a.service_type = "search"
+    discovery.register_service(a)
+    assert _ids(discovery.discover_services("calc")) == []
+    assert _ids(discovery.discover_services("search")) == ["a"]
+
+    discovery.unregister_service("a")
+    assert "search" not in discovery._by_type
@@ -0,0 +1,72 @@
+"""selenium_http_server 异步驱动池的借出与归还"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from yu_agent.protocols.mcp import selenium_http_server as server
+
+
+class FakeDriver:
+    def __init__(self):
+        self.closed = False
+
+    def execute_script(self, script, *args):
+        return False
+
+    def quit(self):
+        self.closed = True
+
+
+def _run_once(path, data):
+    """用只有一个名额的池执行一次请求，返回 (结果或异常, 借出的驱动, 池中剩下的驱动)"""
+    async def main():
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            pool = server.WebDriverPool(1, executor)
+            driver = FakeDriver()
+            pool.release(driver)
+            await pool._slots.get()  # 换掉初始的 None 名额
+            try:
+                result = await pool.run(path, data)
+            except Exception as e:
+                result = e
+            assert pool._slots.qsize() == 1
+            return result, driver, pool._slots.get_nowait()
+
+    return asyncio.run(main())
+
+
+def test_close_skipped_by_stop_on_error_keeps_driver():
+    ops = [{"op": "click", "selector": "#missing", "no_wait": True}, {"op": "close"}]
+    result, driver, pooled = _run_once("/batch", {"actions": ops, "stop_on_error": True})
+    assert len(result["results"]) == 1
+    assert pooled is driver and not driver.closed
+
+
+def test_executed_close_releases_empty_slot():
+    result, driver, pooled = _run_once("/browser_batch", {"ops": [{"op": "close"}]})
+    assert result["success"]
+    assert pooled is None and driver.closed
+
+
+def test_invalid_batch_item_still_returns_driver():
+    result, driver, pooled = _run_once("/browser_batch", {"ops": ["close", 42]})
+    assert not result["success"]
+    assert pooled is driver
+
+
+def test_failed_dispatch_still_returns_driver():
+    result, driver, pooled = _run_once("/browser_batch", {"ops": 42})
+    assert isinstance(result, Exception)
+    assert pooled is driver
+
+
+def test_batch_ops_cannot_override_bound_session():
+    result, driver, pooled = _run_once("/batch", {"actions": [
+        {"op": "close", "driver": None, "session_id": "victim"},
+        {"op": "close", "args": {"session_id": "victim"}},
+    ]})
+    assert [r["error"] for r in result["results"]] == [
+        "Reserved args for close: driver, session_id",
+        "Reserved args for close: session_id",
+    ]
+    assert pooled is driver and not driver.closed
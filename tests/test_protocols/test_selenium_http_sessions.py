@@ -0,0 +1,79 @@
+"""selenium_http_server 会话淘汰与会话锁清理"""
+
+import threading
+import time
+
+import pytest
+
+from yu_agent.protocols.mcp import selenium_http_server as server
+
+
+class FakeDriver:
+    def __init__(self):
+        self.closed = False
+
+    def quit(self):
+        self.closed = True
+
+
+@pytest.fixture
+def sessions(monkeypatch):
+    monkeypatch.setattr(server, "_create_driver", FakeDriver)
+    monkeypatch.setattr(server, "_start_reaper", lambda: None)
+    monkeypatch.setattr(server, "MAX_SESSIONS", 1)
+    yield
+    server.close_driver()
+
+
+def test_lru_eviction_skips_session_in_use(sessions):
+    with server._session("busy"):
+        busy = server.get_driver("busy")
+        other = server.get_driver("other")
+        assert not busy.closed
+        assert set(server._drivers) == {"busy", "other"}
+
+    server.get_driver("third")
+    assert busy.closed and other.closed
+    assert set(server._drivers) == {"third"}
+
+
+def test_session_lock_removed_after_last_request(sessions):
+    server._call_in_session("a", server.get_driver, "a")
+    server.get_driver("b")
+    assert "a" not in server._drivers
+    assert server._session_locks == {}
+    assert server._in_use == {}
+
+
+def test_busy_session_does_not_block_other_sessions(monkeypatch):
+    release = threading.Event()
+
+    def dispatch(path, data):
+        if data["session_id"] == "slow":
+            release.wait(10)
+        return {"success": True, "session_id": data["session_id"]}
+
+    monkeypatch.setattr(server, "dispatch_request", dispatch)
+    # 比执行器线程数多的请求堆积在同一个会话上
+    slow = [
+        threading.Thread(target=server._dispatch_in_session, args=("/browser_click", {"session_id": "slow"}))
+        for _ in range(server.MAX_SESSIONS + 2)
+    ]
+    for t in slow:
+        t.start()
+    try:
+        deadline = time.monotonic() + 5
+        while server._in_use.get("slow", 0) < len(slow) and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        done = []
+        fast = threading.Thread(
+            target=lambda: done.append(server._dispatch_in_session("/browser_click", {"session_id": "fast"}))
+        )
+        fast.start()
+        fast.join(timeout=5)
+        assert done == [{"success": True, "session_id": "fast"}]
+    finally:
+        release.set()
+        for t in slow:
+            t.join(timeout=10)
@@ -0,0 +1,13 @@
+"""CalculatorTool 的 numexpr 路径与默认路径结果一致"""
+
+import pytest
+
+from yu_agent.tools.builtin.calculator import CalculatorTool
+
+
+@pytest.mark.parametrize("expression", ["log(0)", "sqrt(-1)", "1/0", "2**10", "sqrt(16)+sin(pi/2)"])
+def test_vectorized_matches_default(expression):
+    calculator = CalculatorTool()
+    default = calculator.run({"input": expression})
+    vectorized = calculator.run({"input": expression, "vectorized": True})
+    assert vectorized == default
@@ -0,0 +1,74 @@
+"""MemoryTool 自动记录缓冲区"""
+
+import gc
+import threading
+import time
+
+from yu_agent.tools.builtin.memory_tool import MemoryTool
+
+
+def _working_only_tool() -> MemoryTool:
+    return MemoryTool(user_id="test_user", memory_types=["working"])
+
+
+def _count(tool: MemoryTool) -> int:
+    return tool.memory_manager.get_memory_stats()["total_memories"]
+
+
+def test_failed_flush_keeps_items_for_retry(monkeypatch):
+    tool = _working_only_tool()
+    tool.auto_record_conversation("你好", "你好！")
+
+    def fail(items):
+        raise RuntimeError("storage unavailable")
+
+    monkeypatch.setattr(tool.memory_manager, "add_memories_batch", fail)
+    assert tool.flush() == 0
+    assert len(tool._pending) == 2
+
+    monkeypatch.undo()
+    assert tool.flush() == 2
+    assert _count(tool) == 2
+
+
+def test_unsupported_type_does_not_block_other_items():
+    tool = _working_only_tool()
+    # 长回复会额外生成一条情景记忆，而该工具未启用情景记忆
+    tool.auto_record_conversation("请记住这件事", "好的" * 60)
+
+    assert tool.flush() == 2
+    assert not tool._pending
+    assert _count(tool) == 2
+
+
+def test_pending_items_are_flushed_when_tool_is_collected():
+    tool = _working_only_tool()
+    written = []
+    tool.memory_manager.add_memories_batch = written.extend
+    tool.auto_record_conversation("你好", "你好！")
+
+    del tool
+    gc.collect()
+    assert len(written) == 2
+
+
+def test_stats_wait_for_background_flush(monkeypatch):
+    tool = _working_only_tool()
+    tool.auto_record_conversation("你好", "你好！")
+
+    add_batch = tool.memory_manager.add_memories_batch
+    started = threading.Event()
+
+    def slow_add(items):
+        started.set()
+        time.sleep(0.5)
+        return add_batch(items)
+
+    monkeypatch.setattr(tool.memory_manager, "add_memories_batch", slow_add)
+    flusher = threading.Thread(target=tool.flush)
+    flusher.start()
+    assert started.wait(5)
+
+    # 后台写入进行中缓冲区已经清空，统计仍然要等这批记忆写完
+    assert "总记忆数: 2" in tool.execute("stats")
+    flusher.join()
@@ -0,0 +1,63 @@
+"""SeleniumScreenshotTool 浏览器池：归还时清除状态并复用"""
+
+import pytest
+
+pytest.importorskip("selenium")
+
+from yu_agent.tools import selenium_screenshot as st  # noqa: E402
+
+
+class FakeDriver:
+    def __init__(self):
+        self.current_url = "about:blank"
+        self.cdp = []
+        self.quit_called = False
+
+    def get(self, url):
+        self.current_url = url
+
+    def delete_all_cookies(self):
+        pass
+
+    def execute_cdp_cmd(self, cmd, args):
+        self.cdp.append((cmd, args))
+
+    def set_window_size(self, width, height):
+        self.size = (width, height)
+
+    def quit(self):
+        self.quit_called = True
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(st, "_DRIVER_POOL", {})
+    monkeypatch.setattr(st, "_pool_closed", False)
+    monkeypatch.setattr(st, "_create_driver", lambda headless, window_size: FakeDriver())
+    yield st._DRIVER_POOL
+
+
+def test_released_driver_is_reused_after_clearing_visited_origins(pool):
+    tool = st.SeleniumScreenshotTool()
+    tool._init_driver()
+    driver = tool.driver
+    tool._visited_origins.add("https://example.com")
+    driver.get("http://localhost:8080/login?next=/")  # 点击跳转到的页面
+
+    tool.close()
+
+    assert not driver.quit_called
+    cleared = [args["origin"] for cmd, args in driver.cdp if cmd == "Storage.clearDataForOrigin"]
+    assert cleared == ["http://localhost:8080", "https://example.com"]
+    assert driver.current_url == "about:blank"
+
+    other = st.SeleniumScreenshotTool()
+    other._init_driver()
+    assert other.driver is driver
+    assert other._visited_origins == set()
+
+
+def test_origin_of_ignores_pages_without_storage():
+    assert st._origin_of("https://example.com:8443/a?b=c") == "https://example.com:8443"
+    assert st._origin_of("about:blank") is None
+    assert st._origin_of("data:text/html,hi") is None